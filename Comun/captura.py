@@ -0,0 +1,66 @@
+# captura.py — Captura del ADC por timer en un buffer circular array('H')
+#
+# Un machine.Timer periódico llama a _isr a la frecuencia de muestreo y
+# escribe cada lectura en un anillo de `n_bloques` bloques de `n` muestras.
+# Mientras el timer llena un bloque, el bucle principal procesa el anterior
+# (doble buffer con n_bloques=2): muestreo y DSP se solapan y el período de
+# muestreo ya no depende de cuánto tarda el Goertzel/FFT.
+# Copiar a la Pico junto con main.py. En el PC, pico_host/machine.py
+# simula Timer e idle() sobre el reloj virtual.
+
+import machine
+from array import array
+
+
+class CapturaADC:
+    def __init__(self, adc, fs, n, n_bloques=2):
+        self.adc = adc
+        self.fs = fs
+        self.n = n
+        self.n_bloques = n_bloques
+        self.buf = array('H', [0] * (n * n_bloques))
+        # Vistas preasignadas de cada bloque (la ISR y leer() no asignan memoria)
+        mv = memoryview(self.buf)
+        self.bloques = [mv[i * n:(i + 1) * n] for i in range(n_bloques)]
+        self.pos = 0
+        self.llenos = 0        # bloques completados por la ISR
+        self.leidos = 0        # bloques entregados al bucle principal
+        self.perdidos = 0      # bloques pisados antes de procesarse (overrun)
+        self.timer = None
+
+    def _isr(self, t):
+        self.buf[self.pos] = self.adc.read_u16()
+        self.pos += 1
+        if self.pos % self.n == 0:
+            if self.pos == len(self.buf):
+                self.pos = 0
+            self.llenos += 1
+
+    def iniciar(self):
+        self.pos = 0
+        self.llenos = 0
+        self.leidos = 0
+        self.perdidos = 0
+        self.timer = machine.Timer(freq=self.fs, mode=machine.Timer.PERIODIC, callback=self._isr)
+
+    def detener(self):
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None
+
+    def leer(self):
+        """
+        Espera el siguiente bloque completo y lo retorna (memoryview de
+        uint16). Es válido hasta que el timer vuelva a ese bloque, es decir,
+        durante n·(n_bloques-1) muestras.
+        """
+        while self.llenos == self.leidos:
+            machine.idle()
+        atraso = self.llenos - self.leidos
+        if atraso >= self.n_bloques:
+            # El timer dio la vuelta: se descartan los bloques ya pisados
+            self.perdidos += atraso - 1
+            self.leidos = self.llenos - 1
+        bloque = self.bloques[self.leidos % self.n_bloques]
+        self.leidos += 1
+        return bloque
@@ -0,0 +1,91 @@
+# cfar.py — umbral adaptativo (CFAR) para los detectores de tonos
+#
+# Reemplaza los THRESHOLD fijos que había que calibrar a mano en Thonny.
+# En cada trama el receptor pasa las energías de sus celdas de referencia:
+# bins de guarda (frecuencias donde nadie transmite) y, si quiere, los
+# propios tonos. El piso de ruido es la mediana de esas celdas (OS-CFAR:
+# un tono activo o un interferente en una celda no la mueve), suavizada
+# con una EMA como la mediana de ruido de Tx/buzzer.py. Hay señal si un
+# tono supera `factor` veces el piso. Como el piso se mide con la misma
+# trama, sigue valiendo al acortar la subtrama (bits más rápidos) o al
+# cambiar la ganancia de entrada, sin recalibrar.
+# Solo usa Python: copiar a la Pico junto con main.py.
+
+RUIDO = -1
+
+
+class DetectorCFAR:
+    def __init__(self, factor, alfa=0.1, piso_min=1.0):
+        self.factor = factor
+        self.alfa = alfa            # peso de la trama nueva en la EMA del piso
+        self.piso_min = piso_min    # evita umbral 0 con entrada digitalmente muda
+        self.piso = 0.0
+        self.umbral = 0.0
+        self.tramas = 0
+
+    def actualizar(self, celdas):
+        """Incorpora las celdas de referencia de una trama; devuelve el umbral nuevo."""
+        orden = sorted(celdas)
+        n = len(orden)
+        m = n // 2
+        mediana = orden[m] if n % 2 else 0.5 * (orden[m - 1] + orden[m])
+        if self.tramas == 0:
+            self.piso = mediana
+        else:
+            self.piso += self.alfa * (mediana - self.piso)
+        self.tramas += 1
+        self.umbral = self.factor * (self.piso if self.piso > self.piso_min else self.piso_min)
+        return self.umbral
+
+    def clasificar(self, e0, e1):
+        """clasificar() con el umbral de la última trama."""
+        return clasificar(e0, e1, self.umbral)
+
+
+def clasificar(e0, e1, umbral):
+    """RUIDO (-1) si ningún tono supera el umbral; si no 0 (F0) o 1 (F1). Sirve también con umbral fijo."""
+    if e0 <= umbral and e1 <= umbral:
+        return RUIDO
+    return 1 if e1 > e0 else 0
+
+
+if __name__ == "__main__":
+    # Tramas sintéticas con el ruido subiendo 10 dB a mitad de camino:
+    # umbral fijo (calibrado con el ruido inicial) contra CFAR, con la
+    # subtrama larga (205) y la corta del modo trama (51).
+    import numpy as np
+    from goertzel import goertzel_np, bins_de_frecuencias
+
+    FS, F0, F1 = 8350, 2100, 3100
+    GUARDAS = [1600, 2600, 3600]
+    rng = np.random.default_rng(0)
+
+    def simular(n, amp=2000.0, sigma=(300.0, 950.0), n_tramas=4000):
+        t = np.arange(n) / FS
+        tono = rng.integers(-1, 2, n_tramas)              # -1 silencio, 0 F0, 1 F1
+        s = np.repeat(np.array(sigma), n_tramas // 2)
+        x = rng.standard_normal((n_tramas, n)) * s[:, None]
+        fase = rng.uniform(0, 2 * np.pi, n_tramas)[:, None]
+        for k, f in enumerate((F0, F1)):
+            x[tono == k] += amp * np.sin(2 * np.pi * f * t + fase[tono == k])
+        E = goertzel_np(x, bins_de_frecuencias([F0, F1] + GUARDAS, FS, n))
+        return tono, E
+
+    print("   N   umbral      falsas (ruido bajo/alto)   perdidas (ruido bajo/alto)")
+    for n, factor in ((205, 6.0), (51, 6.0)):
+        tono, E = simular(n)
+        mitad = len(tono) // 2
+        # Umbral fijo: el que daría CFAR con el ruido de las primeras tramas
+        fijo = factor * float(np.median(E[:200, 2:]))
+        cfar = DetectorCFAR(factor)
+        dec = {"fijo": np.empty(len(tono), dtype=int), "CFAR": np.empty(len(tono), dtype=int)}
+        for i, e in enumerate(E):
+            cfar.actualizar(e[2:])
+            dec["CFAR"][i] = cfar.clasificar(e[0], e[1])
+            dec["fijo"][i] = clasificar(e[0], e[1], fijo)
+        for nombre, d in dec.items():
+            falsas = [np.mean(d[sl][tono[sl] == -1] != RUIDO) for sl in (slice(0, mitad), slice(mitad, None))]
+            perdidas = [np.mean(d[sl][tono[sl] >= 0] != tono[sl][tono[sl] >= 0])
+                        for sl in (slice(0, mitad), slice(mitad, None))]
+            print(f"{n:4d}   {nombre:6s}   {falsas[0]:10.1%} / {falsas[1]:6.1%}"
+                  f"       {perdidas[0]:10.1%} / {perdidas[1]:6.1%}")
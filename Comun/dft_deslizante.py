@@ -0,0 +1,99 @@
+# dft_deslizante.py — DFT deslizante por saltos para unos pocos bins
+#
+# Mantiene X_k de las últimas N muestras solo para los bins pedidos y lo
+# actualiza cada `hop` muestras nuevas, sin recalcular la FFT completa:
+#   X_k' = e^{j2πk·hop/N} · (X_k + Σ_m (x_nuevo[m] - x_viejo[m]) e^{-j2πkm/N})
+# (un producto matricial real de (bins × hop) por salto). La ventana
+# Blackman se aplica en frecuencia combinando los bins k±1, k±2, así que
+# cada rango se sigue con 2 bins extra por lado. Cada `resync` saltos se
+# recalcula desde la historia con una FFT para que no acumule error.
+# Copiar a la Pico junto con el receptor (usa ulab; en el PC, NumPy).
+
+try:
+    from ulab import numpy as np
+except ImportError:
+    import numpy as np
+
+# Blackman periódica en frecuencia: 0.42·X[k] - 0.25·(X[k±1]) + 0.04·(X[k±2])
+_A0, _A1, _A2 = 0.42, 0.25, 0.04
+
+
+class DFTDeslizante:
+    def __init__(self, k_ini, k_fin, n, hop, resync=64):
+        assert n % hop == 0
+        self.n = n
+        self.hop = hop
+        self.resync = resync
+        # Bins seguidos: k_ini-2 .. k_fin+2
+        self.k0 = k_ini - 2
+        self.nk = (k_fin + 2) - self.k0 + 1
+        k = np.arange(self.nk) + self.k0
+        m = np.arange(hop)
+        # Matrices (bins × hop) de la suma del salto
+        self.C = np.zeros((self.nk, hop))
+        self.S = np.zeros((self.nk, hop))
+        for i in range(self.nk):
+            ang = 2 * np.pi * k[i] * m / n
+            self.C[i, :] = np.cos(ang)
+            self.S[i, :] = np.sin(ang)
+        ang_hop = 2 * np.pi * k * hop / n
+        self.c_hop = np.cos(ang_hop)
+        self.s_hop = np.sin(ang_hop)
+
+        self.hist = np.zeros(n)     # últimas n muestras (anillo de saltos)
+        self.pos = 0
+        self.re = np.zeros(self.nk)
+        self.im = np.zeros(self.nk)
+        self.saltos = 0
+
+    def actualizar(self, nuevas):
+        """Incorpora `hop` muestras nuevas (array float)."""
+        p = self.pos
+        d = nuevas - self.hist[p:p + self.hop]
+        self.hist[p:p + self.hop] = nuevas
+        self.pos = (p + self.hop) % self.n
+        self.saltos += 1
+        if self.saltos % self.resync == 0:
+            self._resincronizar()
+            return
+        re = self.re + np.dot(self.C, d)
+        im = self.im - np.dot(self.S, d)
+        self.re = re * self.c_hop - im * self.s_hop
+        self.im = re * self.s_hop + im * self.c_hop
+
+    def _resincronizar(self):
+        # FFT completa de la historia en orden (la más vieja primero)
+        x = np.concatenate((self.hist[self.pos:], self.hist[:self.pos]))
+        X = np.fft.fft(x - np.mean(x))
+        seg = X[self.k0:self.k0 + self.nk]
+        self.re = np.real(seg)
+        self.im = np.imag(seg)
+
+    def magnitudes(self):
+        """|X_k| con ventana Blackman para k_ini..k_fin."""
+        re, im = self.re, self.im
+        wr = _A0 * re[2:-2] - _A1 * (re[1:-3] + re[3:-1]) + _A2 * (re[:-4] + re[4:])
+        wi = _A0 * im[2:-2] - _A1 * (im[1:-3] + im[3:-1]) + _A2 * (im[:-4] + im[4:])
+        return np.sqrt(wr * wr + wi * wi)
+
+
+if __name__ == "__main__":
+    # Verificación: DFT deslizante vs FFT con ventana Blackman periódica
+    FS, N, HOP = 12800, 512, 64
+    rng = np.random.default_rng(0)
+    t = np.arange(40 * N) / FS
+    x = (32768 + 12000 * np.sin(2*np.pi*2200*t) + 6000 * np.sin(2*np.pi*3675*t + 0.5)
+         + 1500 * rng.standard_normal(t.size))
+    w = 0.42 - 0.5 * np.cos(2*np.pi*np.arange(N)/N) + 0.08 * np.cos(4*np.pi*np.arange(N)/N)
+
+    dft = DFTDeslizante(80, 100, N, HOP, resync=16)
+    peor = 0.0
+    for j in range(x.size // HOP):
+        dft.actualizar(x[j*HOP:(j+1)*HOP])
+        fin = (j + 1) * HOP
+        if fin >= N:
+            seg = x[fin - N:fin]
+            ref = np.abs(np.fft.rfft((seg - seg.mean()) * w))[80:101]
+            peor = max(peor, float(np.max(np.abs(dft.magnitudes() - ref)) / np.max(ref)))
+    print(f"error relativo máx vs FFT: {peor:.2e}")
+    assert peor < 1e-6, "la DFT deslizante no coincide con la FFT"
@@ -0,0 +1,416 @@
+# fec.py — corrección de errores para el enlace FSK (PC + Pico)
+#
+# Dos códigos sobre el flujo de bits, a elegir con FEC en el TX y el RX:
+#   "hamming": Hamming(7,4), 4 bits -> 7; corrige 1 error por palabra.
+#   "conv":    convolucional de tasa 1/2, K = 5, generadores (23, 35)
+#              octal (d_libre = 7), con cola de K-1 ceros.
+# La parte MicroPython (DecodificadorHamming, ViterbiFlujo) solo usa
+# tablas en bytearray/array y enteros: copiar a la Pico junto con main.py.
+# Los decodificadores de flujo reciben un bit codificado por vez y
+# devuelven los bits de información que ya pueden entregar, así encajan
+# en DesarmadorTrama. La versión NumPy (codificar_np, decodificar_np,
+# viterbi_np) importa numpy recién al llamarse y decodifica muchas tramas
+# a la vez; acepta LLR (demodulador.llr_desde_energias) como entrada blanda.
+
+from array import array
+
+HAMMING = "hamming"
+CONV = "conv"
+
+
+# ---------------- Hamming(7,4) ----------------
+# Palabra (bit i = i-ésimo en salir): d0 d1 d2 d3 p0 p1 p2
+def _palabra_hamming(d):
+    d0, d1, d2, d3 = d & 1, (d >> 1) & 1, (d >> 2) & 1, (d >> 3) & 1
+    return d | ((d0 ^ d1 ^ d3) << 4) | ((d0 ^ d2 ^ d3) << 5) | ((d1 ^ d2 ^ d3) << 6)
+
+
+_HAMMING = bytes(_palabra_hamming(d) for d in range(16))
+# Código perfecto: cada una de las 128 palabras está a distancia <= 1 de
+# exactamente una palabra válida, así que la tabla corrige con un acceso
+_CORREGIR = bytearray(128)
+for _d in range(16):
+    for _e in (0, 1, 2, 4, 8, 16, 32, 64):
+        _CORREGIR[_HAMMING[_d] ^ _e] = _d
+
+
+class DecodificadorHamming:
+    """Junta 7 bits codificados y entrega los 4 de datos, corregidos por tabla."""
+
+    def __init__(self):
+        self.corregidos = 0
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.acum = 0
+        self.n = 0
+
+    def esperar(self, n_bits):
+        """Sin efecto: cada palabra se decodifica sola (misma interfaz que ViterbiFlujo)."""
+
+    def paso(self, bit):
+        self.acum |= (bit & 1) << self.n
+        self.n += 1
+        if self.n < 7:
+            return ()
+        d = _CORREGIR[self.acum]
+        if _HAMMING[d] != self.acum:
+            self.corregidos += 1
+        self.acum = 0
+        self.n = 0
+        return (d & 1, (d >> 1) & 1, (d >> 2) & 1, (d >> 3) & 1)
+
+
+# ---------------- Convolucional de tasa 1/2 ----------------
+def _paridad(x):
+    p = 0
+    while x:
+        p ^= 1
+        x &= x - 1
+    return p
+
+
+class CodigoConvolucional:
+    """
+    Estado = últimos K-1 bits de entrada, el más nuevo en el LSB. Las
+    tablas se indexan con el registro de K bits r = (estado << 1) | bit:
+    salida[r] = c0 << 1 | c1. El estado siguiente es r & (n_estados - 1).
+    """
+
+    def __init__(self, k=5, g=(0o23, 0o35)):
+        self.k = k
+        self.g = g
+        self.n_estados = 1 << (k - 1)
+        self.salida = bytearray((_paridad(r & g[0]) << 1) | _paridad(r & g[1])
+                                for r in range(2 * self.n_estados))
+
+    def codificar(self, bits, cola=True):
+        """Genera 2 bits codificados por bit; con `cola` agrega K-1 ceros y termina en el estado 0."""
+        mascara = self.n_estados - 1
+        sal = self.salida
+        estado = 0
+        for b in bits:
+            r = (estado << 1) | (b & 1)
+            c = sal[r]
+            yield c >> 1
+            yield c & 1
+            estado = r & mascara
+        if cola:
+            for _ in range(self.k - 1):
+                r = estado << 1
+                c = sal[r]
+                yield c >> 1
+                yield c & 1
+                estado = r & mascara
+
+
+CODIGO = CodigoConvolucional()
+
+
+class ViterbiFlujo:
+    """
+    Viterbi de a un bit codificado por vez, con tablas y enteros (Pico).
+    Los bits pueden ser duros (0/1) o blandos con blando=True (positivo = 1,
+    p. ej. LLR). Con ventana de `profundidad` pasos entrega cada bit con ese
+    retardo; cuando se conoce el largo (esperar) y llega el último paso de
+    la cola, rastrea desde el estado 0 y entrega todo lo que falta.
+    """
+
+    def __init__(self, codigo=CODIGO, profundidad=24, blando=False):
+        self.codigo = codigo
+        self.profundidad = profundidad
+        self.blando = blando
+        s = codigo.n_estados
+        self.metrica = array('f' if blando else 'i', [0] * s)
+        self._nueva = array('f' if blando else 'i', [0] * s)
+        self._rama = array('f' if blando else 'i', [0] * 4)
+        self.historia = array('I', [0] * (profundidad + 1))   # decisiones por paso, 1 bit por estado
+        self.reiniciar()
+
+    def reiniciar(self):
+        m = self.metrica
+        for i in range(len(m)):
+            m[i] = -1000000
+        m[0] = 0
+        self.t = 0              # pasos (pares de bits codificados) recibidos
+        self.entregados = 0
+        self.total = -1         # pasos hasta el final de la cola, -1 si no se sabe
+        self._y0 = None
+
+    def esperar(self, n_bits):
+        """Largo de la información (sin cola): permite cerrar al terminar la cola."""
+        self.total = n_bits + self.codigo.k - 1
+
+    def paso(self, y):
+        if self._y0 is None:
+            self._y0 = y
+            return ()
+        y0 = self._y0
+        self._y0 = None
+        if not self.blando:
+            y0 = 2 * y0 - 1
+            y = 2 * y - 1
+        rama = self._rama               # métrica de las 4 salidas posibles (c0, c1)
+        rama[0] = -y0 - y
+        rama[1] = -y0 + y
+        rama[2] = y0 - y
+        rama[3] = y0 + y
+
+        s = self.codigo.n_estados
+        sal = self.codigo.salida
+        m = self.metrica
+        nueva = self._nueva
+        medio = s >> 1
+        decisiones = 0
+        mejor = 0
+        for d in range(s):
+            p = d >> 1
+            a = m[p] + rama[sal[d]]
+            b = m[p + medio] + rama[sal[d + s]]
+            if b > a:
+                a = b
+                decisiones |= 1 << d
+            nueva[d] = a
+            if a > nueva[mejor]:
+                mejor = d
+        # Normaliza para que las métricas enteras no crezcan sin límite
+        tope = nueva[mejor]
+        for d in range(s):
+            m[d] = nueva[d] - tope
+        self.historia[self.t % len(self.historia)] = decisiones
+        self.t += 1
+
+        if self.t == self.total:
+            return self._rastrear(0, self.t - self.entregados, self.total - self.codigo.k + 1)
+        if self.t - self.entregados > self.profundidad:
+            return self._rastrear(mejor, self.profundidad + 1, self.entregados + 1)
+        return ()
+
+    def _rastrear(self, estado, pasos, hasta):
+        """Recorre `pasos` decisiones hacia atrás; entrega los bits de entregados a hasta-1."""
+        h = self.historia
+        n = len(h)
+        alto = self.codigo.k - 2
+        bits = []
+        t = self.t - 1
+        for _ in range(pasos):
+            if t < hasta:
+                bits.append(estado & 1)
+            estado = (estado >> 1) | (((h[t % n] >> estado) & 1) << alto)
+            t -= 1
+        bits.reverse()
+        self.entregados = hasta
+        return bits
+
+
+def decodificador(fec, **kw):
+    """Decodificador de flujo para FEC (None, "hamming" o "conv")."""
+    if fec is None:
+        return None
+    if fec == HAMMING:
+        return DecodificadorHamming()
+    if fec == CONV:
+        return ViterbiFlujo(**kw)
+    raise ValueError("FEC debe ser None, 'hamming' o 'conv'")
+
+
+def codificar(bits, fec):
+    """Bits codificados (generador) de un flujo de bits; fec=None los deja igual."""
+    if fec is None:
+        yield from bits
+    elif fec == HAMMING:
+        acum = 0
+        n = 0
+        for b in bits:
+            acum |= (b & 1) << n
+            n += 1
+            if n == 4:
+                c = _HAMMING[acum]
+                for i in range(7):
+                    yield (c >> i) & 1
+                acum = 0
+                n = 0
+        if n:  # nibble incompleto: se completa con ceros
+            c = _HAMMING[acum]
+            for i in range(7):
+                yield (c >> i) & 1
+    elif fec == CONV:
+        yield from CODIGO.codificar(bits)
+    else:
+        raise ValueError("FEC debe ser None, 'hamming' o 'conv'")
+
+
+def largo_codificado(n_bits, fec):
+    """Bits en el canal para n_bits de información."""
+    if fec is None:
+        return n_bits
+    if fec == HAMMING:
+        return 7 * ((n_bits + 3) // 4)
+    return 2 * (n_bits + CODIGO.k - 1)
+
+
+# ---------------- Versión NumPy (muchas tramas a la vez) ----------------
+def codificar_np(bits, fec, codigo=CODIGO):
+    """(F, n) bits -> (F, largo_codificado(n)) uint8, o 1-D -> 1-D."""
+    import numpy as np
+
+    b = np.asarray(bits).astype(np.uint8) & 1
+    plano = b.ndim == 1
+    b = np.atleast_2d(b)
+    f, n = b.shape
+    if fec is None:
+        c = b.copy()
+    elif fec == HAMMING:
+        relleno = -n % 4
+        nib = np.pad(b, ((0, 0), (0, relleno))).reshape(f, -1, 4)
+        nib = nib @ np.array([1, 2, 4, 8], dtype=np.uint8)
+        palabras = np.frombuffer(_HAMMING, dtype=np.uint8)[nib]
+        c = np.unpackbits(palabras[..., None], axis=-1, count=7, bitorder="little").reshape(f, -1)
+    elif fec == CONV:
+        k = codigo.k
+        u = np.pad(b, ((0, 0), (k - 1, k - 1)))       # estado inicial 0 y cola de ceros
+        c = np.zeros((f, n + k - 1, 2), dtype=np.uint8)
+        for i, g in enumerate(codigo.g):
+            for j in range(k):
+                if (g >> j) & 1:                      # tap j = bit de hace j pasos
+                    c[:, :, i] ^= u[:, k - 1 - j:k - 1 - j + n + k - 1]
+        c = c.reshape(f, -1)
+    else:
+        raise ValueError("FEC debe ser None, 'hamming' o 'conv'")
+    return c[0] if plano else c
+
+
+def viterbi_np(y, codigo=CODIGO, terminado=True):
+    """
+    Viterbi de muchas tramas a la vez: y (F, 2L) valores blandos con
+    positivo = 1 (LLR, o 2·bit-1 para decisión dura) -> (F, L - (K-1)) bits
+    uint8 si `terminado` (cola de ceros), si no (F, L). Cada paso hace el
+    suma-compara-elige de las F tramas × n_estados en una operación; el
+    rastreo final también va vectorizado sobre las tramas.
+    """
+    import numpy as np
+
+    y = np.asarray(y, dtype=float)
+    plano = y.ndim == 1
+    y = np.atleast_2d(y)
+    f = y.shape[0]
+    n_pasos = y.shape[1] // 2
+    s = codigo.n_estados
+    sal = np.frombuffer(codigo.salida, dtype=np.uint8)
+    # Signo de cada bit de salida por registro r = d | x << (K-1): ±1
+    c0 = (sal >> 1).astype(float) * 2 - 1
+    c1 = (sal & 1).astype(float) * 2 - 1
+    previo = np.arange(2 * s) >> 1                   # estado anterior de cada registro
+
+    m = np.full((f, s), -np.inf)
+    m[:, 0] = 0.0
+    decisiones = np.empty((n_pasos, f, s), dtype=bool)
+    for t in range(n_pasos):
+        cand = m[:, previo] + y[:, 2 * t, None] * c0 + y[:, 2 * t + 1, None] * c1
+        cand = cand.reshape(f, 2, s)
+        decisiones[t] = cand[:, 1] > cand[:, 0]
+        m = np.maximum(cand[:, 0], cand[:, 1])
+
+    estado = np.zeros(f, dtype=np.intp) if terminado else np.argmax(m, axis=1)
+    bits = np.empty((f, n_pasos), dtype=np.uint8)
+    filas = np.arange(f)
+    alto = codigo.k - 2
+    for t in range(n_pasos - 1, -1, -1):
+        bits[:, t] = estado & 1
+        estado = (estado >> 1) | (decisiones[t, filas, estado].astype(np.intp) << alto)
+    if terminado:
+        bits = bits[:, :n_pasos - codigo.k + 1]
+    return bits[0] if plano else bits
+
+
+def hamming_np(y):
+    """
+    Hamming(7,4) por máxima verosimilitud: y (F, 7W) blandos con positivo = 1
+    -> (F, 4W) bits. Correlaciona cada palabra recibida con las 16 válidas;
+    con entrada dura (2·bit-1) equivale a la tabla de corrección.
+    """
+    import numpy as np
+
+    y = np.asarray(y, dtype=float)
+    plano = y.ndim == 1
+    y = np.atleast_2d(y)
+    f = y.shape[0]
+    palabras = np.unpackbits(np.frombuffer(_HAMMING, dtype=np.uint8)[:, None], axis=1,
+                             count=7, bitorder="little")
+    d = np.argmax(y.reshape(f, -1, 7) @ (2.0 * palabras.T - 1), axis=-1).astype(np.uint8)
+    bits = np.unpackbits(d[..., None], axis=-1, count=4, bitorder="little").reshape(f, -1)
+    return bits[0] if plano else bits
+
+
+def decodificar_np(y, fec, n_bits=None):
+    """Decodifica (F, m) blandos (positivo = 1) según fec; recorta a n_bits si se pasa."""
+    import numpy as np
+
+    if fec is None:
+        bits = (np.asarray(y) > 0).astype(np.uint8)
+    elif fec == HAMMING:
+        bits = hamming_np(y)
+    elif fec == CONV:
+        bits = viterbi_np(y)
+    else:
+        raise ValueError("FEC debe ser None, 'hamming' o 'conv'")
+    return bits if n_bits is None else bits[..., :n_bits]
+
+
+if __name__ == "__main__":
+    # BER con y sin FEC en un canal BPSK/AWGN equivalente (un valor blando
+    # por bit codificado), muchas tramas a la vez, y verificación cruzada
+    # de los decodificadores de la Pico contra los de NumPy.
+    import time
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    F, N = 2000, 240                                 # tramas × bits de información
+
+    def canal(c, esn0_db):
+        """LLR de cada bit codificado: BPSK con Es/N0 por bit de canal."""
+        esn0 = 10 ** (esn0_db / 10)
+        x = 2.0 * c - 1 + rng.standard_normal(c.shape) / np.sqrt(2 * esn0)
+        return 4 * esn0 * x
+
+    bits = rng.integers(0, 2, (F, N)).astype(np.uint8)
+    print("Eb/N0   sin FEC   Hamming duro   Hamming blando   conv duro   conv blando")
+    for ebn0_db in (2.0, 4.0, 6.0, 8.0):
+        fila = []
+        for fec in (None, HAMMING, CONV):
+            c = codificar_np(bits, fec)
+            # misma energía por bit de información: Es = Eb · N / bits codificados
+            llr = canal(c, ebn0_db + 10 * np.log10(N / c.shape[1]))
+            duro = np.where(llr > 0, 1.0, -1.0)
+            for y in ((llr,) if fec is None else (duro, llr)):
+                fila.append(np.mean(decodificar_np(y, fec, N) != bits))
+        print(f"{ebn0_db:4.0f} dB  " + "  ".join(f"{b:11.2e}" for b in fila))
+
+    c = codificar_np(bits, CONV)
+    y = canal(c, 1.0)
+    t0 = time.perf_counter()
+    viterbi_np(y)
+    dt = time.perf_counter() - t0
+    print(f"viterbi_np: {F} tramas × {N} bits en {dt*1e3:.0f} ms ({F * N / dt / 1e6:.1f} Mbit/s)")
+
+    # Pico vs NumPy: mismos bits codificados, mismas decisiones
+    assert np.array_equal(np.array(list(codificar(bits[0].tolist(), CONV)), dtype=np.uint8), c[0])
+    assert np.array_equal(np.array(list(codificar(bits[0].tolist(), HAMMING)), dtype=np.uint8),
+                          codificar_np(bits[0], HAMMING))
+    for fec, db in ((CONV, 3.0), (HAMMING, 6.0)):
+        difieren = 0
+        c = codificar_np(bits[:50], fec)
+        duro = (canal(c, db) > 0).astype(np.uint8)
+        ref = decodificar_np(2.0 * duro - 1, fec, N)
+        for i in range(50):
+            dec = decodificador(fec)
+            dec.esperar(N)
+            salida = [b for x in duro[i].tolist() for b in dec.paso(x)][:N]
+            assert len(salida) == N, (fec, len(salida))
+            difieren += int(np.sum(np.array(salida) != ref[i]))
+        print(f"{fec}: decodificador de flujo vs NumPy en 50 tramas duras: "
+              f"{difieren} bits distintos")
+    # Un error por palabra de Hamming siempre se corrige
+    c = codificar_np(bits[0], HAMMING)
+    c[::7] ^= 1
+    assert np.array_equal(decodificar_np(2.0 * c - 1, HAMMING, N), bits[0])
@@ -0,0 +1,131 @@
+# goertzel.py — Banco de filtros Goertzel compartido (PC + Pico)
+#
+# Mismo archivo en el simulador y en los receptores: copiarlo a la Pico
+# junto con main.py. La parte MicroPython (BancoGoertzel) solo usa math y
+# array; la versión NumPy (goertzel_np) importa numpy recién al llamarse,
+# así el módulo carga también en la Pico.
+
+import math
+from array import array
+
+try:
+    import micropython
+    _native = micropython.native
+except ImportError:  # CPython: sin emisor nativo
+    def _native(f):
+        return f
+
+
+def coeficientes(ks, n):
+    """coeff_k = 2·cos(2πk/N) para cada bin (k puede ser fraccionario)."""
+    return [2.0 * math.cos(2.0 * math.pi * k / n) for k in ks]
+
+
+def bins_de_frecuencias(freqs, fs, n):
+    """Bin (fraccionario) de cada frecuencia para una trama de n muestras."""
+    return [f * n / fs for f in freqs]
+
+
+class BancoGoertzel:
+    """
+    Goertzel de varios bins a la vez con estado preasignado en array('f').
+    Uso por trama: reiniciar(), actualizar(s) por muestra, magnitudes().
+    magnitudes() retorna |X_k|² (sin raíz), igual que los detectores originales.
+    """
+    def __init__(self, ks, n):
+        self.n = n
+        self.ks = list(ks)
+        self.n_bins = len(self.ks)
+        self.coeffs = array('f', coeficientes(self.ks, n))
+        self.q1 = array('f', [0.0] * self.n_bins)
+        self.q2 = array('f', [0.0] * self.n_bins)
+        self.mags = array('f', [0.0] * self.n_bins)
+
+    def reiniciar(self):
+        for i in range(self.n_bins):
+            self.q1[i] = 0.0
+            self.q2[i] = 0.0
+
+    @_native
+    def actualizar(self, s):
+        c, q1, q2 = self.coeffs, self.q1, self.q2
+        for i in range(self.n_bins):
+            q0 = c[i] * q1[i] - q2[i] + s
+            q2[i] = q1[i]
+            q1[i] = q0
+
+    def actualizar_bloque(self, muestras):
+        for s in muestras:
+            self.actualizar(s)
+
+    def magnitudes(self):
+        c, q1, q2, mags = self.coeffs, self.q1, self.q2, self.mags
+        for i in range(self.n_bins):
+            m = q1[i] * q1[i] + q2[i] * q2[i] - c[i] * q1[i] * q2[i]
+            mags[i] = m if m > 0 else 0.0
+        return mags
+
+
+def goertzel_np(frames, ks, recursivo=False, dtype=None):
+    """
+    Versión host: |X_k|² de muchas tramas por muchos bins, (F, N) -> (F, B).
+
+    Por defecto usa un producto matricial contra exp(-j2πkn/N), que es
+    matemáticamente lo que calcula Goertzel. recursivo=True corre la misma
+    recursión que BancoGoertzel vectorizada sobre tramas×bins; con
+    dtype=np.float32 reproduce la aritmética de la Pico.
+    """
+    import numpy as np
+
+    frames = np.atleast_2d(np.asarray(frames))
+    n = frames.shape[1]
+    ks = np.asarray(ks, dtype=float)
+
+    if not recursivo:
+        k_n = np.outer(np.arange(n), ks) * (2.0 * np.pi / n)
+        X = frames @ np.cos(k_n) - 1j * (frames @ np.sin(k_n))
+        return X.real**2 + X.imag**2
+
+    dtype = dtype or np.float64
+    c = np.asarray(coeficientes(ks, n), dtype=dtype)
+    x = frames.astype(dtype)
+    q1 = np.zeros((len(frames), len(ks)), dtype=dtype)
+    q2 = np.zeros_like(q1)
+    for i in range(n):
+        q0 = c * q1 - q2 + x[:, i:i+1]
+        q2 = q1
+        q1 = q0
+    return np.maximum(q1*q1 + q2*q2 - c*q1*q2, 0)
+
+
+if __name__ == "__main__":
+    # Verificación cruzada: BancoGoertzel (MicroPython) vs goertzel_np (NumPy)
+    import numpy as np
+
+    FS, N = 8350, 205
+    rng = np.random.default_rng(0)
+    ks = [52, 77] + bins_de_frecuencias([880.0, 1000.0], FS, N)
+    t = np.arange(N) / FS
+    frames = (32768 + 12000 * np.sin(2*np.pi*2100*t)
+              + 8000 * np.sin(2*np.pi*3100*t + 0.3)
+              + 2000 * rng.standard_normal((64, N)))
+
+    ref_dft = goertzel_np(frames, ks)
+    ref_rec = goertzel_np(frames, ks, recursivo=True)
+    ref_f32 = goertzel_np(frames, ks, recursivo=True, dtype=np.float32)
+
+    banco = BancoGoertzel(ks, N)
+    micro = np.empty_like(ref_dft)
+    for j, fr in enumerate(frames):
+        banco.reiniciar()
+        banco.actualizar_bloque(fr.tolist())
+        micro[j] = banco.magnitudes()
+
+    def err(a, b):
+        return float(np.max(np.abs(a - b) / (np.abs(b) + 1e-9 * np.max(np.abs(b)))))
+
+    print(f"recursivo float64 vs DFT : {err(ref_rec, ref_dft):.2e}")
+    print(f"recursivo float32 vs DFT : {err(ref_f32, ref_dft):.2e}")
+    print(f"BancoGoertzel     vs f32 : {err(micro, ref_f32):.2e}")
+    print(f"BancoGoertzel     vs DFT : {err(micro, ref_dft):.2e}")
+    assert err(micro, ref_dft) < 1e-3, "BancoGoertzel no coincide con goertzel_np"
@@ -0,0 +1,57 @@
+# pantalla.py — LCD y consola atendidos por el núcleo 1 del RP2040
+#
+# El núcleo 0 (muestreo + decisiones) solo deja pedidos en una cola
+# protegida por un lock y sigue; el núcleo 1 la vacía y hace lo lento
+# (escrituras I2C, print por USB). Así un refresco de pantalla nunca
+# atrasa una trama. El LCD se actualiza con el framebuffer de LcdApi: solo
+# se envían las celdas que cambiaron, sin lcd.clear().
+# Copiar a la Pico junto con main.py.
+
+import _thread
+import utime
+
+
+class PantallaNucleo1:
+    def __init__(self, lcd, max_logs=16, periodo_ms=5):
+        self.lcd = lcd
+        self.max_logs = max_logs
+        self.periodo_ms = periodo_ms
+        self.lock = _thread.allocate_lock()
+        self._pendiente = None     # (linea1, linea2) más reciente: los anteriores se descartan
+        self._mostrado = None
+        self._logs = []
+        self.logs_perdidos = 0
+
+    # --- Núcleo 0: nunca espera al LCD ---
+    def mostrar(self, linea1, linea2=""):
+        with self.lock:
+            self._pendiente = (linea1, linea2)
+
+    def log(self, texto):
+        with self.lock:
+            if len(self._logs) >= self.max_logs:
+                self._logs.pop(0)
+                self.logs_perdidos += 1
+            self._logs.append(texto)
+
+    # --- Núcleo 1 ---
+    def atender(self):
+        """Una pasada: toma lo pendiente bajo el lock y lo escribe fuera de él."""
+        with self.lock:
+            pendiente, self._pendiente = self._pendiente, None
+            logs, self._logs = self._logs, []
+        for texto in logs:
+            print(texto)
+        if pendiente is not None and pendiente != self._mostrado:
+            self.lcd.fb_line(0, pendiente[0])
+            self.lcd.fb_line(1, pendiente[1])
+            self.lcd.fb_flush()
+            self._mostrado = pendiente
+
+    def _bucle(self):
+        while True:
+            self.atender()
+            utime.sleep_ms(self.periodo_ms)
+
+    def iniciar(self):
+        _thread.start_new_thread(self._bucle, ())
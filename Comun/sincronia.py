@@ -0,0 +1,260 @@
+# sincronia.py — recuperación de reloj de símbolo para el receptor ASCII
+#
+# El receptor calcula una decisión Goertzel por subtrama (varias por bit) y
+# se la pasa a RecuperadorBits como valor blando s ∈ [-1, 1]:
+#   s = (E1 - E0) / (E1 + E0)  si hay señal, 0 si es ruido.
+# El inicio de trama se fija en el cruce por cero interpolado del flanco
+# F0 -> F1 del start bit; cada bit se decide con las subtramas del centro
+# del bit (25 %–75 %), lejos de los flancos. Los cruces entre bits dentro
+# de la trama corrigen la fase (kp) y el período en subtramas (ki), así un
+# reloj de TX corrido unos % no desalinea los últimos bits.
+# Solo usa aritmética de Python: copiar a la Pico junto con main.py.
+
+REPOSO = 0
+RECIBIENDO = 1
+
+
+class RecuperadorBits:
+    """
+    Trama UART: start (F1) + 8 bits LSB primero + stop (F0).
+    `periodo` = subtramas por bit (puede ser fraccionario).
+    """
+
+    def __init__(self, periodo, bits_datos=8, kp=0.4, ki=0.05, tolerancia=0.1):
+        self.nominal = float(periodo)
+        self.periodo = float(periodo)
+        self.bits_datos = bits_datos
+        self.kp = kp
+        self.ki = ki
+        self.p_min = self.nominal * (1.0 - tolerancia)
+        self.p_max = self.nominal * (1.0 + tolerancia)
+        self.estado = REPOSO
+        self.evento = None      # "start", "ruido", "trama" o "byte" en la última llamada
+        self.t = 0              # índice de la subtrama actual
+        self.s_prev = 0.0
+        self.t0 = 0.0           # inicio (fraccionario) del start bit
+        self.errores_ruido = 0
+        self.errores_trama = 0
+
+    def _iniciar_trama(self, t0):
+        self.estado = RECIBIENDO
+        self.t0 = t0
+        self.bit = 0            # 0 = start, 1..bits_datos = datos, último = stop
+        self.byte = 0
+        self.acum = 0.0
+        self.n_senal = 0
+        self.n_ruido = 0
+        self.evento = "start"
+
+    def paso(self, s):
+        """Procesa una subtrama. Devuelve el byte al cerrar una trama válida, si no None."""
+        t = self.t
+        self.t = t + 1
+        s_prev = self.s_prev
+        self.s_prev = s
+        self.evento = None
+
+        if self.estado == REPOSO:
+            if s > 0 and s_prev <= 0:
+                # Desde ruido no hay dónde interpolar: el flanco cae entre subtramas
+                frac = 0.5 if s_prev == 0 else -s_prev / (s - s_prev)
+                self._iniciar_trama(t - 1 + frac)
+            else:
+                return None
+
+        elif s * s_prev < 0:
+            # Flanco entre bits: error respecto al borde esperado más cercano
+            tc = t - 1 - s_prev / (s - s_prev) - self.t0
+            n = int(tc / self.periodo + 0.5)
+            if n > 0:
+                err = tc - n * self.periodo
+                self.t0 += self.kp * err
+                p = self.periodo + self.ki * err / n
+                self.periodo = min(self.p_max, max(self.p_min, p))
+
+        # Muestreo en el centro del bit
+        pos = t - self.t0
+        if pos >= (self.bit + 0.25) * self.periodo:
+            self._acumular(s)
+        if pos + 1 < (self.bit + 0.75) * self.periodo:
+            return None
+        return self._decidir()
+
+    def _acumular(self, s):
+        if s == 0:
+            self.n_ruido += 1
+        else:
+            self.acum += s
+            self.n_senal += 1
+
+    def _decidir(self):
+        if self.n_ruido >= self.n_senal:
+            self.estado = REPOSO
+            if self.bit > 0:  # un start que era ruido no cuenta como error
+                self.errores_ruido += 1
+                self.evento = "ruido"
+            return None
+        uno = self.acum > 0
+        bit = self.bit
+        self.acum = 0.0
+        self.n_senal = 0
+        self.n_ruido = 0
+        self.bit = bit + 1
+
+        if bit == 0:
+            if not uno:             # falso start
+                self.estado = REPOSO
+            return None
+        if bit <= self.bits_datos:
+            if uno:
+                self.byte |= 1 << (bit - 1)
+            return None
+        # Stop bit: tiene que ser F0
+        self.estado = REPOSO
+        if uno:
+            self.errores_trama += 1
+            self.evento = "trama"
+            return None
+        self.evento = "byte"
+        return self.byte
+
+
+class RecuperadorFlujo(RecuperadorBits):
+    """
+    Mismo seguimiento de reloj, pero para bits seguidos sin start/stop
+    (tramas de Comun/trama.py): arranca en el primer flanco F0 -> F1 del
+    preámbulo y entrega cada bit hasta que la señal se pierde o se llama
+    a soltar().
+    """
+
+    def soltar(self):
+        """Vuelve a reposo: el próximo flanco F0 -> F1 fija de nuevo la fase."""
+        self.estado = REPOSO
+
+    def _decidir(self):
+        if self.n_ruido >= self.n_senal:
+            self.estado = REPOSO
+            self.evento = "ruido"
+            return None
+        uno = self.acum > 0
+        self.acum = 0.0
+        self.n_senal = 0
+        self.n_ruido = 0
+        self.bit += 1
+        return 1 if uno else 0
+
+
+class RecuperadorMFSK(RecuperadorFlujo):
+    """
+    M-FSK: recibe las energías de los M tonos por subtrama. Para ubicar los
+    flancos usa la energía de la mitad alta de tonos contra la baja (el
+    preámbulo va en los tonos extremos, así que da flancos limpios); cada
+    símbolo se decide por el tono con más energía sumada en el centro.
+    Con 2 tonos equivale a RecuperadorFlujo.
+    """
+
+    def __init__(self, periodo, n_tonos, **kw):
+        super().__init__(periodo, **kw)
+        self.n_tonos = n_tonos
+        self.suma = [0.0] * n_tonos
+        self._e = None
+
+    def _iniciar_trama(self, t0):
+        super()._iniciar_trama(t0)
+        for i in range(self.n_tonos):
+            self.suma[i] = 0.0
+
+    def paso_energias(self, energias, umbral):
+        """Procesa una subtrama; devuelve el índice de tono al cerrar un símbolo."""
+        mitad = self.n_tonos // 2
+        bajo = 0.0
+        alto = 0.0
+        maximo = 0.0
+        for i in range(self.n_tonos):
+            e = energias[i]
+            if i < mitad:
+                bajo += e
+            else:
+                alto += e
+            if e > maximo:
+                maximo = e
+        self._e = energias
+        return self.paso(0.0 if maximo <= umbral else (alto - bajo) / (alto + bajo))
+
+    def _acumular(self, s):
+        super()._acumular(s)
+        if s != 0:
+            suma = self.suma
+            for i in range(self.n_tonos):
+                suma[i] += self._e[i]
+
+    def _decidir(self):
+        bit = super()._decidir()
+        suma = self.suma
+        mejor = 0
+        for i in range(1, self.n_tonos):
+            if suma[i] > suma[mejor]:
+                mejor = i
+        for i in range(self.n_tonos):
+            suma[i] = 0.0
+        return None if bit is None else mejor
+
+
+def decision_blanda(e0, e1, umbral):
+    """s ∈ [-1, 1] a partir de las energías Goertzel; 0 si ninguna supera el umbral."""
+    if e0 <= umbral and e1 <= umbral:
+        return 0.0
+    return (e1 - e0) / (e1 + e0)
+
+
+if __name__ == "__main__":
+    # Banco de prueba en el PC: FSK sintética con el reloj del TX corrido,
+    # decodificada con y sin recuperación de reloj.
+    import sys
+    import numpy as np
+    from goertzel import goertzel_np
+
+    FS, F0, F1 = 8350, 2100, 3100
+    rng = np.random.default_rng(0)
+    MENSAJE = b"HOLA MUNDO 0123456789"
+
+    def tx(mensaje, bit_s, fase_s=0.037, snr_db=10.0):
+        bits = []
+        for b in mensaje:
+            bits += [1] + [(b >> i) & 1 for i in range(8)] + [0]
+        t = np.arange(int((len(bits) * bit_s + 2 * fase_s + 0.3) * FS)) / FS
+        idx = np.floor((t - fase_s) / bit_s).astype(int)
+        dentro = (idx >= 0) & (idx < len(bits))
+        b = np.zeros(t.size, dtype=int)
+        b[dentro] = np.array(bits)[idx[dentro]]
+        f = np.where(b == 1, F1, F0)
+        x = np.sin(2 * np.pi * np.cumsum(f) / FS)
+        x[t < fase_s] = 0.0   # silencio (ruido) antes de la primera trama
+        return x + rng.standard_normal(x.size) * 10 ** (-snr_db / 20)
+
+    def decodificar(x, n_sub, bit_s, seguir=True):
+        ks = [F0 * n_sub / FS, F1 * n_sub / FS]
+        frames = x[: x.size // n_sub * n_sub].reshape(-1, n_sub)
+        E = goertzel_np(frames, ks) ** 2
+        umbral = 0.05 * float(np.max(E))
+        rec = RecuperadorBits(FS * bit_s / n_sub, kp=0.4 if seguir else 0.0,
+                              ki=0.05 if seguir else 0.0)
+        salida = bytearray()
+        for e0, e1 in E:
+            b = rec.paso(decision_blanda(e0, e1, umbral))
+            if b is not None:
+                salida.append(b)
+        return bytes(salida)
+
+    print("bit/s  subtr/bit  offset reloj   sin seguimiento   con seguimiento")
+    fallos = 0
+    for bps, n_sub in ((5, 205), (20, 52), (50, 21)):
+        for offset in (-0.05, -0.03, 0.0, 0.03, 0.05):
+            bit_s = (1.0 + offset) / bps   # reloj del TX corrido
+            x = tx(MENSAJE, bit_s)
+            fijo = decodificar(x, n_sub, 1.0 / bps, seguir=False) == MENSAJE
+            pll = decodificar(x, n_sub, 1.0 / bps) == MENSAJE
+            fallos += not pll
+            print(f"{bps:5d}  {FS / bps / n_sub:9.1f}  {offset:+11.0%}   "
+                  f"{'ok' if fijo else 'FALLA':>15}   {'ok' if pll else 'FALLA':>15}")
+    sys.exit(1 if fallos else 0)
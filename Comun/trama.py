@@ -0,0 +1,248 @@
+# trama.py — capa de tramas del enlace FSK (TX, RX de la Pico y simulador)
+#
+#   preámbulo 0x55 0x55 | sync 0x2D 0xD4 | largo | datos (1–255 B) | CRC-16
+#
+# Los bits van LSB primero y seguidos, sin start/stop por byte: un solo
+# sincronismo por mensaje. El preámbulo (1010…) le da flancos al
+# recuperador de reloj antes del sync. CRC-16/CCITT-FALSE (poly 0x1021,
+# init 0xFFFF) sobre largo + datos, transmitido en big-endian.
+# En M-FSK el preámbulo y el sync van igual, en binario con los tonos
+# extremos (0 y M-1), y el resto de la trama en símbolos de log2(M) bits.
+# Con FEC (Comun/fec.py) lo que sigue al sync (largo, datos, CRC) viaja
+# codificado; el preámbulo y el sync no, para poder buscarlos bit a bit.
+# Solo usa bytes/array: copiar a la Pico junto con main.py (y fec.py si
+# se usa FEC).
+
+from array import array
+
+PREAMBULO = b"\x55\x55"
+SYNC = b"\x2d\xd4"
+MAX_DATOS = 255
+CABECERA = len(PREAMBULO) + len(SYNC)  # bytes que van siempre en binario
+BITS_EXTRA = 8 * (CABECERA + 1 + 2)    # sobrecosto por trama
+
+_SYNC_REG = SYNC[0] | (SYNC[1] << 8)  # como queda en el registro LSB primero
+
+
+def _tabla_crc():
+    tabla = array("H", [0] * 256)
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        tabla[i] = crc & 0xFFFF
+    return tabla
+
+
+_TABLA = _tabla_crc()
+
+
+def crc16(datos, crc=0xFFFF):
+    """CRC-16/CCITT-FALSE, por tabla (un acceso por byte)."""
+    for b in datos:
+        crc = ((crc << 8) & 0xFFFF) ^ _TABLA[(crc >> 8) ^ b]
+    return crc
+
+
+def armar_trama(datos):
+    """Bytes listos para transmitir (1 a MAX_DATOS bytes de datos)."""
+    n = len(datos)
+    if not 0 < n <= MAX_DATOS:
+        raise ValueError("la trama lleva de 1 a 255 bytes")
+    cuerpo = bytes([n]) + bytes(datos)
+    crc = crc16(cuerpo)
+    return PREAMBULO + SYNC + cuerpo + bytes([crc >> 8, crc & 0xFF])
+
+
+BUSCANDO = 0
+LARGO = 1
+DATOS = 2
+CRC = 3
+
+
+class DesarmadorTrama:
+    """
+    Recibe bits de a uno (LSB primero) y entrega los datos de cada trama
+    con CRC válido. `soltar` queda en True cuando el enlace vuelve a reposo
+    (trama terminada o F0 sostenido): el receptor puede soltar el reloj de
+    bit y esperar el próximo preámbulo.
+    `fec` ("hamming" o "conv") tiene que coincidir con el del transmisor:
+    después del sync los bits pasan por el decodificador de Comun/fec.py.
+    """
+
+    def __init__(self, fec=None):
+        self.tramas_ok = 0
+        self.errores_crc = 0
+        self.evento = None      # "sync", "ok" o "crc" en la última llamada
+        self.soltar = False
+        self.fec = None
+        if fec is not None:
+            from fec import decodificador
+            self.fec = decodificador(fec)
+        self._buscar()
+
+    def _buscar(self):
+        self.estado = BUSCANDO
+        self.reg = 0
+        self.ceros = 0
+
+    def descartar(self):
+        """Abandona la trama en curso (p. ej. si se perdió la señal)."""
+        self._buscar()
+
+    def paso_simbolo(self, simbolo, bits_por_simbolo):
+        """
+        M-FSK: mientras busca el sync cada símbolo es un bit (mitad alta de
+        tonos = 1); después trae bits_por_simbolo bits, LSB primero.
+        """
+        if self.estado == BUSCANDO:
+            return self.paso(simbolo >> (bits_por_simbolo - 1))
+        for i in range(bits_por_simbolo):
+            datos = self.paso((simbolo >> i) & 1)
+            if self.estado == BUSCANDO:  # trama terminada: el resto es relleno
+                return datos
+        return None
+
+    def _byte_nuevo(self, estado, faltan):
+        self.estado = estado
+        self.acum = 0
+        self.n = 0
+        self.faltan = faltan
+
+    def paso(self, bit):
+        if self.fec is None or self.estado == BUSCANDO:
+            return self._paso(bit)
+        # Con FEC un bit codificado entrega 0 o más bits de información
+        self.evento = None
+        self.soltar = False
+        for b in self.fec.paso(bit):
+            datos = self._paso(b)
+            if self.estado == BUSCANDO:
+                return datos
+        return None
+
+    def _paso(self, bit):
+        self.evento = None
+        self.soltar = False
+        if self.estado == BUSCANDO:
+            self.reg = (self.reg >> 1) | (bit << 15)
+            self.ceros = 0 if bit else self.ceros + 1
+            if self.reg == _SYNC_REG:
+                self.evento = "sync"
+                self._byte_nuevo(LARGO, 1)
+                if self.fec is not None:
+                    self.fec.reiniciar()
+            elif self.ceros >= 16:
+                self.soltar = True
+            return None
+
+        self.acum |= bit << self.n
+        self.n += 1
+        if self.n < 8:
+            return None
+        b = self.acum
+        self.acum = 0
+        self.n = 0
+
+        if self.estado == LARGO:
+            if b == 0:          # sync falso: no hay tramas vacías
+                self._buscar()
+                return None
+            self.datos = bytearray()
+            self.largo = b
+            self._byte_nuevo(DATOS, b)
+            if self.fec is not None:
+                self.fec.esperar(8 * (1 + b + 2))
+            return None
+        if self.estado == DATOS:
+            self.datos.append(b)
+            self.faltan -= 1
+            if self.faltan == 0:
+                self._byte_nuevo(CRC, 2)
+                self.crc = 0
+            return None
+
+        self.crc = (self.crc << 8) | b
+        self.faltan -= 1
+        if self.faltan:
+            return None
+        self._buscar()
+        self.soltar = True
+        if crc16(self.datos, crc16((self.largo,))) != self.crc:
+            self.errores_crc += 1
+            self.evento = "crc"
+            return None
+        self.tramas_ok += 1
+        self.evento = "ok"
+        return bytes(self.datos)
+
+
+def bits_lsb(datos):
+    """Bits de `datos` en orden de transmisión (LSB primero)."""
+    for b in datos:
+        for i in range(8):
+            yield (b >> i) & 1
+
+
+def simbolos(datos, bits_por_simbolo):
+    """Símbolos M-FSK de `datos`: bits LSB primero, el primero en el LSB del símbolo."""
+    return agrupar_bits(bits_lsb(datos), bits_por_simbolo)
+
+
+def agrupar_bits(bits, bits_por_simbolo):
+    """Símbolos de un flujo de bits (p. ej. ya codificado con FEC), el primero en el LSB."""
+    acum = 0
+    n = 0
+    for b in bits:
+        acum |= b << n
+        n += 1
+        if n == bits_por_simbolo:
+            yield acum
+            acum = 0
+            n = 0
+    if n:
+        yield acum
+
+
+def bits_cuerpo(trama, fec=None):
+    """Bits de lo que sigue a la cabecera (largo, datos, CRC), codificados si hay FEC."""
+    if fec is None:
+        return bits_lsb(trama[CABECERA:])
+    from fec import codificar
+    return codificar(bits_lsb(trama[CABECERA:]), fec)
+
+
+if __name__ == "__main__":
+    assert crc16(b"123456789") == 0x29B1  # valor de control del CRC-16/CCITT-FALSE
+    trama = armar_trama(b"HOLA MUNDO")
+    bits = [0] * 20 + list(bits_lsb(trama)) + [0] * 20
+    des = DesarmadorTrama()
+    recibidos = [d for d in (des.paso(b) for b in bits) if d is not None]
+    assert recibidos == [b"HOLA MUNDO"], recibidos
+    bits[20 + 8 * 8] ^= 1  # un bit dañado en los datos
+    des = DesarmadorTrama()
+    assert not [d for d in (des.paso(b) for b in bits) if d is not None]
+    assert des.errores_crc == 1
+    # M-FSK: cabecera binaria en los tonos extremos, el resto en símbolos
+    for k in (1, 2, 3, 4):
+        m = 1 << k
+        sims = [0] * 5 + [(m - 1) * b for b in bits_lsb(trama[:CABECERA])]
+        sims += list(simbolos(trama[CABECERA:], k)) + [0] * 5
+        des = DesarmadorTrama()
+        recibidos = [d for d in (des.paso_simbolo(x, k) for x in sims) if d is not None]
+        assert recibidos == [b"HOLA MUNDO"], (k, recibidos)
+    # FEC: 3 bits dañados en el cuerpo codificado (uno por palabra de
+    # Hamming, separados en el convolucional) se corrigen
+    for fec in ("hamming", "conv"):
+        for k in (1, 2, 4):
+            m = 1 << k
+            cuerpo = list(bits_cuerpo(trama, fec))
+            for i in (5, 40, 90):
+                cuerpo[i] ^= 1
+            sims = [0] * 5 + [(m - 1) * b for b in bits_lsb(trama[:CABECERA])]
+            sims += list(agrupar_bits(cuerpo, k)) + [0] * 5
+            des = DesarmadorTrama(fec)
+            recibidos = [d for d in (des.paso_simbolo(x, k) for x in sims) if d is not None]
+            assert recibidos == [b"HOLA MUNDO"], (fec, k, recibidos)
+    print(f"trama de {len(trama)} B para 10 B de datos: OK (CRC detecta el bit dañado, M-FSK 2–16, "
+          f"FEC corrige 3 bits)")
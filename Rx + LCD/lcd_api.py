@@ -49,6 +49,10 @@ class LcdApi:
         self.cursor_x = 0
         self.cursor_y = 0
         self.implied_newline = False
+        # Shadow framebuffer: 'fb' holds the desired contents, '_shown' what
+        # the LCD currently displays; fb_flush() only sends the differences.
+        self.fb = bytearray(b' ' * (self.num_lines * self.num_columns))
+        self._shown = bytearray(self.fb)
         # --- AQUÍ ESTÁ LA CLAVE ---
         # Tu versión define 'backlight' en la clase base
         self.backlight = True 
@@ -67,6 +71,8 @@ class LcdApi:
         self.hal_write_command(self.LCD_HOME)
         self.cursor_x = 0
         self.cursor_y = 0
+        for i in range(len(self._shown)):
+            self._shown[i] = 0x20
 
     def show_cursor(self):
         # Causes the cursor to be made visible
@@ -125,19 +131,83 @@ class LcdApi:
                 self.cursor_x = self.num_columns
         else:
             self.hal_write_data(ord(char))
+            self._mark_shown(char)
             self.cursor_x += 1
+        self._wrap(char)
+
+    def _mark_shown(self, char):
+        # Keep the shadow copy in sync with direct writes
+        if self.cursor_x < self.num_columns:
+            self._shown[self.cursor_y * self.num_columns + self.cursor_x] = ord(char) & 0xff
+
+    def _wrap(self, char):
+        # The controller auto-increments the address; a move is only needed
+        # when the cursor wraps to the next line.
         if self.cursor_x >= self.num_columns:
             self.cursor_x = 0
             self.cursor_y += 1
             self.implied_newline = (char != '\n')
-        if self.cursor_y >= self.num_lines:
-            self.cursor_y = 0
-        self.move_to(self.cursor_x, self.cursor_y)
+            if self.cursor_y >= self.num_lines:
+                self.cursor_y = 0
+            self.move_to(self.cursor_x, self.cursor_y)
 
     def putstr(self, string):
-        # Write the indicated string to the LCD
-        for char in string:
-            self.putchar(char)
+        # Write the indicated string to the LCD, one buffered write per line run
+        i = 0
+        n = len(string)
+        while i < n:
+            if string[i] == '\n':
+                self.putchar('\n')
+                i += 1
+                continue
+            j = i
+            room = self.num_columns - self.cursor_x
+            while j < n and j - i < room and string[j] != '\n':
+                j += 1
+            self.hal_write_data_buf(string[i:j])
+            for k in range(i, j):
+                self._mark_shown(string[k])
+                self.cursor_x += 1
+            self._wrap(string[j - 1])
+            i = j
+
+    def fb_line(self, line, text):
+        # Sets one line of the framebuffer (padded/truncated to the width);
+        # nothing is sent until fb_flush()
+        cols = self.num_columns
+        base = line * cols
+        n = min(len(text), cols)
+        for i in range(n):
+            self.fb[base + i] = ord(text[i]) & 0xff
+        for i in range(n, cols):
+            self.fb[base + i] = 0x20
+
+    def fb_flush(self):
+        # Writes only the cells that differ from what the LCD shows. Runs
+        # separated by a single equal cell are merged (rewriting one char is
+        # cheaper than another move_to).
+        cols = self.num_columns
+        fb, shown = self.fb, self._shown
+        fb_mv = memoryview(fb)
+        for y in range(self.num_lines):
+            base = y * cols
+            x = 0
+            while x < cols:
+                if fb[base + x] == shown[base + x]:
+                    x += 1
+                    continue
+                start = x
+                end = x + 1
+                while end < cols and (fb[base + end] != shown[base + end] or
+                                      (end + 1 < cols and fb[base + end + 1] != shown[base + end + 1])):
+                    end += 1
+                self.move_to(start, y)
+                self.hal_write_data_buf(fb_mv[base + start:base + end])
+                shown[base + start:base + end] = fb[base + start:base + end]
+                self.cursor_x = end
+                if self.cursor_x >= cols:
+                    self._wrap(' ')
+                x = end
 
     def custom_char(self, location, charmap):
         # Write a character to one of the 8 CGRAM locations
@@ -161,5 +231,11 @@ class LcdApi:
     def hal_write_data(self, data):
         raise NotImplementedError
 
+    def hal_write_data_buf(self, chars):
+        # Default: one hal_write_data per character (str or bytes-like);
+        # the HAL may batch them
+        for char in chars:
+            self.hal_write_data(char if isinstance(char, int) else ord(char))
+
     def hal_sleep_us(self, usecs):
         time.sleep_us(usecs)
\ No newline at end of file
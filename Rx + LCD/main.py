@@ -4,6 +4,8 @@ import utime
 
 import _thread
 
+from trama import armar_trama, bits_lsb, bits_cuerpo, agrupar_bits, CABECERA, MAX_DATOS  # copiar Comun/trama.py a la Pico
+
 
 
 # --- Configuración de Pines ---
@@ -22,6 +24,66 @@ F_ASCII_1 = 3100
 
 BIT_PERIOD_MS = 200 # 200ms por bit
 
+# Modo trama: el mensaje entero va en tramas con preámbulo, largo y CRC-16
+
+# (Comun/trama.py), sin start/stop por byte. El receptor recupera el reloj
+
+# de bit, así que el bit puede ser 4 veces más corto. Tiene que coincidir
+
+# con MODO_TRAMA / BIT_PERIOD_TRAMA_MS del receptor.
+
+MODO_TRAMA = True
+
+BIT_PERIOD_TRAMA_MS = 50
+
+# M-FSK (solo en modo trama): N_TONOS = 2, 4, 8 o 16, log2(N_TONOS) bits por
+
+# símbolo con el mismo BIT_PERIOD_TRAMA_MS. Con 2 tonos se usan F_ASCII_0/1;
+
+# con más, F_MFSK_BASE + i*F_MFSK_PASO (16 tonos llegan a 3825 Hz, debajo de
+
+# FS_REAL/2 del receptor). Los armónicos del piloto caen en la banda: usar
+
+# un piloto bajo. Tiene que coincidir con el receptor.
+
+N_TONOS = 2
+
+F_MFSK_BASE = 1200
+
+F_MFSK_PASO = 175
+
+if N_TONOS == 2:
+
+    F_TONOS = [F_ASCII_0, F_ASCII_1]
+
+else:
+
+    F_TONOS = [F_MFSK_BASE + i * F_MFSK_PASO for i in range(N_TONOS)]
+
+BITS_POR_SIMBOLO = {2: 1, 4: 2, 8: 3, 16: 4}[N_TONOS]
+
+# Corrección de errores (solo en modo trama, Comun/fec.py): None, "hamming"
+
+# (7 bits por cada 4) o "conv" (2 bits por bit, Viterbi en el receptor).
+
+# Para mantener la tasa de información hay que acortar BIT_PERIOD_TRAMA_MS
+
+# en la misma proporción; eso solo conviene con Eb/N0 de ~8 dB o más. Con
+
+# esta FSK no coherente a igual tasa de información (tabla de
+
+# Simulacion/receptores.py, decisión blanda), BER sin FEC / hamming / conv:
+
+# 6.9e-2 / 9.7e-2 / 2.1e-1 a 6 dB, 2.0e-2 / 1.7e-2 / 9.8e-3 a 8 dB y
+
+# 4e-3 / 0 / 0 a 10 dB. Copiar Comun/fec.py a la Pico y usar el mismo FEC
+
+# en el receptor.
+
+FEC = None
+
+F_REPOSO = F_TONOS[0] if MODO_TRAMA else F_ASCII_0  # tono entre mensajes
+
 
 
 print("Transmisor FDM v1.0 (Multihilo PWM)")
@@ -82,6 +144,34 @@ def send_byte_ascii(pwm_obj, byte_val):
 
 
 
+def send_frame(pwm_obj, payload):
+
+    """Envía una trama (preámbulo + sync + largo + datos + CRC), bits LSB primero y seguidos.
+
+    En M-FSK la cabecera va en los tonos extremos y el resto en símbolos de BITS_POR_SIMBOLO bits."""
+
+    trama = armar_trama(payload)
+
+    tonos = [F_TONOS[-1] if bit else F_TONOS[0] for bit in bits_lsb(trama[:CABECERA])]
+
+    tonos += [F_TONOS[s] for s in agrupar_bits(bits_cuerpo(trama, FEC), BITS_POR_SIMBOLO)]
+
+    # Plazos absolutos: el tiempo de freq() no se acumula símbolo a símbolo
+
+    t_bit = utime.ticks_ms()
+
+    for f in tonos:
+
+        pwm_obj.freq(f)
+
+        t_bit = utime.ticks_add(t_bit, BIT_PERIOD_TRAMA_MS)
+
+        utime.sleep_ms(max(0, utime.ticks_diff(t_bit, utime.ticks_ms())))
+
+    pwm_obj.freq(F_TONOS[0])
+
+
+
 def ascii_task():
 
     """Hilo dedicado a manejar la transmisión ASCII."""
@@ -94,7 +184,7 @@ def ascii_task():
 
     pwm_ascii = PWM(Pin(PIN_ASCII))
 
-    pwm_ascii.freq(F_ASCII_0)
+    pwm_ascii.freq(F_REPOSO)
 
     pwm_ascii.duty(512) # 50% duty cycle
 
@@ -132,13 +222,23 @@ def ascii_task():
 
             print("[ASCII Thread] Transmitiendo: '{}'".format(local_message))
 
-            for char in local_message:
+            if MODO_TRAMA:
+
+                datos = local_message.encode()
+
+                for i in range(0, len(datos), MAX_DATOS):
+
+                    send_frame(pwm_ascii, datos[i:i + MAX_DATOS])
+
+            else:
+
+                for char in local_message:
 
-                send_byte_ascii(pwm_ascii, ord(char))
+                    send_byte_ascii(pwm_ascii, ord(char))
 
             print("[ASCII Thread] Transmisión completa. Volviendo a 'idle'.")
 
-            pwm_ascii.freq(F_ASCII_0) # Volver a idle
+            pwm_ascii.freq(F_REPOSO) # Volver a idle
 
             
 
@@ -16,6 +16,9 @@ MASK_E  = 0x04       # P2
 SHIFT_BACKLIGHT = 3  # P3
 SHIFT_DATA      = 4  # P4-P7
 
+# Caracteres por transacción en hal_write_data_buf (4 bytes I2C por carácter)
+BUF_CHARS = 40
+
 class I2cLcd(LcdApi):
     
     # Implements a HD44780 character LCD connected via PCF8574 on I2C
@@ -23,6 +26,10 @@ class I2cLcd(LcdApi):
     def __init__(self, i2c, i2c_addr, num_lines, num_columns):
         self.i2c = i2c
         self.i2c_addr = i2c_addr
+        # Buffer preasignado: todos los strobes E de un string van en un solo writeto
+        self._buf = bytearray(4 * BUF_CHARS)
+        self._mv = memoryview(self._buf)
+        self.i2c_transacciones = 0
         self.i2c.writeto(self.i2c_addr, bytes([0]))
         utime.sleep_ms(20)   # Allow LCD time to powerup
         # Send reset 3 times
@@ -47,49 +54,61 @@ class I2cLcd(LcdApi):
         self.hal_write_command(cmd)
         gc.collect()
 
+    def _write(self, n):
+        # Una sola transacción I2C con los primeros n bytes del buffer
+        self.i2c.writeto(self.i2c_addr, self._mv[:n])
+        self.i2c_transacciones += 1
+
+    def _pack(self, i, value, rs):
+        # Empaqueta un byte HD44780 como 4 escrituras PCF8574 (nibble alto/bajo con strobe E)
+        base = rs | (self.backlight << SHIFT_BACKLIGHT)
+        hi = base | (((value >> 4) & 0x0f) << SHIFT_DATA)
+        lo = base | ((value & 0x0f) << SHIFT_DATA)
+        buf = self._buf
+        buf[i] = hi | MASK_E
+        buf[i + 1] = hi
+        buf[i + 2] = lo | MASK_E
+        buf[i + 3] = lo
+
     def hal_write_init_nibble(self, nibble):
         # Writes an initialization nibble to the LCD.
         byte = ((nibble >> 4) & 0x0f) << SHIFT_DATA
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        gc.collect()
+        self._buf[0] = byte | MASK_E
+        self._buf[1] = byte
+        self._write(2)
         
     def hal_backlight_on(self):
         # Allows the hal layer to turn the backlight on
-        self.i2c.writeto(self.i2c_addr, bytes([1 << SHIFT_BACKLIGHT]))
-        gc.collect()
+        self._buf[0] = 1 << SHIFT_BACKLIGHT
+        self._write(1)
         
     def hal_backlight_off(self):
         # Allows the hal layer to turn the backlight off
-        self.i2c.writeto(self.i2c_addr, bytes([0]))
-        gc.collect()
+        self._buf[0] = 0
+        self._write(1)
         
     def hal_write_command(self, cmd):
         # Write a command to the LCD.
         # Esta función lee 'self.backlight', que fue definido en LcdApi.__init__
-        byte = ((self.backlight << SHIFT_BACKLIGHT) |
-                (((cmd >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        byte = ((self.backlight << SHIFT_BACKLIGHT) |
-                ((cmd & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        self._pack(0, cmd, 0)
+        self._write(4)
         if cmd <= 3:
             # The home and clear commands require a worst case delay of 4.1 msec
             utime.sleep_ms(5)
-        gc.collect()
 
     def hal_write_data(self, data):
         # Write data to the LCD.
-        byte = (MASK_RS |
-                (self.backlight << SHIFT_BACKLIGHT) |
-                (((data >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        byte = (MASK_RS |
-                (self.backlight << SHIFT_BACKLIGHT) |
-                ((data & 0x0f) << SHIFT_DATA))      
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        gc.collect()
\ No newline at end of file
+        self._pack(0, data, MASK_RS)
+        self._write(4)
+
+    def hal_write_data_buf(self, chars):
+        # Write a str or bytes-like with one I2C transaction per BUF_CHARS characters.
+        n = len(chars)
+        i = 0
+        while i < n:
+            k = min(n - i, BUF_CHARS)
+            for j in range(k):
+                c = chars[i + j]
+                self._pack(4 * j, c if isinstance(c, int) else ord(c), MASK_RS)
+            self._write(4 * k)
+            i += k
\ No newline at end of file
@@ -5,6 +5,10 @@ import machine
 import utime
 from ulab import numpy as np
 from pico_i2c_lcd import I2cLcd
+from captura import CapturaADC  # copiar Comun/captura.py a la Pico
+from pantalla import PantallaNucleo1  # copiar Comun/pantalla.py a la Pico
+from dft_deslizante import DFTDeslizante  # copiar Comun/dft_deslizante.py a la Pico
+from cfar import DetectorCFAR, clasificar  # copiar Comun/cfar.py a la Pico
 
 # --- Configuración Hardware RX ---
 ADC_PIN = 26  # GP26 (ADC0)
@@ -30,6 +34,22 @@ FREQ_F1_DISPLAY = 3675 # Frecuencia a mostrar
 
 NOISE_THRESHOLD = 100000.0
 
+# --- Umbral adaptativo (Comun/cfar.py) ---
+# El piso de ruido sale de bins de guarda donde no cae ningún tono ni
+# armónico de los TX (5600-5800 Hz) y hay tono si su magnitud lo supera
+# CFAR_FACTOR veces. NOISE_THRESHOLD solo se usa con UMBRAL_ADAPTIVO = False.
+UMBRAL_ADAPTIVO = True
+CFAR_FACTOR = 5.0
+BIN_GUARDA_START = 224
+BIN_GUARDA_END = 232
+
+# --- Modo incremental (DFT deslizante) ---
+# En vez de una FFT de 512 por cada bloque nuevo, se actualizan solo los
+# bins de F0/F1 cada HOP muestras: decisión cada 5 ms en lugar de 40 ms.
+MODO_INCREMENTAL = True
+HOP = 64          # muestras nuevas por actualización (NFFT debe ser múltiplo)
+RESYNC_HOPS = 64  # cada cuántos saltos se recalcula con FFT (evita deriva)
+
 print(f"Buscando F0 en Bins {BIN_F0_START}-{BIN_F0_END}")
 print(f"Buscando F1 en Bins {BIN_F1_START}-{BIN_F1_END}")
 
@@ -47,10 +67,15 @@ print("Ventana OK.")
 # Variables globales para hardware
 adc = None
 lcd = None
+captura = None  # muestreo por timer (doble buffer), ver Comun/captura.py
+dft_f0 = None  # DFT deslizante de cada rango, ver Comun/dft_deslizante.py
+dft_f1 = None
+dft_guarda = None
+pantalla = None  # LCD y consola en el núcleo 1, ver Comun/pantalla.py
 
 def init_hardware():
     """Inicializa ADC y LCD"""
-    global adc, lcd, I2C_ADDR
+    global adc, lcd, pantalla, I2C_ADDR
     try:
         adc = machine.ADC(machine.Pin(ADC_PIN))
         i2c = machine.I2C(0, sda=machine.Pin(I2C_SDA_PIN), scl=machine.Pin(I2C_SCL_PIN), freq=400000)
@@ -63,20 +88,45 @@ def init_hardware():
         print(f"LCD encontrada en {hex(I2C_ADDR)}")
         lcd = I2cLcd(i2c, I2C_ADDR, 2, 16) 
         lcd.clear()
+        pantalla = PantallaNucleo1(lcd)
+        pantalla.iniciar()
         return True
     except Exception as e:
         print(f"Error fatal de Hardware: {e}")
         return False
 
 def capture_and_window():
-    """Captura NFFT muestras, resta DC y aplica ventana"""
-    global samples_f, window, adc
+    """Toma el último bloque de NFFT muestras del timer, resta DC y aplica ventana"""
+    global samples_f, window, captura
+    if captura is None:
+        captura = CapturaADC(adc, FS, NFFT)
+        captura.iniciar()
+    bloque = captura.leer()
     for i in range(NFFT):
-        samples_f[i] = float(adc.read_u16())
+        samples_f[i] = float(bloque[i])
     mean_val = np.mean(samples_f)
     samples_f = samples_f - mean_val
     return samples_f * window
 
+def capture_incremental():
+    """Toma HOP muestras nuevas y devuelve (mag_f0, mag_f1, guarda) con ventana Blackman"""
+    global captura, dft_f0, dft_f1, dft_guarda
+    if captura is None:
+        captura = CapturaADC(adc, FS, HOP, n_bloques=4)
+        dft_f0 = DFTDeslizante(BIN_F0_START, BIN_F0_END, NFFT, HOP, RESYNC_HOPS)
+        dft_f1 = DFTDeslizante(BIN_F1_START, BIN_F1_END, NFFT, HOP, RESYNC_HOPS)
+        if UMBRAL_ADAPTIVO:
+            dft_guarda = DFTDeslizante(BIN_GUARDA_START, BIN_GUARDA_END, NFFT, HOP, RESYNC_HOPS)
+        captura.iniciar()
+    nuevas = np.array(captura.leer(), dtype=np.float)
+    dft_f0.actualizar(nuevas)
+    dft_f1.actualizar(nuevas)
+    guarda = None
+    if dft_guarda is not None:
+        dft_guarda.actualizar(nuevas)
+        guarda = dft_guarda.magnitudes()
+    return np.max(dft_f0.magnitudes()), np.max(dft_f1.magnitudes()), guarda
+
 def run_detector():
     """Bucle principal del detector FFT con pantalla 'sticky'"""
     global lcd
@@ -92,58 +142,59 @@ def run_detector():
     # --- NUEVO: Contadores para "throttling" de prints ---
     loop_counter = 0
     PRINT_EVERY_N_LOOPS = 10 # Imprime 1 de cada 10 análisis (aprox 2-3 por seg)
+    if MODO_INCREMENTAL:
+        PRINT_EVERY_N_LOOPS *= NFFT // HOP  # mismo ritmo de prints con más análisis
     
+    # Umbral: piso de ruido de los bins de guarda (o NOISE_THRESHOLD fijo)
+    cfar = DetectorCFAR(CFAR_FACTOR) if UMBRAL_ADAPTIVO else None
+
     # Mensaje inicial en LCD
-    lcd.putstr("Iniciando...")
+    pantalla.mostrar("Iniciando...")
     utime.sleep(1)
 
     while True:
         # --- 1. PROCESO DE DEMODULACIÓN (EL TRABAJO REAL) ---
-        windowed_samples = capture_and_window()
-        fft_complex = np.fft.fft(windowed_samples)
-        spectrum = abs(fft_complex)
-        
-        mag_f0 = np.max(spectrum[BIN_F0_START : BIN_F0_END + 1])
-        mag_f1 = np.max(spectrum[BIN_F1_START : BIN_F1_END + 1])
+        if MODO_INCREMENTAL:
+            mag_f0, mag_f1, guarda = capture_incremental()
+        else:
+            windowed_samples = capture_and_window()
+            fft_complex = np.fft.fft(windowed_samples)
+            spectrum = abs(fft_complex[:NFFT // 2 + 1])  # la mitad alta es espejo
+            
+            mag_f0 = np.max(spectrum[BIN_F0_START : BIN_F0_END + 1])
+            mag_f1 = np.max(spectrum[BIN_F1_START : BIN_F1_END + 1])
+            guarda = spectrum[BIN_GUARDA_START : BIN_GUARDA_END + 1]
+        umbral = NOISE_THRESHOLD if cfar is None else cfar.actualizar(guarda)
         
         # --- 2. PRINT DE PROCESO (PARA EL PROFESOR) ---
         loop_counter += 1
         if loop_counter % PRINT_EVERY_N_LOOPS == 0:
             # Este print se ejecuta CADA 10 bucles
             # Demuestra que el RX sigue "vivo" y analizando
-            print(f"Analizando... [Mag F0: {mag_f0:.0f}] [Mag F1: {mag_f1:.0f}]")
+            pantalla.log(f"Analizando... [Mag F0: {mag_f0:.0f}] [Mag F1: {mag_f1:.0f}] [Umbral: {umbral:.0f}]")
         
         # --- 3. LÓGICA DE DECISIÓN ---
-        new_state = 0 # Por defecto, 'Buscando'
-        if mag_f0 > NOISE_THRESHOLD or mag_f1 > NOISE_THRESHOLD:
-            if mag_f0 > mag_f1:
-                new_state = 1 # F0
-            else:
-                new_state = 2 # F1
+        # RUIDO (-1) -> 0 'Buscando', F0 -> 1, F1 -> 2
+        new_state = clasificar(mag_f0, mag_f1, umbral) + 1
         
         # --- 4. LÓGICA DE LCD "STICKY" (SOLO SE ACTUALIZA SI HAY CAMBIOS) ---
         if new_state != current_lcd_state:
-            lcd.clear()
-            
+            # LCD y prints los hace el núcleo 1: la trama siguiente no espera.
             # Este print es el más importante, solo se ejecuta
             # cuando se toma una *nueva decisión*.
-            print("\n------------------------------------")
+            pantalla.log("\n------------------------------------")
             
             if new_state == 0:
-                lcd.putstr("Buscando Tono..")
-                print("DECISIÓN: Ruido detectado. Buscando...")
+                pantalla.mostrar("Buscando Tono..")
+                pantalla.log("DECISIÓN: Ruido detectado. Buscando...")
             elif new_state == 1:
-                lcd.putstr(f"TONO F0 DETECTADO")
-                lcd.move_to(0, 1)
-                lcd.putstr(f"{FREQ_F0_DISPLAY} Hz")
-                print(f"DECISIÓN: Tono F0 Detectado! ({FREQ_F0_DISPLAY} Hz)")
+                pantalla.mostrar(f"TONO F0 DETECTADO", f"{FREQ_F0_DISPLAY} Hz")
+                pantalla.log(f"DECISIÓN: Tono F0 Detectado! ({FREQ_F0_DISPLAY} Hz)")
             elif new_state == 2:
-                lcd.putstr(f"TONO F1 DETECTADO")
-                lcd.move_to(0, 1)
-                lcd.putstr(f"{FREQ_F1_DISPLAY} Hz")
-                print(f"DECISIÓN: Tono F1 Detectado! ({FREQ_F1_DISPLAY} Hz)")
+                pantalla.mostrar(f"TONO F1 DETECTADO", f"{FREQ_F1_DISPLAY} Hz")
+                pantalla.log(f"DECISIÓN: Tono F1 Detectado! ({FREQ_F1_DISPLAY} Hz)")
             
-            print("------------------------------------\n")
+            pantalla.log("------------------------------------\n")
             
             # Actualizar el estado y reiniciar el contador
             current_lcd_state = new_state
@@ -0,0 +1,30 @@
+# _comun.py — acceso a Comun/ (código compartido con el firmware de la Pico)
+#
+# Los módulos de Comun/ se importan planos, como en la Pico (`from trama
+# import ...`), y entre ellos también (trama importa fec), así que no se
+# pueden cargar como paquete. Este es el único lugar del simulador que
+# agrega Comun/ a sys.path: importar _comun antes de `from trama import`
+# o `from fec import`. Como los nombres son genéricos, se verifica que
+# resuelvan a Comun/ y no a otro módulo instalado con el mismo nombre.
+import importlib
+import sys
+from pathlib import Path
+
+RUTA = Path(__file__).resolve().parent.parent / "Comun"
+MODULOS = ("trama", "fec")   # los que usa el simulador
+
+if str(RUTA) not in sys.path:
+    sys.path.append(str(RUTA))
+
+
+def importar(nombre):
+    """Importa Comun/<nombre>.py; ImportError si el nombre lo ocupa otro módulo."""
+    m = importlib.import_module(nombre)
+    origen = getattr(m, "__file__", None)
+    if origen is None or Path(origen).resolve().parent != RUTA:
+        raise ImportError(f"'{nombre}' no es Comun/{nombre}.py sino {origen}")
+    return m
+
+
+for _nombre in MODULOS:
+    importar(_nombre)
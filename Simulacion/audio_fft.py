@@ -1,31 +1,88 @@
+from collections import OrderedDict
 import numpy as np
-import librosa
-import matplotlib.pyplot as plt
 from scipy.signal import find_peaks
+from cache_audio import CacheAudio
+
+class _PlanFFT:
+    """Ventana, eje de frecuencias y buffer con zero-padding para un (n_fft, L, ventana, sr)."""
+    def __init__(self, n_fft, L, window, sr):
+        m = min(L, n_fft)
+        self.m = m
+        self.win = np.hanning(m) if window == "hann" else np.ones(m)
+        self.freq = np.fft.rfftfreq(n_fft, d=1.0/sr)
+        self.win.setflags(write=False)
+        self.freq.setflags(write=False)  # se comparte con quien recibe el resultado
+        # Solo se escriben las primeras m muestras: la cola queda en cero (padding)
+        self.buf = np.zeros(n_fft)
+        self.nbytes = self.win.nbytes + self.freq.nbytes + self.buf.nbytes
+
+
+# LRU de planes acotado en bytes, no en entradas: con n_fft=None un plan
+# cubre el archivo entero (decenas de MB por plan)
+_PLANES = OrderedDict()
+_PLANES_MAX_BYTES = 64 * 1024**2
+_planes_bytes = 0
+
+
+def _fft_plan(n_fft, L, window, sr):
+    """Plan reutilizado si está en el LRU; uno más grande que el límite no se guarda."""
+    global _planes_bytes
+    clave = (n_fft, L, window, sr)
+    plan = _PLANES.get(clave)
+    if plan is not None:
+        _PLANES.move_to_end(clave)
+        return plan
+    plan = _PlanFFT(n_fft, L, window, sr)
+    if plan.nbytes <= _PLANES_MAX_BYTES:
+        _PLANES[clave] = plan
+        _planes_bytes += plan.nbytes
+        while _planes_bytes > _PLANES_MAX_BYTES:
+            _, viejo = _PLANES.popitem(last=False)
+            _planes_bytes -= viejo.nbytes
+    return plan
+
 
 class AudioFFT:
-    def __init__(self, audio_path=None, sr_target=None, n_fft=None, use_hann=True, top_peaks=8):
-        self.audio_path = audio_path or librosa.ex('trumpet')
+    def __init__(self, audio_path=None, sr_target=None, n_fft=None, use_hann=True, top_peaks=8,
+                 cache_dir=None, cache_max_bytes=512 * 1024**2):
+        if audio_path is None:
+            import librosa  # librosa (y numba) solo se carga si se usa
+            audio_path = librosa.ex('trumpet')
+        self.audio_path = audio_path
         self.sr_target = sr_target
         self.n_fft = n_fft
         self.use_hann = use_hann
         self.top_peaks = top_peaks
+        # Caché opcional del audio decodificado (ver cache_audio.py)
+        self.cache = CacheAudio(cache_dir, cache_max_bytes) if cache_dir else None
+
+    def _load(self):
+        if self.cache is not None:
+            return self.cache.load(self.audio_path, self.sr_target)
+        import librosa
+        return librosa.load(self.audio_path, sr=self.sr_target, mono=True)
 
     def analyze(self, window_title="Análisis FFT de Archivo de Audio", show_plot=True):
-        y, sr = librosa.load(self.audio_path, sr=self.sr_target, mono=True)
+        y, sr = self._load()
         # Pasamos el parámetro show_plot al método interno
         return self._analyze_array(y, sr, window_title=window_title, show_plot=show_plot)
 
+    def analyze_stft(self, hop=None, spectrogram=True, memmap_path=None,
+                     window_title="Espectrograma de Archivo de Audio", show_plot=True):
+        y, sr = self._load()
+        return self._stft_array(y, sr, hop=hop, spectrogram=spectrogram, memmap_path=memmap_path,
+                                window_title=window_title, show_plot=show_plot)
+
     def _analyze_array(self, y, sr, window_title="Análisis FFT", show_plot=True):
-        y = y / (np.max(np.abs(y)) + 1e-12)
         L = len(y)
         n_fft = self.n_fft or 1 << (L - 1).bit_length()
-        win = np.hanning(min(L, n_fft)) if self.use_hann else np.ones(min(L, n_fft))
-        xw = y[:len(win)] * win
-        if n_fft > len(xw):
-            xw = np.pad(xw, (0, n_fft - len(xw)))
+        # Ventana, frecuencias y buffer se reutilizan entre llamadas (LRU acotado)
+        plan = _fft_plan(n_fft, L, "hann" if self.use_hann else "rect", sr)
+        xw = plan.buf
+        np.multiply(y[:plan.m], plan.win, out=xw[:plan.m])
+        xw[:plan.m] /= (np.max(np.abs(y)) + 1e-12)
         Y = np.fft.rfft(xw, n=n_fft)
-        freq = np.fft.rfftfreq(n_fft, d=1.0/sr)
+        freq = plan.freq
         mag = np.abs(Y)
         mag_db = 20 * np.log10(mag / (np.max(mag) + 1e-12) + 1e-12)
         phase = np.angle(Y)
@@ -43,7 +100,97 @@ class AudioFFT:
             'freq': freq, 'mag_db': mag_db, 'phase': phase, 'peaks': peaks
         }
 
+    def _stft_array(self, y, sr, hop=None, spectrogram=True, memmap_path=None,
+                    frames_per_block=256, window_title="Espectrograma", show_plot=True):
+        """
+        FFT por tramas de n_fft muestras cada `hop` (por defecto n_fft // 4).
+
+        Las tramas son vistas con strides sobre `y` (sin copias) y se procesan
+        en bloques de `frames_per_block`, así la memoria de trabajo no depende
+        del largo del archivo. El espectrograma (dBFS, float32) se escribe en
+        un .npy mapeado en memoria si se da `memmap_path`.
+
+        Retorna dict con 'freq', 'times', 'peak_freqs' y 'peak_db'
+        (n_frames, top_peaks; NaN si la trama tiene menos picos) y
+        'spectrogram' (n_frames, n_fft//2 + 1) o None.
+        """
+        n_fft = self.n_fft or 4096
+        hop = int(hop or n_fft // 4)
+        y = np.asarray(y)
+        if len(y) < n_fft:
+            y = np.pad(y, (0, n_fft - len(y)))
+        scale = 1.0 / (np.max(np.abs(y)) + 1e-12)
+
+        frames = np.lib.stride_tricks.sliding_window_view(y, n_fft)[::hop]
+        n_frames, n_bins = len(frames), n_fft // 2 + 1
+        win = (np.hanning(n_fft) if self.use_hann else np.ones(n_fft)).astype(np.float32)
+        # 0 dBFS = senoide de amplitud completa
+        ref = 0.5 * float(np.sum(win))
+        freq = np.fft.rfftfreq(n_fft, d=1.0/sr)
+        times = (np.arange(n_frames) * hop + n_fft / 2) / sr
+
+        if memmap_path is not None:
+            spec = np.lib.format.open_memmap(memmap_path, mode="w+", dtype=np.float32,
+                                             shape=(n_frames, n_bins))
+        elif spectrogram:
+            spec = np.empty((n_frames, n_bins), dtype=np.float32)
+        else:
+            spec = None
+
+        K = self.top_peaks
+        peak_freqs = np.full((n_frames, K), np.nan, dtype=np.float32)
+        peak_db = np.full((n_frames, K), np.nan, dtype=np.float32)
+        rows = np.arange(min(frames_per_block, n_frames))[:, None]
+
+        for i0 in range(0, n_frames, frames_per_block):
+            blk = frames[i0:i0 + frames_per_block]
+            xw = blk.astype(np.float32) * (win * np.float32(scale))
+            mag = np.abs(np.fft.rfft(xw, axis=1)).astype(np.float32)
+            mag_db = 20 * np.log10(mag / ref + 1e-12, dtype=np.float32)
+            if spec is not None:
+                spec[i0:i0 + len(blk)] = mag_db
+
+            # Picos locales > -50 dB respecto al máximo de cada trama (sin DC)
+            rel = mag_db - mag_db.max(axis=1, keepdims=True)
+            is_peak = np.zeros_like(mag, dtype=bool)
+            is_peak[:, 1:-1] = (mag[:, 1:-1] > mag[:, :-2]) & (mag[:, 1:-1] >= mag[:, 2:])
+            is_peak &= (rel > -50) & (freq > 1.0)
+            score = np.where(is_peak, mag, -1.0)
+            top = np.argsort(score, axis=1)[:, ::-1][:, :K]
+            r = rows[:len(blk)]
+            valid = score[r, top] > 0
+            peak_freqs[i0:i0 + len(blk)] = np.where(valid, freq[top], np.nan)
+            peak_db[i0:i0 + len(blk)] = np.where(valid, mag_db[r, top], np.nan)
+
+        if isinstance(spec, np.memmap):
+            spec.flush()
+        if show_plot and spec is not None:
+            self._plot_stft(times, freq, spec, peak_freqs, window_title)
+
+        print(f"Samplerate: {sr} Hz")
+        print(f"STFT: {n_frames} tramas de {n_fft} (hop {hop}, df ~= {sr/n_fft:.2f} Hz)")
+
+        return {
+            'freq': freq, 'times': times, 'peak_freqs': peak_freqs,
+            'peak_db': peak_db, 'spectrogram': spec
+        }
+
+    def _plot_stft(self, times, freq, spec, peak_freqs, window_title):
+        import matplotlib.pyplot as plt
+        plt.figure(num=window_title, figsize=(12, 6))
+        plt.imshow(spec.T, origin="lower", aspect="auto", cmap="magma",
+                   extent=[times[0], times[-1], freq[0], freq[-1]], vmin=-100, vmax=0)
+        plt.colorbar(label="Magnitud (dBFS)")
+        plt.plot(times, peak_freqs[:, 0], ".", color="cyan", markersize=3, label="Pico principal")
+        plt.title("Espectrograma (STFT)")
+        plt.xlabel("Tiempo (s)")
+        plt.ylabel("Frecuencia (Hz)")
+        plt.legend(loc="upper right")
+        plt.tight_layout()
+        plt.show()
+
     def _plot(self, freq, mag_db, phase, peaks, window_title):
+        import matplotlib.pyplot as plt
         plt.figure(num=window_title, figsize=(12, 6))
         
         plt.subplot(2, 1, 1)
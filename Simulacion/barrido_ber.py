@@ -0,0 +1,170 @@
+# barrido_ber.py — Barrido Monte-Carlo de BER vs Eb/N0 para la FSK del simulador
+import os
+import time
+import numpy as np
+from math import comb
+from multiprocessing import Pool
+
+from modulacion import ModuladorFSK, simbolos_a_bits
+from demodulador import DemoduladorFSKLote
+from receptores import bandpass_tonos
+
+
+def ber_teorica_bfsk(ebn0_db):
+    """BER de BFSK no coherente con tonos ortogonales: 0.5·exp(-Eb/2N0)."""
+    ebn0 = 10.0 ** (np.asarray(ebn0_db, dtype=float) / 10.0)
+    return 0.5 * np.exp(-ebn0 / 2.0)
+
+
+def ber_teorica_mfsk(ebn0_db, n_tonos):
+    """
+    BER de M-FSK no coherente ortogonal. Probabilidad de error de símbolo
+    Ps = Σ_{n=1}^{M-1} (-1)^{n+1} C(M-1, n)/(n+1) · exp(-n·k·Eb / ((n+1)·N0))
+    y Pb = Ps · (M/2)/(M-1). Con M = 2 es ber_teorica_bfsk.
+    """
+    ebn0 = 10.0 ** (np.asarray(ebn0_db, dtype=float) / 10.0)
+    k = n_tonos.bit_length() - 1
+    ps = sum((-1) ** (n + 1) * comb(n_tonos - 1, n) / (n + 1) * np.exp(-n * k * ebn0 / (n + 1))
+             for n in range(1, n_tonos))
+    return ps * (n_tonos / 2) / (n_tonos - 1)
+
+
+def _ensayo(args):
+    """
+    Un ensayo independiente: bits aleatorios -> (M-)FSK -> AWGN (+piloto) -> demod.
+    Se define a nivel de módulo para que el Pool lo pueda serializar.
+    """
+    ebn0_db, semilla, cfg = args
+    rng = np.random.default_rng(semilla)
+    sr, bit_rate, n_bits = cfg["sr"], cfg["bit_rate"], cfg["bits_por_ensayo"]
+    Nbit = max(1, int(round(sr / bit_rate)))   # muestras por símbolo
+    k = cfg["n_tonos"].bit_length() - 1
+    n_simbolos = -(-n_bits // k)
+
+    bits = rng.integers(0, 2, n_simbolos * k)
+    mod = ModuladorFSK(
+        freq_mensaje=bit_rate,
+        freq_portadora=cfg["fc"],
+        duracion=n_simbolos * Nbit / sr,
+        sr=sr,
+        fft_analyzer=None,
+        freq_dev=cfg["dev"],
+        bits=bits,
+        tx_waveform=cfg["tx_waveform"],
+        n_tonos=cfg["n_tonos"],
+    )
+    mod._generar_senales()
+    mod._modular()
+    x = mod.modulada
+
+    # AWGN: Eb = potencia·Nbit/k (energía por bit en muestras), sigma² = N0/2
+    eb = np.mean(x * x) * Nbit / k
+    n0 = eb / 10.0 ** (ebn0_db / 10.0)
+    x = x + rng.normal(0.0, np.sqrt(n0 / 2.0), len(x))
+
+    if cfg["amp_piloto"] > 0:
+        fase = rng.uniform(0, 2*np.pi)
+        x = x + cfg["amp_piloto"] * np.sin(2*np.pi*cfg["fc_piloto"]*mod.t + fase)
+    if cfg["filtrar"]:
+        x = bandpass_tonos(x, sr, mod.tonos, 0.5 * cfg["dev"], order=6)
+
+    demod = DemoduladorFSKLote(sr, mod.tonos, Nbit)
+    _, simbolos = demod.decidir(x, mod.n_bits)
+    decisiones = simbolos_a_bits(simbolos, k)
+    ref = mod.bits_tx.astype(int)
+    return ebn0_db, int(np.count_nonzero(decisiones != ref)), len(ref)
+
+
+def barrido_ber(ebn0_db=range(0, 13), ensayos=32, bits_por_ensayo=2000,
+                sr=44100, bit_rate=40, fc=2500, dev=300, tx_waveform="cos",
+                fc_piloto=800, amp_piloto=0.0, filtrar=None, n_tonos=2,
+                semilla=1234, procesos=None):
+    """
+    BER vs Eb/N0 por Monte-Carlo. Cada punto promedia `ensayos` ensayos
+    independientes repartidos en un Pool de procesos. Con n_tonos > 2 es
+    M-FSK: bit_rate pasa a ser la tasa de símbolos y los tonos quedan
+    separados 2·dev (elegir dev para que quepan entre 0 y sr/2).
+
+    Las semillas salen de SeedSequence(semilla).spawn(...) por ensayo, así el
+    resultado es idéntico sin importar cuántos procesos se usen.
+    Si amp_piloto > 0 se suma el tono piloto como interferencia; `filtrar`
+    (por defecto, solo cuando hay piloto) aplica el pasabanda del receptor.
+
+    Retorna dict con 'ebn0_db', 'errores', 'bits', 'ber', 'ber_teorica' y
+    'tasa_bits' (bits/s a esa tasa de símbolos).
+    """
+    ebn0_db = np.asarray(list(ebn0_db), dtype=float)
+    if filtrar is None:
+        filtrar = amp_piloto > 0
+    cfg = {
+        "sr": int(sr), "bit_rate": float(bit_rate), "bits_por_ensayo": int(bits_por_ensayo),
+        "fc": float(fc), "dev": float(dev), "tx_waveform": tx_waveform, "n_tonos": int(n_tonos),
+        "fc_piloto": float(fc_piloto), "amp_piloto": float(amp_piloto), "filtrar": bool(filtrar),
+    }
+
+    semillas = np.random.SeedSequence(semilla).spawn(len(ebn0_db) * ensayos)
+    tareas = [(e, semillas[i*ensayos + j], cfg)
+              for i, e in enumerate(ebn0_db) for j in range(ensayos)]
+
+    procesos = procesos or os.cpu_count() or 1
+    if procesos > 1:
+        with Pool(procesos) as pool:
+            resultados = pool.map(_ensayo, tareas, chunksize=max(1, len(tareas) // (4*procesos)))
+    else:
+        resultados = [_ensayo(t) for t in tareas]
+
+    errores = np.zeros(len(ebn0_db), dtype=np.int64)
+    bits = np.zeros(len(ebn0_db), dtype=np.int64)
+    indice = {e: i for i, e in enumerate(ebn0_db)}
+    for e, err, nb in resultados:
+        errores[indice[e]] += err
+        bits[indice[e]] += nb
+
+    return {
+        "ebn0_db": ebn0_db,
+        "errores": errores,
+        "bits": bits,
+        "ber": errores / bits,
+        "ber_teorica": ber_teorica_mfsk(ebn0_db, int(n_tonos)),
+        "tasa_bits": float(bit_rate) * (int(n_tonos).bit_length() - 1),
+    }
+
+
+def imprimir_tabla(res):
+    print(" Eb/N0 (dB) |   errores |       bits |       BER | BER teórica")
+    for e, err, nb, ber, bt in zip(res["ebn0_db"], res["errores"], res["bits"],
+                                   res["ber"], res["ber_teorica"]):
+        print(f" {e:10.1f} | {err:9d} | {nb:10d} | {ber:9.2e} | {bt:9.2e}")
+
+
+def graficar_curva(res, window_title="Curva BER vs Eb/N0"):
+    import matplotlib.pyplot as plt
+    plt.figure(num=window_title, figsize=(8, 5))
+    ber = np.where(res["ber"] > 0, res["ber"], np.nan)  # 0 no se puede dibujar en log
+    plt.semilogy(res["ebn0_db"], ber, "o-", label="Simulada")
+    plt.semilogy(res["ebn0_db"], res["ber_teorica"], "--", label="Teórica FSK no coherente")
+    plt.title("BER vs Eb/N0")
+    plt.xlabel("Eb/N0 (dB)")
+    plt.ylabel("BER")
+    plt.grid(True, which="both", alpha=0.3)
+    plt.legend(loc="best")
+    plt.tight_layout()
+    plt.show()
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    res = barrido_ber()
+    print(f"Barrido completado en {time.perf_counter() - t0:.1f} s "
+          f"con {os.cpu_count()} procesos\n")
+    imprimir_tabla(res)
+
+    # Compromiso M-FSK: misma tasa de símbolos y separación (80 Hz = 2·40
+    # baudios, tonos ortogonales), más bits por símbolo y menos Eb/N0 para la
+    # misma BER, a cambio de M veces el ancho de banda
+    print("\n   M | bits/s | ancho (Hz) | BER @ 6 dB | BER @ 9 dB | teórica @ 9 dB")
+    for m in (2, 4, 8, 16):
+        r = barrido_ber(ebn0_db=(6, 9), ensayos=8, n_tonos=m, dev=40)
+        print(f"  {m:2d} | {r['tasa_bits']:6.0f} | {80 * m:10d} | {r['ber'][0]:10.2e} | "
+              f"{r['ber'][1]:10.2e} | {r['ber_teorica'][1]:10.2e}")
+    graficar_curva(res)
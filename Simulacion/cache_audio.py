@@ -0,0 +1,83 @@
+# cache_audio.py — caché en disco del audio decodificado/remuestreado (.npy mapeado)
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+class CacheAudio:
+    """
+    Guarda el audio mono float32 ya decodificado como .npy y lo devuelve
+    mapeado en memoria (mmap_mode='r'): las corridas siguientes cargan en
+    milisegundos y varios procesos comparten las mismas páginas.
+
+    La clave es (ruta absoluta, mtime, tamaño, sr objetivo); si el archivo
+    cambia, la entrada vieja queda huérfana y la expulsa el LRU. El uso
+    (mtime del .npy) se renueva en cada acierto y, al superar `max_bytes`,
+    se borran primero las entradas menos usadas.
+    """
+    def __init__(self, cache_dir, max_bytes=512 * 1024**2):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _key(self, audio_path, sr_target):
+        st = os.stat(audio_path)
+        raw = f"{os.path.abspath(audio_path)}|{st.st_mtime_ns}|{st.st_size}|{sr_target}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _find(self, key):
+        # El sr real va en el nombre: <clave>_<sr>.npy (sr_target=None conserva el original)
+        for p in self.cache_dir.glob(f"{key}_*.npy"):
+            return p, int(p.stem.rsplit("_", 1)[1])
+        return None, None
+
+    def load(self, audio_path, sr_target=None, loader=None):
+        """
+        Retorna (y, sr) como librosa.load(..., mono=True). `loader` se llama
+        solo en un fallo de caché y debe retornar (y, sr).
+        """
+        key = self._key(audio_path, sr_target)
+        path, sr = self._find(key)
+        if path is not None:
+            os.utime(path)  # renueva el uso para el LRU
+            return np.load(path, mmap_mode="r"), sr
+
+        if loader is None:
+            import librosa
+            loader = lambda p, s: librosa.load(p, sr=s, mono=True)
+        y, sr = loader(audio_path, sr_target)
+        y = np.ascontiguousarray(y, dtype=np.float32)
+
+        path = self.cache_dir / f"{key}_{int(sr)}.npy"
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, y)
+        os.replace(tmp, path)  # atómico: otro proceso nunca ve un .npy a medias
+        self._evict(keep=path)
+        return np.load(path, mmap_mode="r"), int(sr)
+
+    def _evict(self, keep=None):
+        entries = []
+        for p in self.cache_dir.glob("*.npy"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if p == keep:
+                continue
+            try:
+                p.unlink()
+            except OSError:  # ya borrado, o en Windows aún mapeado por otro proceso
+                continue
+            total -= size
+
+    def clear(self):
+        for p in self.cache_dir.glob("*.npy"):
+            p.unlink()
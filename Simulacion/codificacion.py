@@ -0,0 +1,90 @@
+# codificacion.py — texto/bytes <-> bits con np.unpackbits / np.packbits
+#
+# Orden "msb": el de la simulación (texto_a_bits, receptor_texto).
+# Orden "lsb": el del transmisor de la Pico y de Comun/trama.py.
+import numpy as np
+
+ORDENES = {"msb": "big", "lsb": "little"}
+
+
+def _bitorder(orden):
+    try:
+        return ORDENES[orden]
+    except KeyError:
+        raise ValueError("orden debe ser 'msb' o 'lsb'") from None
+
+
+def a_bytes(datos, codificacion="utf-8"):
+    """str (se codifica), bytes, bytearray, memoryview o array uint8 -> array uint8 sin copiar si se puede."""
+    if isinstance(datos, str):
+        datos = datos.encode(codificacion)
+    if isinstance(datos, np.ndarray):
+        return datos.astype(np.uint8, copy=False).ravel()
+    return np.frombuffer(datos, dtype=np.uint8)
+
+
+def texto_a_bits(datos, orden="msb", codificacion="utf-8"):
+    """Bits (uint8 0/1) de un texto o bytes, 8 por byte en el orden pedido."""
+    return np.unpackbits(a_bytes(datos, codificacion), bitorder=_bitorder(orden))
+
+
+def bits_a_bytes(bits, orden="msb"):
+    """Inversa de texto_a_bits para bytes; la cola de menos de 8 bits se descarta."""
+    b = np.asarray(bits)
+    b = b[:len(b) - len(b) % 8]
+    if b.dtype != np.uint8 and b.dtype != np.bool_:
+        b = (b & 1).astype(np.uint8)
+    return np.packbits(b, bitorder=_bitorder(orden)).tobytes()
+
+
+def bits_a_texto(bits, orden="msb", codificacion="utf-8", errores="replace"):
+    """Bits -> str; los bytes inválidos se reemplazan (errores='replace')."""
+    return bits_a_bytes(bits, orden).decode(codificacion, errors=errores)
+
+
+if __name__ == "__main__":
+    # Ida y vuelta de cargas de MB: bucles por bit vs. packbits/unpackbits
+    import time
+    import _comun
+    from trama import armar_trama, bits_lsb
+
+    def _texto_a_bits_bucle(texto):
+        """Como era texto_a_bits: solo ASCII, un bit por iteración."""
+        bits = []
+        for c in texto.encode("ascii"):
+            for i in range(8):
+                bits.append((c >> (7-i)) & 1)
+        return np.array(bits, dtype=int)
+
+    def _bits_a_texto_bucle(bits):
+        """Como armaba el texto receptor_texto: chr() de a 8 bits."""
+        chars = []
+        for i in range(0, len(bits) - (len(bits) % 8), 8):
+            val = 0
+            for b in bits[i:i+8]:
+                val = (val << 1) | int(b)
+            chars.append(chr(val))
+        return ''.join(chars)
+
+    rng = np.random.default_rng(0)
+    for mb in (1, 8):
+        datos = rng.integers(32, 127, mb << 20, dtype=np.uint8).tobytes()
+        texto = datos.decode("ascii")
+        t_bucle = None
+        if mb == 1:
+            t0 = time.perf_counter()
+            ok_bucle = _bits_a_texto_bucle(_texto_a_bits_bucle(texto)) == texto
+            t_bucle = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        ok = all(bits_a_texto(texto_a_bits(texto, o), o) == texto for o in ("msb", "lsb"))
+        t_vec = (time.perf_counter() - t0) / 2
+        bucle = f"bucle {t_bucle:6.2f} s (ok={ok_bucle}) | " if t_bucle else ""
+        print(f"{mb} MB ida y vuelta | {bucle}packbits {t_vec*1e3:6.1f} ms"
+              f" ({mb / t_vec:5.0f} MB/s) | ok={ok}")
+
+    # Mismos bits que el TX de la Pico (LSB primero) y UTF-8 no ASCII
+    trama = armar_trama("¡Hola, ñandú!".encode())
+    assert np.array_equal(texto_a_bits(trama, "lsb"), list(bits_lsb(trama)))
+    assert np.array_equal(_texto_a_bits_bucle("HOLA"), texto_a_bits("HOLA"))
+    assert bits_a_texto(texto_a_bits("¡Hola, ñandú!")) == "¡Hola, ñandú!"
+    print("LSB primero = Comun/trama.bits_lsb, MSB primero = texto_a_bits anterior, UTF-8: OK")
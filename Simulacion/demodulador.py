@@ -0,0 +1,221 @@
+# demodulador.py — demodulación FSK no coherente por lotes (matriz de bits)
+import time
+import numpy as np
+
+
+class DemoduladorFSKLote:
+    """
+    Demodulador FSK no coherente vectorizado.
+
+    La señal se ve como una matriz (n_bits, Nbit) y todas las correlaciones
+    I/Q se hacen con un solo producto matricial contra las referencias
+    apiladas [cos f0, sin f0, cos f1, sin f1, ...]. Da las mismas decisiones
+    que el bucle bit-a-bit de ModuladorFSK._demodular.
+    """
+    def __init__(self, sr, frecuencias, Nbit):
+        self.sr = int(sr)
+        self.frecuencias = tuple(float(f) for f in frecuencias)
+        self.Nbit = int(Nbit)
+        self.scale = 2.0 / self.Nbit
+
+        # Referencias exactas por tamaño de bit: columnas (c_k, s_k) por tono
+        n = np.arange(self.Nbit) / self.sr
+        refs = np.empty((self.Nbit, 2 * len(self.frecuencias)))
+        for k, f in enumerate(self.frecuencias):
+            refs[:, 2*k] = np.cos(2*np.pi*f*n)
+            refs[:, 2*k + 1] = np.sin(2*np.pi*f*n)
+        self.referencias = refs
+
+    def _matriz_bits(self, x, n_bits):
+        """
+        Devuelve (X, cola): X es una vista (..., n_completos, Nbit) sin copia
+        y cola el último segmento incompleto rellenado con 'edge' (o None).
+        """
+        Nbit = self.Nbit
+        n_completos = min(n_bits, x.shape[-1] // Nbit)
+        X = x[..., :n_completos * Nbit].reshape(x.shape[:-1] + (n_completos, Nbit))
+        cola = None
+        if n_completos < n_bits:
+            seg = x[..., n_completos * Nbit:(n_completos + 1) * Nbit]
+            relleno = [(0, 0)] * (x.ndim - 1) + [(0, Nbit - seg.shape[-1])]
+            cola = np.pad(seg, relleno, mode="edge")
+        return X, cola
+
+    def energias(self, x, n_bits=None):
+        """
+        Energía I/Q por bit y por tono, matriz (n_bits, n_tonos). Con un lote
+        de capturas apiladas (n_capturas, n_muestras) da (n_capturas, n_bits, n_tonos).
+        """
+        x = np.asarray(x, dtype=float)
+        if n_bits is None:
+            n_bits = max(1, int(np.ceil(x.shape[-1] / self.Nbit)))
+        X, cola = self._matriz_bits(x, n_bits)
+
+        IQ = np.empty(x.shape[:-1] + (n_bits, self.referencias.shape[1]))
+        n_completos = X.shape[-2]
+        IQ[..., :n_completos, :] = X @ self.referencias
+        if cola is not None:
+            IQ[..., n_completos, :] = cola @ self.referencias
+        IQ *= self.scale
+
+        IQ *= IQ
+        return IQ[..., 0::2] + IQ[..., 1::2]
+
+    def decidir(self, x, n_simbolos=None):
+        """
+        M-FSK: retorna (E, simbolos) con E (n_simbolos, n_tonos) y el índice
+        del tono de mayor energía por símbolo. Con 2 tonos coincide con demodular().
+        """
+        E = self.energias(x, n_simbolos)
+        return E, np.argmax(E, axis=-1)
+
+    def demodular(self, x, n_bits=None):
+        """
+        FSK binaria: retorna (E0, E1, decisiones) con decisión 1 si E1 > E0.
+        """
+        E = self.energias(x, n_bits)
+        E0, E1 = E[..., 0], E[..., 1]
+        decisiones = (E1 > E0).astype(int)
+        return E0, E1, decisiones
+
+    def llr(self, x, n_simbolos=None, varianza_ruido=None, amplitud=None):
+        """
+        Salida blanda: LLR por bit de una captura o de un lote apilado
+        (n_capturas, n_muestras). Ver llr_desde_energias(); retorna
+        (llr, varianza_ruido, amplitud).
+        """
+        return llr_desde_energias(self.energias(x, n_simbolos), varianza_ruido, amplitud)
+
+
+def _log_i0(z):
+    """ln I0(z) sin desbordar: np.i0 hasta z=500, desarrollo asintótico arriba."""
+    z = np.abs(z)
+    chico = np.minimum(z, 500.0)
+    grande = np.maximum(z, 500.0)
+    asint = grande - 0.5 * np.log(2 * np.pi * grande) + np.log1p(1 / (8 * grande) + 9 / (128 * grande**2))
+    return np.where(z < 500.0, np.log(np.i0(chico)), asint)
+
+
+def llr_desde_energias(E, varianza_ruido=None, amplitud=None):
+    """
+    LLR no coherente ln P(b=1|E) / P(b=0|E) a partir de las energías I/Q
+    (..., n_simbolos, n_tonos); positivo = bit 1, igual que E1 > E0.
+
+    Con ruido blanco cada componente I/Q lleva ruido de varianza σ² y el
+    tono transmitido tiene amplitud a, así que la métrica de cada tono es
+    ln I0(a·√E_k / σ²). En BFSK el LLR es la diferencia de las dos; en
+    M-FSK se combinan los M tonos (log-sum-exp) en log2(M) bits por
+    símbolo, MSB primero como bits_a_simbolos.
+
+    Si no se dan, σ² y a se estiman por captura (todos los ejes menos los
+    dos últimos): σ² = media de los tonos no elegidos / 2 (E de ruido
+    vale 2σ²) y a² = media del tono elegido - 2σ².
+    Retorna (llr, varianza_ruido, amplitud); llr tiene forma
+    (..., n_simbolos · log2(M)).
+    """
+    E = np.asarray(E, dtype=float)
+    n_tonos = E.shape[-1]
+    k = n_tonos.bit_length() - 1
+    if 1 << k != n_tonos:
+        raise ValueError("el número de tonos debe ser potencia de 2")
+
+    if varianza_ruido is None or amplitud is None:
+        orden = np.sort(E, axis=-1)
+        ejes = (-2, -1)
+        ruido = orden[..., :-1].mean(axis=ejes) / 2
+        senal = orden[..., -1].mean(axis=-1)
+        if varianza_ruido is None:
+            varianza_ruido = ruido
+        if amplitud is None:
+            amplitud = np.sqrt(np.maximum(senal - 2 * np.asarray(varianza_ruido), 1e-12 * senal))
+    var = np.asarray(varianza_ruido, dtype=float)[..., None, None]
+    a = np.asarray(amplitud, dtype=float)[..., None, None]
+    var = np.maximum(var, 1e-300)
+    metrica = _log_i0(a * np.sqrt(E) / var)         # (..., n_simbolos, M)
+
+    if n_tonos == 2:
+        llr = metrica[..., 1] - metrica[..., 0]
+    else:
+        # Bit j (MSB primero) de cada tono: log-sum-exp de los tonos con 1 menos los con 0
+        bits = (np.arange(n_tonos)[:, None] >> np.arange(k - 1, -1, -1)) & 1   # (M, k)
+        m = metrica[..., :, None]                                               # (..., S, M, 1)
+        con_uno = np.where(bits == 1, m, -np.inf)
+        con_cero = np.where(bits == 0, m, -np.inf)
+        llr = _logsumexp(con_uno, axis=-2) - _logsumexp(con_cero, axis=-2)      # (..., S, k)
+        llr = llr.reshape(llr.shape[:-2] + (-1,))
+    return llr, np.asarray(varianza_ruido), np.asarray(amplitud)
+
+
+def _logsumexp(v, axis):
+    mx = np.max(v, axis=axis, keepdims=True)
+    return np.squeeze(mx, axis=axis) + np.log(np.sum(np.exp(v - mx), axis=axis))
+
+
+if __name__ == "__main__":
+    # Benchmark: bucle por bit vs. producto matricial
+    def _demodular_bucle(x, sr, f0, f1, Nbit, n_bits):
+        """El lazo original de ModuladorFSK._demodular: un bit por vuelta."""
+        n = np.arange(Nbit) / sr
+        c0, s0 = np.cos(2*np.pi*f0*n), np.sin(2*np.pi*f0*n)
+        c1, s1 = np.cos(2*np.pi*f1*n), np.sin(2*np.pi*f1*n)
+        E0 = np.empty(n_bits)
+        E1 = np.empty(n_bits)
+        decisions = np.empty(n_bits, dtype=int)
+        for i in range(n_bits):
+            seg = x[i*Nbit:(i+1)*Nbit]
+            if len(seg) < Nbit:
+                seg = np.pad(seg, (0, Nbit - len(seg)), mode="edge")
+            scale = (2.0 / Nbit)
+            I0 = scale * np.dot(seg, c0); Q0 = scale * np.dot(seg, s0)
+            I1 = scale * np.dot(seg, c1); Q1 = scale * np.dot(seg, s1)
+            E0[i] = I0*I0 + Q0*Q0
+            E1[i] = I1*I1 + Q1*Q1
+            decisions[i] = 1 if E1[i] > E0[i] else 0
+        return E0, E1, decisions
+
+    SR, BIT_RATE, FC, DEV = 44100, 40, 2500, 300
+    NBIT = int(round(SR / BIT_RATE))
+    rng = np.random.default_rng(0)
+
+    for n_bits in (1_000, 20_000):
+        bits = rng.integers(0, 2, n_bits)
+        f_inst = np.repeat(np.where(bits > 0, FC + DEV, FC - DEV), NBIT)
+        x = np.cos(2*np.pi*np.cumsum(f_inst)/SR)[:-NBIT // 3]  # último bit incompleto
+        x += 0.5 * rng.standard_normal(len(x))
+
+        t0 = time.perf_counter()
+        E0_ref, E1_ref, d_ref = _demodular_bucle(x, SR, FC - DEV, FC + DEV, NBIT, n_bits)
+        t_bucle = time.perf_counter() - t0
+
+        demod = DemoduladorFSKLote(SR, (FC - DEV, FC + DEV), NBIT)
+        t0 = time.perf_counter()
+        E0, E1, d = demod.demodular(x, n_bits)
+        t_lote = time.perf_counter() - t0
+
+        err = max(np.max(np.abs(E0 - E0_ref)), np.max(np.abs(E1 - E1_ref)))
+        print(f"n_bits={n_bits:6d} | bucle {t_bucle*1e3:8.1f} ms | lote {t_lote*1e3:7.1f} ms"
+              f" | x{t_bucle/t_lote:5.1f} | decisiones iguales: {np.array_equal(d, d_ref)}"
+              f" | max |dE| = {err:.1e}")
+
+    # Salida blanda: lote de capturas con distinto ruido en una sola llamada;
+    # σ² se estima por captura y el LLR queda calibrado (P(1) ≈ 1/(1+e^-LLR))
+    sigmas = np.array([2.0, 4.0, 6.0, 8.0])
+    n_bits = 3000
+    bits = rng.integers(0, 2, (len(sigmas), n_bits))
+    f_inst = np.repeat(np.where(bits > 0, FC + DEV, FC - DEV), NBIT, axis=1)
+    lote = np.cos(2*np.pi*np.cumsum(f_inst, axis=1)/SR)
+    lote += sigmas[:, None] * rng.standard_normal(lote.shape)
+    demod = DemoduladorFSKLote(SR, (FC - DEV, FC + DEV), NBIT)
+    t0 = time.perf_counter()
+    llr, var, amp = demod.llr(lote)
+    t_llr = time.perf_counter() - t0
+    print(f"LLR de {lote.shape[0]}×{n_bits} bits en {t_llr*1e3:.1f} ms")
+    for s, v, a, l, b in zip(sigmas, var, amp, llr, bits):
+        print(f"  σ={s:3.0f} | σ² I/Q estimada {v:.4f} (teórica {2*s*s/NBIT:.4f}) | a={a:.3f}"
+              f" | BER {np.mean((l > 0) != b):.4f}")
+    print("  LLR       bits  P(1) medida  P(1) del LLR")
+    llr, bits = llr.ravel(), bits.ravel()
+    for lo, hi in ((-8, -2), (-2, -1), (-1, 0), (0, 1), (1, 2), (2, 8)):
+        m = (llr >= lo) & (llr < hi)
+        print(f"  [{lo:+d},{hi:+d})  {m.sum():5d}  {bits[m].mean():11.3f}  {np.mean(1/(1+np.exp(-llr[m]))):12.3f}")
+
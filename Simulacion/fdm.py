@@ -0,0 +1,132 @@
+# fdm.py — Banco FDM de N canales FSK (transmisor y receptor en una sola pasada)
+import time
+import numpy as np
+
+from demodulador import DemoduladorFSKLote
+
+
+class CanalesFDM:
+    """
+    Plan de frecuencias de N canales BFSK: el canal c usa
+    fc_c = fc_inicial + c·espaciado y tonos f0/f1 = fc_c ∓ dev.
+
+    Con ajustar_a_bins=True cada tono se lleva al bin más cercano de una
+    DFT de Nbit muestras (múltiplo de sr/Nbit): así todos los tonos son
+    ortogonales sobre un bit y el receptor puede usar una sola rFFT por bit
+    como banco de filtros para todos los canales.
+    """
+    def __init__(self, sr, bit_rate, n_canales, fc_inicial=1500.0, espaciado=800.0,
+                 dev=200.0, ajustar_a_bins=True):
+        self.sr = int(sr)
+        self.bit_rate = float(bit_rate)
+        self.n_canales = int(n_canales)
+        self.Nbit = max(1, int(round(self.sr / self.bit_rate)))
+
+        fc = fc_inicial + espaciado * np.arange(self.n_canales)
+        tonos = np.stack((fc - dev, fc + dev), axis=1)      # (C, 2)
+        df = self.sr / self.Nbit
+        if ajustar_a_bins:
+            tonos = np.round(tonos / df) * df
+        if tonos.max() >= self.sr / 2 or tonos.min() <= 0:
+            raise ValueError("Los canales FDM no caben entre 0 y sr/2: "
+                             f"{tonos.min():.0f}–{tonos.max():.0f} Hz")
+        # Al redondear a bins, canales con espaciado < 2·dev (o dev < df/2)
+        # pueden terminar con tonos repetidos: dos canales en el mismo bin
+        # se pisan sin que el receptor lo note
+        plano = np.sort(tonos.ravel())
+        repetidos = plano[1:][np.isclose(np.diff(plano), 0.0)]
+        if repetidos.size:
+            raise ValueError("Tonos FDM repetidos tras ajustar a bins de "
+                             f"{df:.1f} Hz: {', '.join(f'{f:.0f}' for f in np.unique(repetidos))} Hz")
+        self.tonos = tonos
+
+        k = tonos / df
+        self.en_bins = bool(np.allclose(k, np.round(k)))
+        self.bins = np.round(k).astype(int)
+
+
+class TransmisorFDM:
+    """Genera los N canales FSK (fase continua) como una sola operación 2-D y los suma."""
+    def __init__(self, canales: CanalesFDM):
+        self.canales = canales
+
+    def transmitir(self, bits):
+        """bits: matriz (C, n_bits) de 0/1. Retorna la señal FDM (n_bits·Nbit,)."""
+        ch = self.canales
+        bits = np.asarray(bits, dtype=int) & 1
+        if bits.ndim != 2 or bits.shape[0] != ch.n_canales:
+            raise ValueError(f"bits debe ser (n_canales={ch.n_canales}, n_bits)")
+
+        f_bit = np.take_along_axis(ch.tonos, bits, axis=1)             # (C, n_bits)
+        # Incremento de fase por muestra; cumsum por canal = fase continua
+        dphi = np.repeat(2 * np.pi * f_bit / ch.sr, ch.Nbit, axis=1)  # (C, N)
+        np.cumsum(dphi, axis=1, out=dphi)
+        np.cos(dphi, out=dphi)
+        return dphi.sum(axis=0) / ch.n_canales
+
+
+class ReceptorFDM:
+    """
+    Demultiplexa todos los canales a la vez. Si los tonos caen en bins,
+    una rFFT por bit (matriz (n_bits, Nbit)) es el banco de filtros; si no,
+    se usa un solo banco de correladores I/Q con los 2·C tonos apilados.
+    """
+    def __init__(self, canales: CanalesFDM, bits_por_bloque=512):
+        self.canales = canales
+        self.bits_por_bloque = int(bits_por_bloque)
+        if not canales.en_bins:
+            self._banco = DemoduladorFSKLote(canales.sr, canales.tonos.ravel(), canales.Nbit)
+
+    def energias(self, x):
+        """Energía I/Q por bit, canal y tono: (n_bits, C, 2)."""
+        ch = self.canales
+        Nbit = ch.Nbit
+        n_bits = len(x) // Nbit
+        if not ch.en_bins:
+            return self._banco.energias(x, n_bits).reshape(n_bits, ch.n_canales, 2)
+
+        X = np.asarray(x[:n_bits * Nbit], dtype=float).reshape(n_bits, Nbit)
+        E = np.empty((n_bits, ch.n_canales, 2))
+        scale = (2.0 / Nbit) ** 2
+        for i in range(0, n_bits, self.bits_por_bloque):  # bloques: memoria acotada
+            S = np.fft.rfft(X[i:i + self.bits_por_bloque], axis=1)[:, ch.bins]
+            E[i:i + self.bits_por_bloque] = scale * (S.real**2 + S.imag**2)
+        return E
+
+    def recibir(self, x):
+        """Retorna decisiones (C, n_bits) de todos los canales."""
+        E = self.energias(x)
+        return (E[..., 1] > E[..., 0]).astype(int).T
+
+
+if __name__ == "__main__":
+    # Throughput agregado a medida que crece el número de canales
+    SR, BIT_RATE, N_BITS = 44100, 40, 400
+    rng = np.random.default_rng(0)
+
+    # Espaciado menor que el ancho de un canal: los tonos se solapan
+    try:
+        CanalesFDM(SR, BIT_RATE, 4, fc_inicial=600, espaciado=300, dev=150)
+        raise AssertionError("CanalesFDM aceptó tonos repetidos")
+    except ValueError as e:
+        print(f"Canales solapados rechazados: {e}")
+
+    print(" canales | bps agregados | tx (ms) | rx (ms) | bits simulados/s | errores")
+    for n_canales in (1, 2, 4, 8, 16, 32):
+        canales = CanalesFDM(SR, BIT_RATE, n_canales, fc_inicial=600, espaciado=600, dev=200)
+        tx, rx = TransmisorFDM(canales), ReceptorFDM(canales)
+        bits = rng.integers(0, 2, (n_canales, N_BITS))
+
+        t0 = time.perf_counter()
+        x = tx.transmitir(bits)
+        t1 = time.perf_counter()
+        x = x + 0.05 * rng.standard_normal(len(x))
+        t2 = time.perf_counter()
+        dec = rx.recibir(x)
+        t3 = time.perf_counter()
+
+        errores = int(np.count_nonzero(dec != bits))
+        bps = n_canales * SR / canales.Nbit
+        sim = bits.size / (t1 - t0 + t3 - t2)
+        print(f" {n_canales:7d} | {bps:13.0f} | {(t1-t0)*1e3:7.1f} | {(t3-t2)*1e3:7.1f}"
+              f" | {sim:16.0f} | {errores}")
@@ -4,7 +4,7 @@ import numpy as np
 
 # Nuevos import requeridos
 from modulacion import TransmisorFSK
-from receptores import receptor_audio, receptor_texto
+from receptores import receptor_audio, receptor_texto, ReceptorTextoStream
 
 if __name__ == "__main__":
     
@@ -21,7 +21,8 @@ if __name__ == "__main__":
     fft_analyzer = AudioFFT(
         audio_path=str(AUDIO_PATH),
         sr_target=44100,
-        n_fft=65536
+        n_fft=65536,
+        cache_dir=BASE_DIR / ".cache_audio"
     )    
 
     punto2_data = None
@@ -52,7 +53,7 @@ if __name__ == "__main__":
     FREQ_DEV    = 300       # Separación f0/f1
 
     TEXTO = "Koki es un sobo"
-    BITS_LEN = len(TEXTO) * 8                     # Número de bits a transmitir
+    BITS_LEN = len(TEXTO.encode()) * 8            # Número de bits a transmitir (UTF-8)
     NBIT = int(round(SAMPLE_RATE / BIT_RATE))     # Muestras por bit
     DURACION = (BITS_LEN * NBIT) / SAMPLE_RATE    # Duración exacta en segundos
 
@@ -81,9 +82,15 @@ if __name__ == "__main__":
         señal_tx,
         modulador_original=mod_texto,
         sr=SAMPLE_RATE,
-        fc_texto=FC_TEXTO,
         dev=FREQ_DEV,
         expected_bits=BITS_LEN
     )
 
+    # === RECEPTOR 2 en streaming (bloques de 4096 muestras) ===
+    print("\n=== RECEPTOR 2 (Texto, streaming) ===")
+    rx_stream = ReceptorTextoStream(SAMPLE_RATE, FC_TEXTO, FREQ_DEV, BIT_RATE)
+    bloques = (señal_tx[i:i+4096] for i in range(0, len(señal_tx), 4096))
+    texto_stream = bytes(rx_stream.decodificar(bloques)).decode("utf-8", errors="replace")
+    print(f"[Receptor 2 stream] Mensaje decodificado: {texto_stream}")
+
     print("\n✅ Simulación completada.\n")
@@ -1,34 +1,223 @@
-# modulacion.py — FSK binaria con opción de portadora cuadrada por bit
+# modulacion.py — FSK binaria o M-aria con opción de portadora cuadrada por símbolo
+import itertools
 import numpy as np
-from audio_fft import AudioFFT
-
-def texto_a_bits(texto: str):
-    bits = []
-    for c in texto.encode("ascii"):
-        for i in range(8):
-            bits.append((c >> (7-i)) & 1)
-    return np.array(bits, dtype=int)
+from typing import TYPE_CHECKING
+from demodulador import DemoduladorFSKLote, llr_desde_energias
+from codificacion import texto_a_bits
+
+# FEC compartido con el firmware de la Pico
+import _comun
+from fec import codificar_np
+
+if TYPE_CHECKING:  # solo para la anotación: el núcleo del módem no importa librosa/matplotlib
+    from audio_fft import AudioFFT
+
+def tonos_mfsk(fc, dev, n_tonos):
+    """Tonos separados 2·dev y centrados en fc; con 2 tonos son fc ± dev."""
+    return fc + dev * (2 * np.arange(n_tonos) - (n_tonos - 1))
+
+def bits_a_simbolos(bits, bits_por_simbolo):
+    """Agrupa bits (MSB primero) en símbolos enteros; la cola se completa con 0."""
+    b = np.asarray(bits, dtype=np.int64) & 1
+    resto = (-len(b)) % bits_por_simbolo
+    if resto:
+        b = np.pad(b, (0, resto))
+    pesos = 1 << np.arange(bits_por_simbolo - 1, -1, -1)
+    return b.reshape(-1, bits_por_simbolo) @ pesos
+
+def simbolos_a_bits(simbolos, bits_por_simbolo):
+    """Inversa de bits_a_simbolos: cada símbolo a sus bits, MSB primero."""
+    s = np.asarray(simbolos, dtype=np.int64)
+    return ((s[:, None] >> np.arange(bits_por_simbolo - 1, -1, -1)) & 1).ravel()
+
+def fsk_cuadrada(frecuencias, Nbit, sr, n=None, out=None, polyblep=False, fase0=0.0):
+    """
+    FSK cuadrada ±1 con fase continua entre símbolos, como la del PWM de la
+    Pico (el contador sigue corriendo al cambiar la frecuencia).
+    `frecuencias`: tono de cada símbolo (Hz), Nbit muestras cada uno; si
+    faltan símbolos para n muestras se repite el último tono. Se escribe en
+    `out` (n muestras, contiguo) sin temporales de tamaño n. `fase0` es la
+    fase inicial en ciclos.
+    polyblep=True suaviza cada salto con un residuo PolyBLEP (menos aliasing
+    de armónicos sobre sr/2); ese camino sí reserva arrays para las muestras
+    vecinas a los flancos.
+    """
+    f = np.asarray(frecuencias, dtype=float)
+    if n is None:
+        n = len(out) if out is not None else len(f) * Nbit
+    if out is None:
+        out = np.empty(n)
+    elif len(out) != n or not out.flags.c_contiguous:
+        raise ValueError("out debe ser un array contiguo de n muestras")
+    n_sim = -(-n // Nbit)
+    if len(f) < n_sim:
+        f = np.pad(f, (0, n_sim - len(f)), mode="edge")
+    dt = f[:n_sim] / sr                       # ciclos por muestra de cada símbolo
+
+    _rampa_fase(out, dt, Nbit, 0, fase0)
+    _fraccion(out)                            # fase en [0, 1)
+    _cuadrada_desde_fase(out, out, dt, Nbit, 0, polyblep)
+    return out
+
+def modular_por_bloques(frecuencias, Nbit, sr, bloque=1 << 16, forma="cos",
+                        polyblep=False, out=None):
+    """
+    Modulador FSK por bloques para transmisiones largas. `frecuencias` es
+    un iterable (puede ser un generador) con el tono de cada símbolo; se
+    emiten bloques float32 de `bloque` muestras (el último con lo que
+    quede) y la fase pasa de un bloque al siguiente módulo un ciclo, así
+    que ni la memoria ni el error de fase crecen con la duración.
+    forma="cos" o "square" (fase continua, PolyBLEP opcional).
+    Con `out` (float32, `bloque` muestras) todos los bloques se escriben
+    ahí: copiarlos si se guardan.
+    """
+    assert forma in ("cos", "square")
+    simbolos = iter(frecuencias)
+    fase_buf = np.empty(bloque)
+    dt = np.empty(bloque // Nbit + 2)         # símbolos que puede tocar un bloque
+    fase = 0.0                                # ciclos, en [0, 1)
+    desde = 0                                 # muestras ya emitidas del símbolo actual
+    while True:
+        k = 0
+        if desde:
+            k = 1                             # dt[0] sigue siendo el símbolo a medias
+        faltan = -(-(desde + bloque) // Nbit) - k
+        nuevos = np.fromiter(itertools.islice(simbolos, faltan), dtype=float, count=-1)
+        dt[k:k + len(nuevos)] = nuevos / sr
+        k += len(nuevos)
+        n = min(bloque, k * Nbit - desde)
+        if n <= 0:
+            return
+        x = fase_buf[:n]
+        fase = _rampa_fase(x, dt[:k], Nbit, desde, fase, acumulada=(forma == "cos"))
+        _fraccion(x)
+        y = np.empty(n, dtype=np.float32) if out is None else out[:n]
+        if forma == "cos":
+            x *= 2 * np.pi
+            np.cos(x, out=y)
+        else:
+            _cuadrada_desde_fase(x, y, dt[:k], Nbit, desde, polyblep)
+        yield y
+        desde = (desde + n) % Nbit
+        if desde:
+            dt[0] = dt[k - 1]
+        if n < bloque:
+            return
+
+def _rampa_fase(out, dt, Nbit, desde=0, fase0=0.0, acumulada=False):
+    """
+    Escribe en `out` la fase (ciclos, sin envolver dentro de cada símbolo)
+    de una FSK que arranca `desde` muestras dentro del primer símbolo con
+    fase fase0; dt = ciclos por muestra de cada símbolo. Devuelve la fase
+    en [0, 1) de la muestra que seguiría a `out`.
+    Con acumulada=True cada muestra ya suma su propio dt, como
+    np.cumsum(f_inst) / sr (la primera vale fase0 + f[0]/sr).
+    """
+    n = len(out)
+    # Fase al inicio de cada símbolo: suma de los anteriores, envuelta
+    inicio = np.empty(len(dt) + 1)
+    inicio[0] = fase0 - desde * dt[0]
+    np.cumsum(dt * Nbit, out=inicio[1:])
+    inicio[1:] += inicio[0]
+    np.mod(inicio, 1.0, out=inicio)
+
+    # Rampa dentro de cada símbolo, directo en out: cabeza a medias,
+    # símbolos completos como vista (símbolos × Nbit) y cola
+    m = np.arange(1, Nbit + 1) if acumulada else np.arange(Nbit)
+    j = s = 0
+    if desde:
+        j = min(n, Nbit - desde)
+        np.multiply(dt[0], m[desde:desde + j], out=out[:j])
+        out[:j] += inicio[0]
+        s = 1
+    llenos = (n - j) // Nbit
+    cuerpo = out[j:j + llenos * Nbit].reshape(llenos, Nbit)
+    np.multiply(dt[s:s + llenos, None], m, out=cuerpo)
+    cuerpo += inicio[s:s + llenos, None]
+    j += llenos * Nbit
+    s += llenos
+    if j < n:
+        np.multiply(dt[s], m[:n - j], out=out[j:])
+        out[j:] += inicio[s]
+
+    s_fin, r = divmod(desde + n, Nbit)
+    fase_fin = inicio[s_fin] + (r * dt[s_fin] if r else 0.0)
+    return fase_fin % 1.0
+
+def _cuadrada_desde_fase(fase, out, dt, Nbit, desde=0, polyblep=False):
+    """Cuadrada ±1 en `out` a partir de la fase en [0, 1) (puede ser el mismo array)."""
+    if polyblep:
+        idx, corr = _polyblep_cuadrada(fase, dt, Nbit, desde)
+    # +1 en la primera mitad del ciclo, -1 en la segunda (signo de sin)
+    np.subtract(0.5, fase, out=fase)
+    np.copysign(1.0, fase, out=out)
+    if polyblep:
+        out[idx] += corr
+
+def _fraccion(x, bloque=8192):
+    """x - floor(x) en el lugar, con un solo temporal de `bloque` muestras (np.mod es ~10x más lento)."""
+    tmp = np.empty(min(bloque, len(x)))
+    for i in range(0, len(x), bloque):
+        seg = x[i:i + bloque]
+        t = tmp[:len(seg)]
+        np.floor(seg, out=t)
+        seg -= t
+
+def _polyblep_cuadrada(fase, dt, Nbit, desde=0):
+    """Índices y corrección PolyBLEP de las muestras a menos de dt de un flanco."""
+    d_max = float(dt.max())
+    idx_todos, corr_todos = [], []
+    # Flanco de subida en fase 0 (+), de bajada en fase 0.5 (-)
+    for desfase, signo in ((0.0, 1.0), (0.5, -1.0)):
+        if desfase:
+            idx = np.flatnonzero(np.abs(fase - 0.5) < d_max)
+        else:
+            idx = np.flatnonzero((fase < d_max) | (fase > 1.0 - d_max))
+        t = np.mod(fase[idx] + desfase, 1.0)  # fase relativa al flanco
+        d = dt[(idx + desde) // Nbit]
+        corr = np.zeros(len(idx))
+        antes = t > 1.0 - d
+        despues = t < d
+        x = t[despues] / d[despues]
+        corr[despues] = 2 * x - x * x - 1.0
+        x = (t[antes] - 1.0) / d[antes]
+        corr[antes] = x * x + 2 * x + 1.0
+        idx_todos.append(idx)
+        corr_todos.append(signo * corr)
+    return np.concatenate(idx_todos), np.concatenate(corr_todos)
 
 class ModuladorFSK:
     """
     BFSK (0 -> f0 = fc - dev, 1 -> f1 = fc + dev) con mensaje NRZ 0/1.
+    Con n_tonos = 4/8/16 es M-FSK: cada símbolo lleva log2(M) bits (MSB
+    primero) y usa uno de M tonos separados 2·dev alrededor de fc. La tasa
+    de símbolos sigue siendo freq_mensaje, así que los bits/s se multiplican.
     Permite elegir la forma de onda transmitida:
       - tx_waveform="cos": coseno clásico a f_inst (por defecto)
-      - tx_waveform="square": onda cuadrada ±1 a f0/f1 por cada bit
+      - tx_waveform="square": onda cuadrada ±1 con fase continua, como el PWM
+        de la Pico (polyblep=True suaviza los flancos)
 
-    Demodulación no coherente por correlación I/Q ventana-a-ventana (Nbit).
+    Demodulación no coherente por correlación I/Q ventana-a-ventana (Nbit):
+    se elige el tono de mayor energía.
     """
     def __init__(self, freq_mensaje, freq_portadora, duracion, sr,
-                 fft_analyzer: AudioFFT, freq_dev=500.0, bits=None,
-                 tx_waveform: str = "cos"):
-        # freq_mensaje se interpreta como bit_rate (bps)
+                 fft_analyzer: "AudioFFT", freq_dev=500.0, bits=None,
+                 tx_waveform: str = "cos", n_tonos: int = 2, polyblep: bool = False):
+        # freq_mensaje se interpreta como bit_rate (bps); en M-FSK, símbolos/s
         self.bit_rate = float(freq_mensaje)
         self.fc = float(freq_portadora)
         self.T = float(duracion)
         self.sr = int(sr)
         self.freq_dev = float(freq_dev)
-        self.f0 = self.fc - self.freq_dev
-        self.f1 = self.fc + self.freq_dev
+        if n_tonos not in (2, 4, 8, 16):
+            raise ValueError("n_tonos debe ser 2, 4, 8 o 16")
+        self.n_tonos = n_tonos
+        self.bits_por_simbolo = n_tonos.bit_length() - 1
+        self.tonos = tonos_mfsk(self.fc, self.freq_dev, n_tonos)
+        if self.tonos[0] <= 0 or self.tonos[-1] >= self.sr / 2:
+            raise ValueError(f"tonos fuera de (0, sr/2): {self.tonos[0]:.0f}–{self.tonos[-1]:.0f} Hz")
+        self.f0 = self.tonos[0]
+        self.f1 = self.tonos[-1]
 
         self.fft_analyzer = fft_analyzer
         self.bits_in = bits  # opcional: lista/array de 0/1
@@ -36,8 +225,8 @@ class ModuladorFSK:
         self.t = np.linspace(0, self.T, int(self.sr * self.T), endpoint=False)
         self.N = len(self.t)
 
-        self.Nbit = max(1, int(round(self.sr / self.bit_rate)))  # muestras por bit
-        self.n_bits = max(1, int(np.ceil(self.N / self.Nbit)))   # nº de bits que caben
+        self.Nbit = max(1, int(round(self.sr / self.bit_rate)))  # muestras por bit (por símbolo)
+        self.n_bits = max(1, int(np.ceil(self.N / self.Nbit)))   # nº de bits (símbolos) que caben
 
         # señales
         self.mensaje = None      # 0/1 NRZ (longitud N)
@@ -45,103 +234,80 @@ class ModuladorFSK:
         self.modulada = None     # señal FSK transmitida (cos o cuadrada)
         self.demodulada = None   # 0/1 recuperado (escalones)
         self.demod_soft = None   # métrica suave opcional
+        self.bits_rx = None      # bits recuperados (uno por bit, sin escalones)
+        self.llr_rx = None       # LLR por bit, ln P(1)/P(0) (llr_desde_energias)
 
         # nueva opción de forma de onda TX
         assert tx_waveform in ("cos", "square")
         self.tx_waveform = tx_waveform
+        self.polyblep = polyblep
 
     # ----------------- helpers -----------------
     def _build_bits_aligned(self):
         """Genera vector de bits (0/1) alineado con la ventana de decisión."""
+        n = self.n_bits * self.bits_por_simbolo
         if self.bits_in is None:
             # Patrón 0,1,0,1,... por simplicidad de demo
-            bits = (np.arange(self.n_bits) & 1).astype(int)
+            bits = (np.arange(n) & 1).astype(int)
         else:
             b = np.array(self.bits_in, dtype=int) & 1
-            if len(b) < self.n_bits:
-                reps = int(np.ceil(self.n_bits / len(b)))
-                bits = np.tile(b, reps)[:self.n_bits]
+            if len(b) < n:
+                reps = int(np.ceil(n / len(b)))
+                bits = np.tile(b, reps)[:n]
             else:
-                bits = b[:self.n_bits]
+                bits = b[:n]
         return bits
 
     # ----------------- pipeline -----------------
     def _generar_senales(self):
         bits = self._build_bits_aligned()
+        simbolos = bits_a_simbolos(bits, self.bits_por_simbolo)
 
-        # NRZ 0/1 perfectamente alineada a Nbit (para graficar y FFT del mensaje)
-        msg = np.repeat(bits, self.Nbit)
+        # NRZ 0/1 (0..M-1 en M-FSK) alineada a Nbit (para graficar y FFT del mensaje)
+        msg = np.repeat(simbolos, self.Nbit)
         if len(msg) < self.N:
             msg = np.pad(msg, (0, self.N - len(msg)), mode="edge")
         else:
             msg = msg[:self.N]
         self.mensaje = msg.astype(float)
         self.bits_tx = bits.astype(float)
+        self.simbolos_tx = simbolos
 
         # Portadora de referencia (solo para trazar)
         self.portadora = np.cos(2 * np.pi * self.fc * self.t)
 
-    def _modular(self):
+    def _modular(self, out=None):
         """
         Si tx_waveform='cos': coseno a f_inst con fase continua.
-        Si tx_waveform='square': por cada bit se genera un segmento cuadrado ±1
-        a f0 (bit=0) o f1 (bit=1), y se concatenan los Nbit samples.
+        Si tx_waveform='square': cuadrada ±1 con fase continua (fsk_cuadrada),
+        con flancos PolyBLEP si polyblep=True.
+        `out` (opcional, N muestras) recibe la señal sin reservar otra.
         """
         if self.tx_waveform == "cos":
-            # FSK clásica variando frecuencia instantánea con fase continua
-            f_bit = np.where(self.bits_tx > 0.5, self.f1, self.f0)
-            f_inst = np.repeat(f_bit, self.Nbit)
-            if len(f_inst) < self.N:
-                f_inst = np.pad(f_inst, (0, self.N - len(f_inst)), mode="edge")
-            else:
-                f_inst = f_inst[:self.N]
-
-            phase = 2 * np.pi * np.cumsum(f_inst) / self.sr
-            self.modulada = np.cos(phase)
+            # FSK clásica con fase continua; la fase se arma por símbolo
+            # (sin f_inst de largo N) y se envuelve a un ciclo. Misma
+            # convención que 2π·cumsum(f_inst)/sr: la muestra 0 vale f[0]/sr
+            phase = np.empty(self.N) if out is None else out
+            _rampa_fase(phase, self.tonos[self.simbolos_tx] / self.sr, self.Nbit, acumulada=True)
+            _fraccion(phase)
+            phase *= 2 * np.pi
+            self.modulada = np.cos(phase, out=phase)
 
         else:  # tx_waveform == "square"
-            # Construcción pieza a pieza por bit (fase se reinicia por bit)
-            x = np.empty(self.n_bits * self.Nbit, dtype=float)
-            for i in range(self.n_bits):
-                f = self.f1 if self.bits_tx[i] > 0.5 else self.f0
-                n = np.arange(self.Nbit) / self.sr
-                # cuadrada ±1; evito 0 exacto con eps para consistencia
-                seg = np.sign(np.sin(2 * np.pi * f * n))
-                seg[seg == 0] = 1.0
-                x[i*self.Nbit:(i+1)*self.Nbit] = seg
-            # Ajuste a longitud N
-            if len(x) < self.N:
-                x = np.pad(x, (0, self.N - len(x)), mode="edge")
-            else:
-                x = x[:self.N]
-            self.modulada = x
+            self.modulada = fsk_cuadrada(self.tonos[self.simbolos_tx], self.Nbit, self.sr,
+                                         n=self.N, out=out, polyblep=self.polyblep)
 
     def _demodular(self):
         x = self.modulada
         Nbit = self.Nbit
         n_bits = self.n_bits
 
-        # Referencias exactas por tamaño de bit (evita desalineación)
-        n = np.arange(Nbit) / self.sr
-        c0, s0 = np.cos(2*np.pi*self.f0*n), np.sin(2*np.pi*self.f0*n)
-        c1, s1 = np.cos(2*np.pi*self.f1*n), np.sin(2*np.pi*self.f1*n)
-
-        E0 = np.empty(n_bits)
-        E1 = np.empty(n_bits)
-        decisions = np.empty(n_bits, dtype=int)
-
-        for i in range(n_bits):
-            seg = x[i*Nbit:(i+1)*Nbit]
-            if len(seg) < Nbit:
-                seg = np.pad(seg, (0, Nbit - len(seg)), mode="edge")
-
-            # Correlación I/Q normalizada
-            scale = (2.0 / Nbit)
-            I0 = scale * np.dot(seg, c0); Q0 = scale * np.dot(seg, s0)
-            I1 = scale * np.dot(seg, c1); Q1 = scale * np.dot(seg, s1)
-            E0[i] = I0*I0 + Q0*Q0
-            E1[i] = I1*I1 + Q1*Q1
-            decisions[i] = 1 if E1[i] > E0[i] else 0
+        # Correlación I/Q de todos los símbolos contra los M tonos en un solo
+        # producto; se queda el tono de mayor energía
+        demod = DemoduladorFSKLote(self.sr, self.tonos, Nbit)
+        E, decisions = demod.decidir(x, n_bits)
+        self.bits_rx = simbolos_a_bits(decisions, self.bits_por_simbolo)
+        self.llr_rx, _, _ = llr_desde_energias(E)
 
         # Señal recuperada como escalones 0/1
         demod_bits = np.repeat(decisions, Nbit)
@@ -151,12 +317,17 @@ class ModuladorFSK:
             demod_bits = demod_bits[:self.N]
         self.demodulada = demod_bits.astype(float)
 
-        # Métrica "suave" (debug)
-        self.demod_soft = (E1 - E0) / (np.abs(E1) + np.abs(E0) + 1e-12)
+        # Métrica "suave" (debug): en M-FSK, fracción de energía del tono elegido
+        if self.n_tonos == 2:
+            E0, E1 = E[:, 0], E[:, 1]
+            self.demod_soft = (E1 - E0) / (np.abs(E1) + np.abs(E0) + 1e-12)
+        else:
+            self.demod_soft = np.max(E, axis=1) / (np.sum(E, axis=1) + 1e-12)
 
         # Debug corto
         print("FSK DEBUG -> Nbit:", Nbit,
-              "f0/f1:", self.f0, self.f1,
+              "tonos:" if self.n_tonos > 2 else "f0/f1:",
+              *(self.tonos if self.n_tonos > 2 else (self.f0, self.f1)),
               "TX:", self.tx_waveform)
         print("Decisiones (primeros 12 bits):", decisions[:12])
 
@@ -195,8 +366,10 @@ class TransmisorFSK:
     def __init__(self, sr):
         self.sr = sr
 
-    def transmitir(self, texto_ascii, duracion, fc_texto, fc_piloto, dev, bit_rate):
-        bits = texto_a_bits(texto_ascii)
+    def transmitir(self, texto_ascii, duracion, fc_texto, fc_piloto, dev, bit_rate, n_tonos=2, fec=None):
+        # Con fec ("hamming" o "conv", Comun/fec.py) se transmiten
+        # fec.largo_codificado(bits) bits: `duracion` tiene que alcanzarles
+        bits = codificar_np(texto_a_bits(texto_ascii), fec)
 
         # 1) Generar señal FSK para el mensaje de texto
         mod_texto = ModuladorFSK(
@@ -207,7 +380,8 @@ class TransmisorFSK:
             fft_analyzer=None,
             freq_dev=dev,
             bits=bits,
-            tx_waveform="cos"
+            tx_waveform="cos",
+            n_tonos=n_tonos
         )
         mod_texto._generar_senales()
         mod_texto._modular()
@@ -221,3 +395,68 @@ class TransmisorFSK:
 
         return t, señal_tx, mod_texto
 
+
+
+if __name__ == "__main__":
+    # Benchmark de la cuadrada: bucle por símbolo (fase reiniciada) vs.
+    # fsk_cuadrada (fase continua, en un buffer ya reservado)
+    import time
+    SR, FC, DEV = 44100, 2500, 300
+    rng = np.random.default_rng(0)
+
+    def _cuadrada_por_simbolo(frecuencias, Nbit, sr):
+        """Cuadrada de antes: un segmento por símbolo y la fase vuelve a 0 en cada uno."""
+        x = np.empty(len(frecuencias) * Nbit, dtype=float)
+        n = np.arange(Nbit) / sr
+        for i, f in enumerate(frecuencias):
+            seg = np.sign(np.sin(2 * np.pi * f * n))
+            seg[seg == 0] = 1.0
+            x[i*Nbit:(i+1)*Nbit] = seg
+        return x
+
+    def fuera_de_banda(x, lo, hi):
+        X = np.abs(np.fft.rfft(x * np.blackman(len(x)))) ** 2
+        fr = np.fft.rfftfreq(len(x), 1 / SR)
+        return 10 * np.log10(X[(fr > lo) & (fr < hi)].sum() / X.sum())
+
+    for bit_rate in (40, 120):
+        nbit = int(round(SR / bit_rate))
+        f = np.where(rng.integers(0, 2, 5_000) > 0, FC + DEV, FC - DEV)
+        out = np.empty(len(f) * nbit)
+        t0 = time.perf_counter()
+        ref = _cuadrada_por_simbolo(f, nbit, SR)
+        t_bucle = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        fsk_cuadrada(f, nbit, SR, out=out)
+        t_vec = time.perf_counter() - t0
+        suave = fsk_cuadrada(f, nbit, SR, polyblep=True)
+        # Entre la fundamental y el 3er armónico: salpicado de los saltos de fase y aliasing
+        lo, hi = FC + DEV + 800, 3 * (FC - DEV) - 800
+        print(f"{bit_rate:4d} bps | bucle {t_bucle*1e3:6.1f} ms | vectorizado {t_vec*1e3:5.1f} ms"
+              f" | x{t_bucle/t_vec:4.1f} | {lo}-{hi} Hz: bucle {fuera_de_banda(ref, lo, hi):6.1f} dB,"
+              f" continua {fuera_de_banda(out, lo, hi):6.1f} dB, PolyBLEP {fuera_de_banda(suave, lo, hi):6.1f} dB")
+
+    # Transmisión larga por bloques: memoria constante y fase exacta al final
+    import tracemalloc
+    MIN, BIT_RATE, BLOQUE = 20, 40, 1 << 16
+    nbit = SR // BIT_RATE
+    tonos = np.where(rng.integers(0, 2, MIN * 60 * BIT_RATE) > 0, FC + DEV, FC - DEV)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    n_total, ultimo = 0, None
+    for blq in modular_por_bloques(tonos.tolist(), nbit, SR, BLOQUE):
+        n_total += len(blq)
+        ultimo = blq
+    t_bloques = time.perf_counter() - t0
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # Fase exacta de las últimas muestras con enteros: ciclos = Σ f·n / sr
+    p = np.arange(n_total - len(ultimo), n_total)
+    sim, dentro = p // nbit, p % nbit
+    previos = np.concatenate(([0], np.cumsum(tonos.astype(np.int64) * nbit)))
+    fase = ((previos[sim] + tonos[sim] * (dentro + 1)) % SR) / SR
+    err = np.max(np.abs(ultimo - np.cos(2 * np.pi * fase)))
+    print(f"{MIN} min por bloques: {n_total/1e6:.1f} M muestras en {t_bloques:.1f} s | "
+          f"pico de memoria {pico/1e6:.1f} MB (la señal completa en float64: {n_total*8/1e6:.0f} MB) | "
+          f"error del último bloque {err:.1e}")
+
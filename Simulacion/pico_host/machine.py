@@ -0,0 +1,217 @@
+# machine.py — periféricos simulados del RP2040 para correr el firmware en el PC
+#
+# ADC lee una señal NumPy (o WAV) en el instante virtual de cada lectura,
+# PWM registra los cambios de frecuencia/duty con su marca de tiempo e I2C
+# guarda cada transacción. Todo se configura con configurar() antes de
+# importar el firmware y se consulta en ESTADO después.
+
+import numpy as np
+
+import utime
+from utime import RELOJ, FinSimulacion
+
+
+class _Estado:
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.senal = None          # muestras u16 (np.uint16)
+        self.fs_senal = 1
+        self.al_terminar = "fin"   # "fin" -> FinSimulacion, "silencio" -> 32768
+        self.coste_adc_us = 2      # conversión del ADC del RP2040 ≈ 2 µs
+        self.lecturas_adc = 0
+        self.i2c_dispositivos = [0x27]
+        self.i2c_log = []          # (t_us, addr, bytes)
+        self.i2c_bytes = 0
+        self.pwm_log = {}          # pin -> [(t_us, "freq"/"duty", valor)]
+
+
+ESTADO = _Estado()
+
+
+def a_u16(x, amplitud=12000.0, offset=32768.0):
+    """Señal float (≈ ±1) a cuentas del ADC de 16 bits."""
+    return np.clip(np.round(offset + amplitud * np.asarray(x, dtype=float)), 0, 65535).astype(np.uint16)
+
+
+def configurar(senal=None, fs_senal=None, wav=None, amplitud=12000.0, al_terminar="fin",
+               coste_ticks_us=1, coste_adc_us=2, factor_cpu=0.0,
+               i2c_dispositivos=(0x27,), limite_s=None):
+    """Reinicia el reloj virtual y los periféricos y carga la señal del ADC."""
+    ESTADO.reiniciar()
+    RELOJ.reiniciar(coste_ticks_us=coste_ticks_us, factor_cpu=factor_cpu)
+    if wav is not None:
+        from scipy.io import wavfile
+        fs_senal, datos = wavfile.read(wav)
+        if datos.ndim > 1:
+            datos = datos.mean(axis=1)
+        if datos.dtype.kind in "iu":
+            datos = datos / float(np.iinfo(datos.dtype).max)
+        senal = datos
+    if senal is not None:
+        senal = np.asarray(senal)
+        ESTADO.senal = senal if senal.dtype == np.uint16 else a_u16(senal, amplitud)
+        ESTADO.fs_senal = int(fs_senal)
+    ESTADO.al_terminar = al_terminar
+    ESTADO.coste_adc_us = coste_adc_us
+    ESTADO.i2c_dispositivos = list(i2c_dispositivos)
+    RELOJ.limite_us = None if limite_s is None else int(limite_s * 1_000_000)
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+
+    def __init__(self, id, mode=None, pull=None, value=None):
+        self.id = id
+        self._valor = value or 0
+
+    def value(self, v=None):
+        if v is None:
+            return self._valor
+        self._valor = 1 if v else 0
+
+    def on(self):
+        self._valor = 1
+
+    def off(self):
+        self._valor = 0
+
+
+class ADC:
+    def __init__(self, pin):
+        self.pin = pin
+
+    def read_u16(self):
+        RELOJ.avanzar(ESTADO.coste_adc_us)
+        ESTADO.lecturas_adc += 1
+        if ESTADO.senal is None:
+            return 32768
+        i = RELOJ.us * ESTADO.fs_senal // 1_000_000
+        if i >= len(ESTADO.senal):
+            if ESTADO.al_terminar == "fin":
+                raise FinSimulacion(RELOJ.us)
+            return 32768
+        return int(ESTADO.senal[i])
+
+
+def _pin_id(pin):
+    return pin.id if isinstance(pin, Pin) else pin
+
+
+class PWM:
+    def __init__(self, pin, freq=None, duty_u16=None):
+        self.pin = _pin_id(pin)
+        self._freq = 0
+        self._duty = 0
+        self.log = ESTADO.pwm_log.setdefault(self.pin, [])
+        if freq is not None:
+            self.freq(freq)
+        if duty_u16 is not None:
+            self.duty_u16(duty_u16)
+
+    def freq(self, f=None):
+        if f is None:
+            return self._freq
+        self._freq = int(f)
+        self.log.append((RELOJ.us, "freq", self._freq))
+
+    def duty_u16(self, d=None):
+        if d is None:
+            return self._duty
+        self._duty = int(d)
+        self.log.append((RELOJ.us, "duty", self._duty))
+
+    def duty(self, d=None):
+        # API de 10 bits (0–1023) que usa el transmisor
+        if d is None:
+            return self._duty >> 6
+        self.duty_u16(int(d) << 6)
+
+    def deinit(self):
+        self.duty_u16(0)
+
+
+class I2C:
+    def __init__(self, id, scl=None, sda=None, freq=400000):
+        self.id = id
+        self.freq = int(freq)
+
+    def scan(self):
+        return list(ESTADO.i2c_dispositivos)
+
+    def writeto(self, addr, buf, stop=True):
+        buf = bytes(buf)
+        if addr not in ESTADO.i2c_dispositivos:
+            raise OSError(19)  # ENODEV, como en MicroPython
+        ESTADO.i2c_log.append((RELOJ.us, addr, buf))
+        ESTADO.i2c_bytes += len(buf)
+        # start + dirección + datos, 9 ciclos de reloj por byte (con ACK)
+        RELOJ.avanzar(9 * (len(buf) + 1) * 1_000_000 // self.freq)
+        return len(buf)
+
+
+def senal_pwm(pin, fs, duracion_s=None, t0_us=0):
+    """
+    Reconstruye la onda cuadrada 0/1 que emitió un PWM a partir de su log,
+    para alimentar con ella el ADC de otro firmware.
+    """
+    log = ESTADO.pwm_log.get(_pin_id(pin), [])
+    fin_us = RELOJ.us if duracion_s is None else t0_us + int(duracion_s * 1_000_000)
+    n = max(0, (fin_us - t0_us) * fs // 1_000_000)
+    t_us = t0_us + np.arange(n) * 1_000_000 // fs
+    x = np.zeros(n)
+    freq, duty, t_prev = 0, 0, t0_us
+    fase = 0.0
+    for t_evt, tipo, valor in log + [(fin_us, None, None)]:
+        sel = (t_us >= t_prev) & (t_us < t_evt)
+        if freq > 0 and duty > 0 and np.any(sel):
+            ciclo = (fase + freq * (t_us[sel] - t_prev) / 1e6) % 1.0
+            x[sel] = ciclo < duty / 65536.0
+        fase = (fase + freq * (t_evt - t_prev) / 1e6) % 1.0
+        t_prev = t_evt
+        if tipo == "freq":
+            freq = valor
+        elif tipo == "duty":
+            duty = valor
+    return x
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, mode=PERIODIC, freq=None, period=None, callback=None):
+        self.callback = None
+        if callback is not None:
+            self.init(mode=mode, freq=freq, period=period, callback=callback)
+
+    def init(self, mode=PERIODIC, freq=None, period=None, callback=None):
+        self.deinit()
+        # period en ms como en MicroPython; el período se guarda en µs
+        self.periodo_us = max(1, round(1_000_000 / freq) if freq else int(period * 1000))
+        self.una_vez = (mode == Timer.ONE_SHOT)
+        self.callback = callback
+        self.proximo_us = RELOJ.us + self.periodo_us
+        RELOJ.timers.append(self)
+
+    def deinit(self):
+        if self in RELOJ.timers:
+            RELOJ.timers.remove(self)
+
+
+def idle():
+    """Espera la próxima interrupción: salta el reloj hasta el siguiente timer."""
+    prox = RELOJ.proximo_timer()
+    RELOJ.avanzar(max(1, prox - RELOJ.us) if prox is not None else 1000)
+
+
+def freq():
+    return 125_000_000
+
+
+def reset():
+    raise FinSimulacion(RELOJ.us)
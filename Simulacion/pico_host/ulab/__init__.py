@@ -0,0 +1,2 @@
+# ulab — en el PC, `from ulab import numpy as np` se resuelve con NumPy
+from . import numpy
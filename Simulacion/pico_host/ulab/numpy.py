@@ -0,0 +1,6 @@
+# ulab/numpy.py — subconjunto de ulab.numpy que usan los receptores, sobre NumPy
+from numpy import *  # noqa: F401,F403
+import numpy as _np
+
+fft = _np.fft
+float = _np.float64  # ulab conserva np.float, NumPy lo quitó
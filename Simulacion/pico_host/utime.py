@@ -0,0 +1,154 @@
+# utime.py — reloj virtual que reemplaza a utime de MicroPython en el PC
+#
+# El tiempo solo avanza por lo que hace el firmware: sleep_*, lecturas de
+# ADC, transferencias I2C y un costo fijo por cada ticks_*(). Opcionalmente
+# (factor_cpu > 0) también por el tiempo de CPU del host entre llamadas.
+#
+# Espera activa: el patrón
+#     while utime.ticks_diff(t_obj, utime.ticks_us()) > 0: pass
+# se detecta porque el segundo argumento es el tick recién leído; la
+# siguiente lectura salta directo a t_obj en vez de girar miles de veces.
+#
+# Los machine.Timer simulados se disparan aquí: cada vez que el reloj
+# avanza se ejecutan, en orden y con el reloj en su instante exacto, los
+# callbacks vencidos (como interrupciones entre dos instrucciones).
+
+import time as _time
+
+TICKS_PERIOD = 1 << 30
+_TICKS_MAX = TICKS_PERIOD - 1
+_TICKS_HALF = TICKS_PERIOD // 2
+
+
+class RelojVirtual:
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self, coste_ticks_us=1, factor_cpu=0.0):
+        self.us = 0                       # tiempo virtual absoluto (µs)
+        self.coste_ticks_us = coste_ticks_us
+        self.factor_cpu = float(factor_cpu)
+        self._ultimo = None               # (valor devuelto, µs por unidad)
+        self._objetivo = None             # µs absolutos de una espera activa
+        self._t_host = _time.perf_counter()
+        self.limite_us = None             # al pasarlo se lanza FinSimulacion
+        self.timers = []                  # machine.Timer activos
+        self._en_isr = False
+
+    def _cpu(self):
+        if self.factor_cpu > 0:
+            ahora = _time.perf_counter()
+            self.us += int((ahora - self._t_host) * 1e6 * self.factor_cpu)
+            self._t_host = ahora
+
+    def avanzar(self, us):
+        """Avanza el reloj (lo usan sleep y los periféricos de machine)."""
+        self._cpu()
+        if self._en_isr:
+            self.us += int(us)
+            return
+        self._disparar(self.us + int(us))
+        self._ultimo = None
+        self._objetivo = None
+        self._revisar_limite()
+
+    def proximo_timer(self):
+        return min((t.proximo_us for t in self.timers), default=None)
+
+    def _disparar(self, hasta_us):
+        """Lleva el reloj a hasta_us ejecutando los callbacks de timer vencidos."""
+        while True:
+            prox = self.proximo_timer()
+            if prox is None or prox > hasta_us:
+                break
+            if self.limite_us is not None and prox >= self.limite_us:
+                break
+            timer = min(self.timers, key=lambda t: t.proximo_us)
+            self.us = max(self.us, prox)
+            timer.proximo_us += timer.periodo_us
+            if timer.una_vez:
+                self.timers.remove(timer)
+            self._en_isr = True
+            try:
+                timer.callback(timer)
+            finally:
+                self._en_isr = False
+        self.us = max(self.us, hasta_us)
+
+    def en_otro_nucleo(self, fn):
+        """Ejecuta fn sin consumir tiempo del núcleo 0 (simula el núcleo 1)."""
+        t, en_isr = self.us, self._en_isr
+        self._en_isr = True
+        try:
+            fn()
+        finally:
+            self.us, self._en_isr = t, en_isr
+
+    def _revisar_limite(self):
+        if self.limite_us is not None and self.us >= self.limite_us:
+            raise FinSimulacion(self.us)
+
+    def leer(self, unidad_us):
+        self._cpu()
+        destino = self.us + self.coste_ticks_us
+        if self._objetivo is not None:
+            destino = max(destino, self._objetivo)
+            self._objetivo = None
+        if self._en_isr:
+            self.us = destino
+        else:
+            self._disparar(destino)
+        self._revisar_limite()
+        valor = (self.us // unidad_us) & _TICKS_MAX
+        self._ultimo = (valor, unidad_us)
+        return valor
+
+    def marcar_espera(self, objetivo, ahora, diff):
+        if diff > 0 and self._ultimo is not None and self._ultimo[0] == ahora:
+            unidad = self._ultimo[1]
+            self._objetivo = (self.us // unidad + diff) * unidad
+
+
+class FinSimulacion(BaseException):
+    """Se acabó el tiempo o la señal simulada (BaseException: no la atrapa `except Exception`)."""
+
+
+RELOJ = RelojVirtual()
+
+
+def ticks_us():
+    return RELOJ.leer(1)
+
+
+def ticks_ms():
+    return RELOJ.leer(1000)
+
+
+def ticks_cpu():
+    return RELOJ.leer(1)
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MAX
+
+
+def ticks_diff(ticks1, ticks2):
+    diff = ((ticks1 - ticks2 + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+    RELOJ.marcar_espera(ticks1, ticks2, diff)
+    return diff
+
+
+def sleep(s):
+    RELOJ.avanzar(s * 1_000_000)
+
+
+def sleep_ms(ms):
+    RELOJ.avanzar(ms * 1000)
+
+
+def sleep_us(us):
+    RELOJ.avanzar(us)
+
+
+def time():
+    return RELOJ.us // 1_000_000
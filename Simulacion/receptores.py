@@ -1,7 +1,16 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from numpy.fft import rfft, rfftfreq
-from scipy.signal import butter, sosfiltfilt
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.io import wavfile
+from scipy.signal import butter, sosfiltfilt, sosfilt, sosfilt_zi, sosfreqz
+from demodulador import DemoduladorFSKLote, llr_desde_energias
+from modulacion import simbolos_a_bits
+from codificacion import bits_a_texto
+
+# Formato de trama y FEC compartidos con el firmware de la Pico
+import _comun
+from trama import SYNC, crc16
+from fec import decodificar_np, largo_codificado
 
 def butter_bandpass_sos(lowcut, highcut, fs, order=6):
     nyq = 0.5 * fs
@@ -9,11 +18,56 @@ def butter_bandpass_sos(lowcut, highcut, fs, order=6):
     high = highcut / nyq
     return butter(order, [low, high], btype='band', output='sos')
 
-def bandpass(signal, fs, f_center, dev, scale=1.5, order=6):
+def filtfilt_por_bloques(sos, x, out=None, bloque=65536):
+    """
+    Mismo resultado que sosfiltfilt (extensión impar de 3·ntaps muestras),
+    pero la ida y la vuelta se hacen por bloques llevando zi y escriben en
+    `out` (puede ser el mismo x): no hay copias de largo N.
+    """
+    x = np.asarray(x, dtype=float)
+    out = np.empty_like(x) if out is None else out
+    n = len(x)
+    ntaps = 2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+    borde = 3 * ntaps
+    if n <= borde:
+        out[:] = sosfiltfilt(sos, x)
+        return out
+    zi0 = sosfilt_zi(sos)
+    izq = 2 * x[0] - x[borde:0:-1]
+    der = 2 * x[-1] - x[-2:-(borde + 2):-1]
+
+    # Ida: extensión izquierda, señal por bloques, extensión derecha
+    _, zi = sosfilt(sos, izq, zi=zi0 * izq[0])
+    for i in range(0, n, bloque):
+        out[i:i + bloque], zi = sosfilt(sos, x[i:i + bloque], zi=zi)
+    y_der, _ = sosfilt(sos, der, zi=zi)
+
+    # Vuelta: desde el final de la extensión derecha hacia el inicio
+    _, zi = sosfilt(sos, y_der[::-1], zi=zi0 * y_der[-1])
+    for fin in range(n, 0, -bloque):
+        ini = max(0, fin - bloque)
+        y, zi = sosfilt(sos, out[ini:fin][::-1], zi=zi)
+        out[ini:fin] = y[::-1]
+    return out
+
+def bandpass(signal, fs, f_center, dev, scale=1.5, order=6, out=None):
     low = max(1.0, f_center - scale*dev)
     high = f_center + scale*dev
     sos = butter_bandpass_sos(low, high, fs, order=order)
-    return sosfiltfilt(sos, signal)
+    return filtfilt_por_bloques(sos, signal, out=out)
+
+def banda_tonos(tonos, margen):
+    """(low, high) que cubre de tonos[0] a tonos[-1] más `margen` Hz de cada lado."""
+    return max(1.0, tonos[0] - margen), tonos[-1] + margen
+
+def bandpass_tonos(signal, fs, tonos, margen, order=6, out=None):
+    """
+    Pasabanda para una FSK de cualquier M: en M-FSK los tonos extremos están
+    en fc ± dev·(M-1), fuera de fc ± 1.5·dev. Con 2 tonos (fc ± dev) y
+    margen = dev/2 es el mismo filtro que bandpass(scale=1.5).
+    """
+    sos = butter_bandpass_sos(*banda_tonos(tonos, margen), fs, order=order)
+    return filtfilt_por_bloques(sos, signal, out=out)
 
 def detectar_bandas(signal, sr, n=65536):
     Y = rfft(signal, n=n)
@@ -27,32 +81,264 @@ def receptor_audio(signal, sr):
     f_obj = min(bandas)
     print(f"[Receptor 1] Banda detectada (piloto): ~ {f_obj:.1f} Hz")
 
+    import matplotlib.pyplot as plt
     plt.figure()
     plt.title("Receptor 1 - Señal Piloto Visualizada")
     plt.plot(signal[:2000])
     plt.xlabel("Muestras")
     plt.show()
 
-def receptor_texto(signal, modulador_original, sr, fc_texto, dev, expected_bits):
-    # 1) Filtrado de banda alrededor de la FSK del texto
-    y = bandpass(signal, sr, f_center=fc_texto, dev=dev, scale=1.5, order=6)
-
-    # 2) Demodular con el mismo objeto (usa su Nbit y ventanas)
-    modulador_original.modulada = y
-    modulador_original._demodular()
-
-    # 3) Extraer exactamente los bits esperados (sin tile)
-    bits_per_bit = modulador_original.Nbit
-    bits_stream = modulador_original.demodulada[::bits_per_bit]
-    bits_stream = bits_stream[:expected_bits].astype(int)
-
-    # 4) Reconstruir ASCII
-    chars = []
-    for i in range(0, len(bits_stream) - (len(bits_stream) % 8), 8):
-        byte = bits_stream[i:i+8]
-        val = 0
-        for b in byte:
-            val = (val << 1) | b
-        chars.append(chr(val))
-    mensaje = ''.join(chars)
+def receptor_texto(signal, modulador_original, sr, dev, expected_bits, out=None, fec=None,
+                   devolver_llr=False):
+    """
+    Texto recibido; la banda sale de los tonos de modulador_original. Con devolver_llr=True retorna (texto, llr): los LLR de
+    los bits del canal (antes del FEC), sin tocar modulador_original.
+    """
+    # 1) Filtrado de banda de tonos[0] a tonos[-1] (± dev/2) del modulador,
+    #    así pasan los M tonos (en `out` si se pasa un buffer; si no, en uno
+    #    nuevo: la señal de entrada no se toca)
+    mod = modulador_original
+    y = bandpass_tonos(signal, sr, mod.tonos, 0.5 * dev, order=6, out=out)
+
+    # 2) Una decisión por símbolo con los tonos y el Nbit del modulador:
+    #    solo vectores de largo n_simbolos, sin escalones de largo N
+    #    (con `fec` los bits del canal son largo_codificado(expected_bits))
+    n_canal = largo_codificado(expected_bits, fec)
+    n_simbolos = -(-n_canal // mod.bits_por_simbolo)
+    demod = DemoduladorFSKLote(sr, mod.tonos, mod.Nbit)
+    E, simbolos = demod.decidir(y, n_simbolos)
+    # Salida blanda para el decodificador FEC o análisis de BER
+    llr = llr_desde_energias(E)[0][:n_canal] if fec is not None or devolver_llr else None
+    if fec is None:
+        bits = simbolos_a_bits(simbolos, mod.bits_por_simbolo)[:expected_bits]
+    else:
+        # Decisión blanda: Viterbi / Hamming por máxima verosimilitud sobre los LLR
+        bits = decodificar_np(llr, fec, expected_bits)
+
+    # 3) Bits (MSB primero) a texto
+    mensaje = bits_a_texto(bits)
     print(f"[Receptor 2] Mensaje decodificado: {mensaje}")
+    return (mensaje, llr) if devolver_llr else mensaje
+
+
+def leer_wav_por_bloques(ruta, tam_bloque=4096):
+    """Genera bloques float (mono) de un WAV mapeado en memoria, sin cargarlo entero."""
+    sr, datos = wavfile.read(ruta, mmap=True)
+    escala = float(np.iinfo(datos.dtype).max) if datos.dtype.kind in "iu" else 1.0
+    for i in range(0, len(datos), tam_bloque):
+        bloque = np.asarray(datos[i:i+tam_bloque], dtype=float)
+        if bloque.ndim > 1:
+            bloque = bloque.mean(axis=1)
+        yield bloque / escala
+
+
+def _retardo_grupo(sos, f, sr):
+    """Retardo de grupo (en muestras) del filtro causal en la frecuencia f."""
+    w = 2 * np.pi * np.array([f - 0.5, f + 0.5]) / sr
+    _, h = sosfreqz(sos, worN=w)
+    fase = np.unwrap(np.angle(h))
+    return -(fase[1] - fase[0]) / (w[1] - w[0])
+
+
+class ReceptorTextoStream:
+    """
+    Receptor de texto FSK por bloques de tamaño arbitrario.
+
+    Mantiene el estado de sosfilt y la fracción de bit pendiente entre
+    llamadas, así que la memoria no crece con la duración de la captura y
+    cada byte se entrega apenas se completan sus 8 bits (MSB primero).
+    El filtro es causal: su retardo de grupo en fc se descarta al inicio
+    para que las ventanas de decisión sigan alineadas con los bits.
+    """
+    def __init__(self, sr, fc_texto, dev, bit_rate, scale=1.5, order=6):
+        self.sr = int(sr)
+        self.Nbit = max(1, int(round(self.sr / bit_rate)))
+
+        low = max(1.0, fc_texto - scale*dev)
+        high = fc_texto + scale*dev
+        self.sos = butter_bandpass_sos(low, high, self.sr, order=order)
+        self.zi = np.zeros((self.sos.shape[0], 2))
+        self.retardo = int(round(_retardo_grupo(self.sos, fc_texto, self.sr)))
+
+        self.demod = DemoduladorFSKLote(self.sr, (fc_texto - dev, fc_texto + dev), self.Nbit)
+        self._por_descartar = self.retardo
+        self._resto = np.empty(0)                 # < Nbit muestras filtradas
+        self._bits = np.empty(0, dtype=np.uint8)  # < 8 bits sin byte completo
+
+    def _filtrar(self, bloque):
+        y, self.zi = sosfilt(self.sos, bloque, zi=self.zi)
+        if self._por_descartar:
+            n = min(self._por_descartar, len(y))
+            y = y[n:]
+            self._por_descartar -= n
+        return y
+
+    def _decidir(self, y, incluir_parcial=False):
+        x = np.concatenate((self._resto, y))
+        n_bits = len(x) // self.Nbit
+        if incluir_parcial and len(x) - n_bits * self.Nbit >= self.Nbit // 2:
+            n_bits += 1
+        if n_bits == 0:
+            self._resto = x
+            return b""
+        _, _, decisiones = self.demod.demodular(x, n_bits)
+        self._resto = x[n_bits * self.Nbit:].copy()
+
+        bits = np.concatenate((self._bits, decisiones.astype(np.uint8)))
+        n_bytes = len(bits) // 8
+        self._bits = bits[n_bytes * 8:]
+        return np.packbits(bits[:n_bytes * 8]).tobytes()
+
+    def procesar(self, bloque):
+        """Procesa un bloque de muestras y retorna los bytes completados."""
+        return self._decidir(self._filtrar(np.asarray(bloque, dtype=float)))
+
+    def finalizar(self):
+        """Vacía el retardo del filtro y decide el último bit si está al menos a medias."""
+        y = self._filtrar(np.zeros(self.retardo))
+        return self._decidir(y, incluir_parcial=True)
+
+    def decodificar(self, bloques):
+        """Generador: recibe un iterable de bloques y entrega cada byte (int) apenas se completa."""
+        for bloque in bloques:
+            yield from self.procesar(bloque)
+        yield from self.finalizar()
+
+
+def decodificar_tramas(signal, sr, f0, f1, bit_rate, fases=8):
+    """
+    Decodifica las tramas de Comun/trama.py (preámbulo, sync, largo, datos,
+    CRC-16; bits LSB primero) en una señal FSK, p. ej. la salida PWM del
+    transmisor de la Pico. Como no se conoce el inicio del bit, se demodula
+    en `fases` desplazamientos de Nbit/fases y en cada uno se buscan los sync
+    de forma vectorizada. Retorna los datos (bytes) de las tramas con CRC
+    válido, en orden y sin repetir la misma trama hallada en dos fases.
+    """
+    signal = np.asarray(signal, dtype=float)
+    Nbit = max(1, int(round(sr / bit_rate)))
+    demod = DemoduladorFSKLote(sr, (f0, f1), Nbit)
+    patron = np.unpackbits(np.frombuffer(SYNC, dtype=np.uint8), bitorder="little")
+
+    halladas = []   # (muestra de inicio, datos)
+    for fase in range(fases):
+        inicio = fase * Nbit // fases
+        n_bits = (len(signal) - inicio) // Nbit
+        if n_bits < len(patron) + 24:
+            continue
+        _, _, bits = demod.demodular(signal[inicio:], n_bits)
+        bits = bits.astype(np.uint8)
+        ventanas = sliding_window_view(bits, len(patron))
+        for i in np.flatnonzero((ventanas == patron).all(axis=1)):
+            p = i + len(patron)
+            if p + 8 > n_bits:
+                continue
+            largo = int(np.packbits(bits[p:p + 8], bitorder="little")[0])
+            fin = p + 8 * (1 + largo + 2)
+            if largo == 0 or fin > n_bits:
+                continue
+            cuerpo = np.packbits(bits[p:fin - 16], bitorder="little").tobytes()
+            crc = int.from_bytes(np.packbits(bits[fin - 16:fin], bitorder="little").tobytes(), "big")
+            if crc16(cuerpo) == crc:
+                halladas.append((inicio + int(i) * Nbit, cuerpo[1:]))
+
+    halladas.sort(key=lambda h: h[0])
+    tramas = []
+    ultimo = None
+    for pos, datos in halladas:
+        if ultimo is None or pos - ultimo > Nbit:
+            tramas.append(datos)
+        ultimo = pos
+    return tramas
+
+
+if __name__ == "__main__":
+    # Memoria pico del receptor de texto en una captura de 10 minutos
+    import contextlib
+    import io
+    import time
+    import tracemalloc
+    from codificacion import texto_a_bits
+    from modulacion import ModuladorFSK, TransmisorFSK, bits_a_simbolos, modular_por_bloques
+
+    def _receptor_texto_copias(signal, modulador_original, sr, dev, expected_bits):
+        """receptor_texto de antes: sosfiltfilt con copias y _demodular con escalones de largo N."""
+        low, high = banda_tonos(modulador_original.tonos, 0.5 * dev)
+        y = sosfiltfilt(butter_bandpass_sos(low, high, sr, order=6), signal)
+        modulador_original.modulada = y
+        modulador_original._demodular()
+        return bits_a_texto(modulador_original.bits_rx[:expected_bits].astype(np.uint8))
+
+    # Ida y vuelta por receptor_texto en 2, 4 y 16 tonos: el pasabanda tiene
+    # que dejar pasar los tonos extremos (fc ± dev·(M-1)). Texto no ASCII:
+    # los bits son los de su UTF-8 (2 bytes por ñ, ú, ¡)
+    for m, dev in ((2, 300), (4, 100), (16, 40)):
+        texto = "¡Koki es un sobo, ñandú!"
+        n_bits = len(texto.encode()) * 8
+        n_sim = -(-n_bits // (m.bit_length() - 1))
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, x, mod = TransmisorFSK(44100).transmitir(texto, n_sim * 1102 / 44100, 2500, 800, dev, 40,
+                                                       n_tonos=m)
+            rx = receptor_texto(x, mod, 44100, dev, n_bits)
+            rx_ref = _receptor_texto_copias(x, mod, 44100, dev, n_bits)
+        print(f"{m:2d}-FSK (dev {dev} Hz): '{rx}' | referencia: '{rx_ref}'")
+        assert rx == rx_ref == texto, (m, rx, rx_ref)
+
+    SR, BIT_RATE, FC, DEV, MIN = 44100, 40, 2500, 300, 10
+    nbit = SR // BIT_RATE
+    n_simbolos = MIN * 60 * BIT_RATE
+    # Binaria y 4-FSK (mismos símbolos/s, el doble de bits)
+    for m, dev in ((2, DEV), (4, 100)):
+        k = m.bit_length() - 1
+        n_bits = n_simbolos * k
+        texto = ("Koki es un sobo. " * (n_bits // 136 + 1))[:n_bits // 8]
+        bits = texto_a_bits(texto)
+        mod = ModuladorFSK(BIT_RATE, FC, n_simbolos * nbit / SR, SR, None, freq_dev=dev, bits=bits,
+                           n_tonos=m)
+        x = np.empty(n_simbolos * nbit)
+        i = 0
+        for blq in modular_por_bloques(mod.tonos[bits_a_simbolos(bits, k)], nbit, SR):
+            x[i:i + len(blq)] = blq
+            i += len(blq)
+        x += 0.3 * np.random.default_rng(0).standard_normal(len(x))
+        print(f"Captura de {MIN} min en {m}-FSK: {len(x)/1e6:.1f} M muestras ({x.nbytes/1e6:.0f} MB)")
+
+        # La última corrida filtra sobre la propia captura (out=x): la pisa
+        for nombre, fn in (("sosfiltfilt + escalones", _receptor_texto_copias),
+                           ("por bloques + packbits", receptor_texto),
+                           ("ídem, en el lugar", lambda *a: receptor_texto(*a, out=x))):
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                rx = fn(x, mod, SR, dev, n_bits)
+            dt = time.perf_counter() - t0
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{nombre:24s} | {dt:5.2f} s | pico {pico/1e6:7.1f} MB | texto correcto: {rx == texto}")
+        del x, mod
+
+
+    # FEC (Comun/fec.py) a igual tasa de información (40 bit/s): con "conv"
+    # cada bit del canal dura la mitad y con "hamming" 4/7. Desde ~8 dB de
+    # Eb/N0 el decodificador blando sobre los LLR recupera más de lo que se
+    # pierde; por debajo, la FSK no coherente con bits más cortos queda
+    # pasado el umbral del código y el FEC empeora la BER (fila de 6 dB)
+    TEXTO = "Koki es un sobo. " * 24
+    n_bits = len(TEXTO) * 8
+    rng = np.random.default_rng(1)
+    print("\nEb/N0   sin FEC             hamming             conv")
+    for ebn0_db in (6, 8, 10):
+        fila = []
+        for fec in (None, "hamming", "conv"):
+            n_canal = largo_codificado(n_bits, fec)
+            tasa = BIT_RATE * n_canal / n_bits
+            nbit = int(round(SR / tasa))
+            with contextlib.redirect_stdout(io.StringIO()):
+                _, x, mod = TransmisorFSK(SR).transmitir(TEXTO, n_canal * nbit / SR, FC, 800, DEV, tasa, fec=fec)
+                # Eb = Nbit·n_canal/n_bits/2 (amplitud 1), N0 = 2σ²
+                sigma = np.sqrt(nbit * n_canal / n_bits / 4 / 10 ** (ebn0_db / 10))
+                x += sigma * rng.standard_normal(len(x))
+                rx, llr = receptor_texto(x, mod, SR, DEV, n_bits, fec=fec, devolver_llr=True)
+            # Mismos bits que usó receptor_texto, a partir de sus LLR
+            ber = np.mean(decodificar_np(llr, fec, n_bits) != texto_a_bits(TEXTO))
+            fila.append(f"{ber:8.1e} (bit {1000 / tasa:4.1f} ms)")
+        print(f"{ebn0_db:3d} dB  " + "  ".join(fila))
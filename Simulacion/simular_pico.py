@@ -0,0 +1,259 @@
+# simular_pico.py — corre el firmware de la Pico sin cambios en CPython
+#
+# Pone pico_host/ (machine, utime, ulab simulados), Comun/ y las carpetas
+# del firmware en sys.path, ejecuta el script con reloj virtual y devuelve
+# qué hizo: consola, lecturas de ADC, tasa de muestreo lograda, I2C y PWM.
+#
+# Por defecto el reloj virtual solo avanza con sleep, ADC, I2C y ticks_*(),
+# así que el DSP del bucle es gratis y fs_lograda solo refleja el timer.
+# Con factor_cpu > 0 el tiempo de CPU del host (×factor_cpu) también cuenta
+# y los bloques que el bucle no alcanza a procesar aparecen en adc_perdidos.
+import contextlib
+import io
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent
+REPO_DIR = BASE_DIR.parent
+RUTAS_FIRMWARE = [BASE_DIR / "pico_host", REPO_DIR / "Comun", REPO_DIR / "Tx", REPO_DIR / "Rx + LCD"]
+
+# Módulos del firmware que se recargan en cada corrida (estado global limpio)
+_MODULOS_FIRMWARE = ("pico_i2c_lcd", "lcd_api", "goertzel", "captura", "pantalla", "dft_deslizante",
+                     "sincronia", "trama", "cfar", "fec")
+
+
+def preparar_rutas():
+    for ruta in reversed(RUTAS_FIRMWARE):
+        if str(ruta) not in sys.path:
+            sys.path.insert(0, str(ruta))
+    import machine
+    import utime
+    return machine, utime
+
+
+def _correr_script(ruta, run_name, constantes=None):
+    """
+    Ejecuta el script como lo haría runpy.run_path, pero antes reemplaza las
+    constantes de configuración pedidas (`NOMBRE = valor` al inicio de línea),
+    igual que editarlas a mano antes de copiarlas a la Pico.
+    """
+    codigo = Path(ruta).read_text(encoding="utf-8")
+    for nombre, valor in (constantes or {}).items():
+        codigo, n = re.subn(rf"^{nombre} = .*$", f"{nombre} = {valor!r}", codigo,
+                            count=1, flags=re.MULTILINE)
+        if n == 0:
+            raise KeyError(f"{nombre} no es una constante de {Path(ruta).name}")
+    globales = {"__name__": run_name, "__file__": str(ruta)}
+    exec(compile(codigo, str(ruta), "exec"), globales)
+    return globales
+
+
+def cargar_firmware(ruta, constantes=None, **config):
+    """Importa un script del firmware sin ejecutar su __main__ (para llamar sus funciones)."""
+    machine, _ = preparar_rutas()
+    machine.configurar(**config)
+    for m in _MODULOS_FIRMWARE:
+        sys.modules.pop(m, None)
+    return _correr_script(ruta, "firmware", constantes)
+
+
+def ejecutar_firmware(ruta, limite_s=5.0, entradas=None, silencioso=True, constantes=None, **config):
+    """
+    Ejecuta `ruta` como __main__ hasta `limite_s` segundos virtuales o hasta
+    que se acabe la señal del ADC. `config` se pasa a machine.configurar().
+    `entradas` alimenta input() (si se agotan, la simulación termina).
+    `constantes` reemplaza constantes del script, p. ej. {"MODO_TRAMA": False}.
+    """
+    machine, utime = preparar_rutas()
+    machine.configurar(limite_s=limite_s, **config)
+    for m in _MODULOS_FIRMWARE:
+        sys.modules.pop(m, None)
+
+    # Se registran las CapturaADC que cree el firmware para leer sus overruns
+    import captura
+    capturas = []
+    iniciar_original = captura.CapturaADC.iniciar
+
+    def _iniciar(self):
+        capturas.append(self)
+        iniciar_original(self)
+
+    captura.CapturaADC.iniciar = _iniciar
+
+    import builtins
+    entradas = iter(entradas or [])
+
+    def _input(prompt=""):
+        try:
+            return next(entradas)
+        except StopIteration:
+            raise utime.FinSimulacion(utime.RELOJ.us)
+
+    # Núcleo 1: PantallaNucleo1._bucle no corre en un hilo real (compartiría
+    # el reloj virtual); su atender() se llama cada periodo_ms sin consumir
+    # tiempo del núcleo 0.
+    import _thread
+    hilo_original = _thread.start_new_thread
+
+    def _start_new_thread(func, args, kwargs={}):
+        dueno = getattr(func, "__self__", None)
+        if dueno is None or not hasattr(dueno, "atender"):
+            return hilo_original(func, args, kwargs)
+        machine.Timer(period=dueno.periodo_ms, mode=machine.Timer.PERIODIC,
+                      callback=lambda t: utime.RELOJ.en_otro_nucleo(dueno.atender))
+
+    consola = io.StringIO()
+    input_original = builtins.input
+    builtins.input = _input
+    _thread.start_new_thread = _start_new_thread
+    t0 = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(consola) if silencioso else contextlib.nullcontext():
+            _correr_script(ruta, "__main__", constantes)
+    except utime.FinSimulacion:
+        pass
+    finally:
+        builtins.input = input_original
+        _thread.start_new_thread = hilo_original
+    t_host = time.perf_counter() - t0
+
+    t_virtual = utime.RELOJ.us / 1e6
+    est = machine.ESTADO
+    return {
+        "consola": consola.getvalue(),
+        "t_virtual_s": t_virtual,
+        "t_host_s": t_host,
+        "velocidad": t_virtual / t_host if t_host > 0 else float("inf"),
+        "lecturas_adc": est.lecturas_adc,
+        "fs_lograda": est.lecturas_adc / t_virtual if t_virtual > 0 else 0.0,
+        # El Timer simulado redondea el período a µs enteros (8350 Hz -> 120 µs = 8333 Hz)
+        "fs_timer": [1e6 / c.timer.periodo_us for c in capturas if c.timer is not None],
+        "adc_perdidos": sum(c.perdidos for c in capturas),
+        "i2c_transacciones": len(est.i2c_log),
+        "i2c_bytes": est.i2c_bytes,
+        "i2c_log": list(est.i2c_log),
+        "pwm_log": {k: list(v) for k, v in est.pwm_log.items()},
+    }
+
+
+def generar_tx_ascii(mensaje, fs=50_000, desvio_reloj=0.0, trama=False, constantes=None):
+    """
+    Corre send_byte_ascii() (o send_frame() si `trama`) del transmisor real
+    (Rx + LCD/main.py en este árbol) sobre un PWM simulado y devuelve la
+    onda cuadrada resultante.
+    `desvio_reloj` estira (+) o acorta (-) el bit del TX, p. ej. 0.03 = +3 %.
+    `constantes` se aplica al transmisor como en ejecutar_firmware().
+    """
+    fw = cargar_firmware(REPO_DIR / "Rx + LCD" / "main.py", constantes)
+    periodo = "BIT_PERIOD_TRAMA_MS" if trama else "BIT_PERIOD_MS"
+    fw[periodo] = round(fw[periodo] * (1.0 + desvio_reloj))
+    machine = sys.modules["machine"]
+    pwm = machine.PWM(machine.Pin(fw["PIN_ASCII"]))
+    pwm.freq(fw["F_REPOSO"])
+    pwm.duty(512)
+    import utime
+    utime.sleep_ms(500)  # reposo en F0 antes del primer start bit / preámbulo
+    if trama:
+        fw["send_frame"](pwm, mensaje.encode())
+    else:
+        for c in mensaje:
+            fw["send_byte_ascii"](pwm, ord(c))
+    utime.sleep_ms(500)
+    return machine.senal_pwm(fw["PIN_ASCII"], fs) * 2.0 - 1.0
+
+
+if __name__ == "__main__":
+    # Lazo completo TX -> RX en el PC: el transmisor genera la FSK por PWM y
+    # el receptor Goertzel (Tx/main.py en este árbol) la decodifica.
+    FS = 50_000
+    MENSAJE = "HOLA"
+    # Con reloj de TX corrido ±4 % el receptor sigue alineado (Comun/sincronia.py)
+    for desvio in (0.0, -0.04, 0.04):
+        with contextlib.redirect_stdout(io.StringIO()):
+            x = generar_tx_ascii(MENSAJE, fs=FS, desvio_reloj=desvio)
+        print(f"TX: '{MENSAJE}' (reloj {desvio:+.0%}) -> {len(x)/FS:.2f} s de señal PWM")
+
+        res = ejecutar_firmware(REPO_DIR / "Tx" / "main.py", limite_s=len(x) / FS,
+                                senal=x, fs_senal=FS, amplitud=12000,
+                                constantes={"MODO_TRAMA": False})
+        recibidos = [int(l.split()[2]) for l in res["consola"].splitlines()
+                     if l.startswith("Byte Recibido")]
+        print(f"RX: {recibidos} (esperado {list(MENSAJE.encode())})")
+
+    # Modo trama (Comun/trama.py): un sync por mensaje, CRC-16 y bit de 50 ms
+    from receptores import decodificar_tramas
+    MENSAJE = "HOLA MUNDO, trama con CRC-16"
+    for desvio in (0.0, -0.04, 0.04):
+        with contextlib.redirect_stdout(io.StringIO()):
+            x = generar_tx_ascii(MENSAJE, fs=FS, desvio_reloj=desvio, trama=True)
+        res = ejecutar_firmware(REPO_DIR / "Tx" / "main.py", limite_s=len(x) / FS,
+                                senal=x, fs_senal=FS, amplitud=12000)
+        ok = [l for l in res["consola"].splitlines() if l.startswith("Trama OK")]
+        print(f"Trama (reloj {desvio:+.0%}): {len(x)/FS:.2f} s | Pico: {ok}")
+        if desvio == 0.0:
+            # Decodificador NumPy (tasa nominal, sin seguimiento de reloj)
+            print(f"  Simulacion/receptores: {decodificar_tramas(x, FS, 2100, 3100, bit_rate=1000 / 50)}")
+
+    # M-FSK: mismo símbolo de 50 ms, log2(M) bits por símbolo. Con ruido
+    # (σ 1.0 sobre la cuadrada ±1) el CFAR depende de los bins de guarda
+    for m in (4, 16):
+        with contextlib.redirect_stdout(io.StringIO()):
+            x = generar_tx_ascii(MENSAJE, fs=FS, trama=True, constantes={"N_TONOS": m})
+        for sigma in (0.0, 1.0):
+            y = x + sigma * np.random.default_rng(1).standard_normal(len(x))
+            res = ejecutar_firmware(REPO_DIR / "Tx" / "main.py", limite_s=len(y) / FS,
+                                    senal=y, fs_senal=FS, amplitud=12000, constantes={"N_TONOS": m})
+            ok = [l for l in res["consola"].splitlines() if l.startswith("Trama OK")]
+            print(f"Trama {m}-FSK, ruido σ {sigma}: {len(y)/FS:.2f} s | Pico: {ok}")
+
+    # FEC (Comun/fec.py): el cuerpo de la trama va codificado y el receptor
+    # lo decodifica bit a bit (tabla de Hamming o Viterbi de flujo)
+    for fec, m in (("hamming", 2), ("conv", 2), ("conv", 4)):
+        c = {"FEC": fec, "N_TONOS": m}
+        with contextlib.redirect_stdout(io.StringIO()):
+            x = generar_tx_ascii(MENSAJE, fs=FS, trama=True, constantes=c)
+        res = ejecutar_firmware(REPO_DIR / "Tx" / "main.py", limite_s=len(x) / FS,
+                                senal=x, fs_senal=FS, amplitud=12000, constantes=c)
+        ok = [l for l in res["consola"].splitlines() if l.startswith("Trama OK")]
+        print(f"Trama {m}-FSK con FEC {fec}: {len(x)/FS:.2f} s | Pico: {ok}")
+
+    # Umbral fijo (THRESHOLD) vs adaptativo (Comun/cfar.py): señal 4 veces
+    # más débil, con ruido y bit de 25 ms (subtrama de 25 muestras)
+    with contextlib.redirect_stdout(io.StringIO()):
+        x = generar_tx_ascii(MENSAJE, fs=FS, trama=True, constantes={"BIT_PERIOD_TRAMA_MS": 25})
+    x += 0.5 * np.random.default_rng(0).standard_normal(len(x))
+    for adaptivo in (False, True):
+        res = ejecutar_firmware(REPO_DIR / "Tx" / "main.py", limite_s=len(x) / FS,
+                                senal=x, fs_senal=FS, amplitud=3000,
+                                constantes={"BIT_PERIOD_TRAMA_MS": 25, "UMBRAL_ADAPTIVO": adaptivo})
+        ok = [l for l in res["consola"].splitlines() if l.startswith("Trama OK")]
+        print(f"Bit de 25 ms, señal débil y ruidosa, umbral {'CFAR' if adaptivo else 'fijo'}: "
+              f"{len(x)/FS:.2f} s | Pico: {ok}")
+    print(f"{res['t_virtual_s']:.2f} s virtuales en {res['t_host_s']:.2f} s reales "
+          f"(x{res['velocidad']:.1f}) | fs lograda {res['fs_lograda']:.0f} Hz | "
+          f"I2C: {res['i2c_transacciones']} transacciones, {res['i2c_bytes']} bytes")
+
+
+    # Capacidad del bucle: el tiempo de CPU del host cuenta ×factor_cpu en el
+    # reloj virtual. MicroPython en el RP2040 es decenas de veces más lento
+    # que CPython, y el tiempo del host incluye el propio simulador (ADC,
+    # timers), así que el barrido acota el margen en vez de medirlo.
+    with contextlib.redirect_stdout(io.StringIO()):
+        x = generar_tx_ascii(MENSAJE, fs=FS, trama=True)
+    for factor in (0, 5, 10, 20, 40):
+        res = ejecutar_firmware(REPO_DIR / "Tx" / "main.py", limite_s=len(x) / FS,
+                                senal=x, fs_senal=FS, amplitud=12000, factor_cpu=factor)
+        ok = any(l.startswith("Trama OK") for l in res["consola"].splitlines())
+        print(f"CPU x{factor}: fs lograda {res['fs_lograda']:.0f} Hz "
+              f"(timer {res['fs_timer'][0]:.0f} Hz) | bloques perdidos {res['adc_perdidos']} | "
+              f"trama {'OK' if ok else 'perdida'}")
+
+    res = ejecutar_firmware(REPO_DIR / "Tx" / "buzzer.py", limite_s=1.0,
+                            senal=np.sin(2*np.pi*880*np.arange(FS)/FS), fs_senal=FS, factor_cpu=10)
+    cambios = [v for _, tipo, v in res["pwm_log"].get(16, []) if tipo == "freq"]
+    print(f"Buzzer (CPU x10): {len(cambios)} cambios de frecuencia, último {cambios[-1] if cambios else 0} Hz | "
+          f"x{res['velocidad']:.1f} | fs lograda {res['fs_lograda']:.0f} Hz")
@@ -0,0 +1,44 @@
+# tiempo_import.py — mide cuánto tarda en importarse el núcleo del módem
+# (cada medición en un intérprete nuevo, para no contar módulos ya cargados)
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+PESADOS = ("librosa", "matplotlib", "numba")
+
+CODIGO = """
+import sys, time
+t0 = time.perf_counter()
+import {modulos}
+dt = time.perf_counter() - t0
+pesados = [m for m in {pesados!r} if m in sys.modules]
+print(f"{{dt*1e3:.1f}} {{','.join(pesados) or '-'}}")
+"""
+
+
+def medir(modulos, repeticiones=5):
+    tiempos, pesados = [], "-"
+    for _ in range(repeticiones):
+        proc = subprocess.run(
+            [sys.executable, "-c", CODIGO.format(modulos=modulos, pesados=PESADOS)],
+            cwd=BASE_DIR, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            return None, "(no instalado)"
+        out = proc.stdout.split()
+        tiempos.append(float(out[0]))
+        pesados = out[1]
+    return min(tiempos), pesados
+
+
+if __name__ == "__main__":
+    for modulos in ("numpy, scipy.signal",
+                    "modulacion, receptores, demodulador",
+                    "audio_fft",
+                    "audio_fft, librosa, matplotlib.pyplot"):
+        t, pesados = medir(modulos)
+        if t is None:
+            print(f"import {modulos:40s}      --- ms | {pesados}")
+        else:
+            print(f"import {modulos:40s} {t:8.1f} ms | pesados cargados: {pesados}")
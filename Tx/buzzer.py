@@ -4,6 +4,7 @@
 # Criterios suaves y sin bordes falsos.
 
 import machine, utime, math
+from goertzel import BancoGoertzel  # copiar Comun/goertzel.py a la Pico
 
 # ---------- Pines ----------
 ADC_PIN = 26        # GP26 (ADC0) entrada de la mezcla
@@ -41,11 +42,12 @@ def build_bins():
     if len(ks) >= 3:
         ks = ks[1:-1]
 
-    coeffs = [2.0 * math.cos(2.0 * math.pi * k / N_SAMPLES) for k in ks]
     freqs  = [k * FS_REAL / N_SAMPLES for k in ks]
-    return ks, coeffs, freqs
+    return ks, freqs
 
-BIN_KS, BIN_COEFFS, BIN_FREQS = build_bins()
+# Los coeficientes 2·cos(2πk/N) los calcula BancoGoertzel
+BIN_KS, BIN_FREQS = build_bins()
+BANCO = BancoGoertzel(BIN_KS, N_SAMPLES)
 HANN = [0.5 - 0.5 * math.cos(2.0 * math.pi * i / (N_SAMPLES - 1)) for i in range(N_SAMPLES)] if USE_HANN else None
 
 # ---------- HW ----------
@@ -79,8 +81,7 @@ def parabolic_interp(mags, idx):
 
 def goertzel_frame():
     global dc_ema
-    q1 = [0.0] * len(BIN_KS)
-    q2 = [0.0] * len(BIN_KS)
+    BANCO.reiniciar()
 
     t0 = utime.ticks_us()
     for i in range(N_SAMPLES):
@@ -89,19 +90,13 @@ def goertzel_frame():
         s = raw - dc_ema - 32768.0
         if HANN: s *= HANN[i]
 
-        for idx in range(len(BIN_KS)):
-            q0 = BIN_COEFFS[idx] * q1[idx] - q2[idx] + s
-            q2[idx] = q1[idx]
-            q1[idx] = q0
+        BANCO.actualizar(s)
 
         t_next = utime.ticks_add(t0, (i + 1) * T_SAMPLE_US)
         while utime.ticks_diff(t_next, utime.ticks_us()) > 0:
             pass
 
-    mags = []
-    for idx in range(len(BIN_KS)):
-        mag = (q1[idx]*q1[idx]) + (q2[idx]*q2[idx]) - (BIN_COEFFS[idx]*q1[idx]*q2[idx])
-        mags.append(mag if mag > 0 else 0.0)
+    mags = list(BANCO.magnitudes())
 
     if not mags:
         return 0.0, 0.0, 0.0, 0.0
@@ -1,10 +1,18 @@
 import machine
 
-import utime
+from pico_i2c_lcd import I2cLcd
 
-import math
+from goertzel import BancoGoertzel, bins_de_frecuencias  # copiar Comun/goertzel.py a la Pico
 
-from pico_i2c_lcd import I2cLcd
+from captura import CapturaADC  # copiar Comun/captura.py a la Pico
+
+from pantalla import PantallaNucleo1  # copiar Comun/pantalla.py a la Pico
+
+from sincronia import RecuperadorBits, RecuperadorMFSK  # copiar Comun/sincronia.py a la Pico
+
+from trama import DesarmadorTrama, BUSCANDO  # copiar Comun/trama.py a la Pico
+
+from cfar import DetectorCFAR, clasificar, RUIDO  # copiar Comun/cfar.py a la Pico
 
 
 
@@ -58,6 +66,18 @@ FS_REAL = 8350
 
 THRESHOLD = 150000000000 # 500 Millones (¡AJUSTAR!)
 
+# Umbral adaptativo (Comun/cfar.py): el piso de ruido se mide en cada
+
+# subtrama con bins de guarda y hay señal si un tono lo supera CFAR_FACTOR
+
+# veces. No hay que calibrar nada; THRESHOLD solo se usa con
+
+# UMBRAL_ADAPTIVO = False.
+
+UMBRAL_ADAPTIVO = True
+
+CFAR_FACTOR = 6.0
+
 # --- FIN DEL CAMBIO ---
 
 
@@ -66,16 +86,12 @@ TARGET_F0 = 2100
 
 k_F0 = 52
 
-coeff_F0 = 2.0 * math.cos(2.0 * math.pi * k_F0 / N_SAMPLES)
-
 
 
 TARGET_F1 = 3100
 
 k_F1 = 77
 
-coeff_F1 = 2.0 * math.cos(2.0 * math.pi * k_F1 / N_SAMPLES)
-
 
 
 print("Receptor FDM v1.1 (ASCII en señal mezclada)")
@@ -84,9 +100,15 @@ print("Canal F0 (k={}) @ {:.0f} Hz".format(k_F0, k_F0 * FS_REAL / N_SAMPLES))
 
 print("Canal F1 (k={}) @ {:.0f} Hz".format(k_F1, k_F1 * FS_REAL / N_SAMPLES))
 
-print(">>> Umbral de Detección: {} <<<".format(THRESHOLD))
+if UMBRAL_ADAPTIVO:
+
+    print(">>> Umbral de Detección: adaptativo (CFAR x{}) <<<".format(CFAR_FACTOR))
 
-print("Ajusta el THRESHOLD si no recibes nada o recibes basura.")
+else:
+
+    print(">>> Umbral de Detección: {} <<<".format(THRESHOLD))
+
+    print("Ajusta el THRESHOLD si no recibes nada o recibes basura.")
 
 
 
@@ -96,25 +118,131 @@ adc = None
 
 lcd = None
 
-ascii_state = "IDLE"
+pantalla = None # LCD y logs atendidos por el núcleo 1
+
+# Tiene que coincidir con el BIT_PERIOD_MS del transmisor (200 ms). El reloj
+
+# de bit se recupera de los flancos: cada bloque de N_SAMPLES es una
+
+# subtrama y hay ~8 por bit. Para subir la tasa, bajar BIT_PERIOD_MS en
+
+# ambos lados y N_SAMPLES (con k_F0/k_F1) para mantener ~8 subtramas por bit.
+
+BIT_PERIOD_MS = 200
+
+SUBTRAMAS_POR_BIT = FS_REAL * BIT_PERIOD_MS / 1000 / N_SAMPLES
+
+# Modo trama (Comun/trama.py): todo el mensaje en una trama con preámbulo,
+
+# largo y CRC-16, bits seguidos sin start/stop. Como el reloj se recupera,
+
+# el bit puede ser más corto: BIT_PERIOD_TRAMA_MS tiene que coincidir con
+
+# el del transmisor y la subtrama se achica en proporción (~8 por bit).
+
+MODO_TRAMA = True
+
+BIT_PERIOD_TRAMA_MS = 50
+
+# M-FSK (solo en modo trama): mismos N_TONOS / F_MFSK_BASE / F_MFSK_PASO
+
+# que el transmisor; cada símbolo trae log2(N_TONOS) bits.
+
+N_TONOS = 2
+
+F_MFSK_BASE = 1200
+
+F_MFSK_PASO = 175
+
+if N_TONOS == 2:
+
+    F_TONOS = [TARGET_F0, TARGET_F1]
+
+else:
+
+    F_TONOS = [F_MFSK_BASE + i * F_MFSK_PASO for i in range(N_TONOS)]
+
+BITS_POR_SIMBOLO = {2: 1, 4: 2, 8: 3, 16: 4}[N_TONOS]
+
+# Corrección de errores (Comun/fec.py, copiar a la Pico si se usa): None,
+
+# "hamming" o "conv"; mismo FEC que el transmisor.
+
+FEC = None
+
+# Bins de guarda para el piso de ruido del CFAR: donde no cae ningún tono,
+
+# ni el buzzer de 880 Hz, ni los armónicos de la cuadrada del TX que
+
+# vuelven a la banda por aliasing. Hacen falta al menos 3 para que la
+
+# mediana descarte una celda con fuga de un tono (Goertzel sin ventana,
+
+# bins de 164 Hz con la subtrama de 51). Aun así, durante una trama el piso
 
-current_byte = 0
+# sube ~8 dB por la fuga (~10 dB con una sola guarda en 2600); el tono
 
-bit_count = 0
+# queda ~26 dB arriba, lejos de CFAR_FACTOR. Cada bin extra cuesta un
 
-BIT_PERIOD_MS = 190 # Dejar como estaba, es la temporización
+# filtro más por muestra. En M-FSK los tonos ocupan 1200-3825 Hz y arriba
 
-last_bit_time = 0
+# no entran 3 bins: van debajo de 1200, a ≥2 bins del buzzer. Ahí caen
+
+# armónicos del TX aliados (p. ej. 5·1550 -> 600 Hz), pero cada símbolo
+
+# ensucia a lo sumo una celda y la mediana la descarta.
+
+if N_TONOS == 2:
+
+    F_GUARDA = [500, 2600, 3900]
+
+else:
+
+    F_GUARDA = [250, 400, 550]
+
+if MODO_TRAMA:
+
+    N_SUB = N_SAMPLES * BIT_PERIOD_TRAMA_MS // BIT_PERIOD_MS
+
+    recuperador = RecuperadorMFSK(FS_REAL * BIT_PERIOD_TRAMA_MS / 1000 / N_SUB, N_TONOS)
+
+else:
+
+    N_SUB = N_SAMPLES
+
+    recuperador = RecuperadorBits(SUBTRAMAS_POR_BIT)
+
+desarmador = DesarmadorTrama(FEC)
 
 received_string = ""
 
 
 
-# --- init_hardware() (Sin cambios) ---
+# La línea 2 del LCD salta de a media línea en vez de correr de a un
+
+# carácter: correrla reescribe las 16 celdas (72 bytes I2C por carácter),
+
+# agregar al final solo cambia una (8 bytes). Con el salto se reescribe
+
+# una vez cada 8 caracteres (~16 bytes por carácter en promedio).
+
+def agregar_recibido(texto):
+
+    global received_string
+
+    received_string += texto
+
+    while len(received_string) > 16:
+
+        received_string = received_string[8:]
+
+
+
+# --- init_hardware() ---
 
 def init_hardware():
 
-    global adc, lcd, I2C_ADDR
+    global adc, lcd, pantalla, I2C_ADDR
 
     try:
 
@@ -134,6 +262,10 @@ def init_hardware():
 
         lcd.clear()
 
+        pantalla = PantallaNucleo1(lcd)
+
+        pantalla.iniciar()
+
         return True
 
     except Exception as e:
@@ -144,114 +276,106 @@ def init_hardware():
 
 
 
-# --- process_ascii() (Sin cambios) ---
-
-def process_ascii(bit_detected):
+# --- process_ascii(): una decisión blanda por subtrama ---
 
-    global ascii_state, current_byte, bit_count, last_bit_time, received_string, lcd, utime
+def process_ascii(s):
 
-    
-
-    current_time = utime.ticks_ms()
+    # s: (E1 - E0) / (E1 + E0) en [-1, 1], o 0 si es ruido
 
-    
+    byte_val = recuperador.paso(s)
 
-    # bit_detected: 0 (F0), 1 (F1), o -1 (Ruido)
+    evento = recuperador.evento
 
+    if evento == "start":
 
+        pantalla.log("Start bit detectado!")
 
-    if ascii_state == "IDLE":
+    elif evento == "ruido":
 
-        if bit_detected == 1: # START BIT! (F1)
+        # ¡Error de bit! La señal se perdió a mitad de la trama.
 
-            ascii_state = "RECEIVING"
+        pantalla.log("Error de bit (Ruido detectado). Abortando.")
 
-            bit_count = 0
+    elif evento == "trama":
 
-            current_byte = 0
+        pantalla.log("Error de trama (stop bit en F1). Byte descartado.")
 
-            last_bit_time = current_time # Empezamos a contar el tiempo
+    if byte_val is None:
 
-            print("Start bit detectado!")
+        return
 
-        # Si es 0 o -1, no hacemos nada.
+    char = chr(byte_val)
 
-            
+    pantalla.log("Byte Recibido: {} -> '{}'".format(byte_val, char))
 
-    elif ascii_state == "RECEIVING":
+    agregar_recibido(char)
 
-        # ¿Ha pasado el tiempo de 1 bit?
+    # El núcleo 1 escribe las celdas que cambiaron; aquí no se espera al LCD
 
-        if utime.ticks_diff(current_time, last_bit_time) > BIT_PERIOD_MS:
+    pantalla.mostrar("ASCII Recibido:", received_string)
 
-            last_bit_time = current_time # Reiniciar el contador
 
-            
 
-            # ¡SOLO LEEMOS SI LA SEÑAL NO ES RUIDO!
 
-            if bit_detected == -1:
 
-                # ¡Error de bit! La señal se perdió. Abortar.
+# --- process_frame(): tramas con CRC (MODO_TRAMA) ---
 
-                print("Error de bit (Ruido detectado). Abortando.")
+def process_frame(energias, umbral):
 
-                ascii_state = "IDLE"
+    simbolo = recuperador.paso_energias(energias, umbral)
 
-                return # Salir de la función
+    if simbolo is None:
 
+        if recuperador.evento == "ruido" and desarmador.estado != BUSCANDO:
 
+            pantalla.log("Señal perdida a mitad de trama. Descartada.")
 
-            # Si llegamos aquí, el bit es 0 o 1
+            desarmador.descartar()
 
-            if bit_detected == 1:
+        return
 
-                current_byte |= (1 << bit_count)
+    datos = desarmador.paso_simbolo(simbolo, BITS_POR_SIMBOLO)
 
-            
+    if desarmador.soltar:
 
-            bit_count += 1
+        # Fin de trama o F0 sostenido: el próximo preámbulo vuelve a fijar la fase
 
-            
+        recuperador.soltar()
 
-            if bit_count == 8:
+    if desarmador.evento == "sync":
 
-                # Terminamos.
+        pantalla.log("Sync de trama detectado!")
 
-                char = chr(current_byte)
+    elif desarmador.evento == "crc":
 
-                print("Byte Recibido: {} -> '{}'".format(current_byte, char))
+        pantalla.log("Trama descartada: CRC inválido ({} errores)".format(desarmador.errores_crc))
 
-                
+    if datos is None:
 
-                received_string += char
+        return
 
-                if len(received_string) > 16:
+    try:
 
-                    received_string = received_string[1:]
+        texto = datos.decode()
 
-                
+    except UnicodeError:
 
-                lcd.clear()
+        texto = "?" * len(datos)
 
-                lcd.putstr("ASCII Recibido:")
+    pantalla.log("Trama OK ({} bytes): '{}'".format(len(datos), texto))
 
-                lcd.move_to(0, 1)
+    agregar_recibido(texto)
 
-                lcd.putstr(received_string)
+    pantalla.mostrar("Trama Recibida:", received_string)
 
-                
 
-                ascii_state = "IDLE" # Volver a buscar un Start Bit
 
 
 
-# --- run_detector() (Sin cambios en la lógica) ---
+# --- run_detector() ---
 
 def run_detector():
 
-    global lcd, coeff_F0, coeff_F1, THRESHOLD
-
     if not init_hardware():
 
         print("Fallo al inicializar hardware.")
@@ -260,79 +384,85 @@ def run_detector():
 
 
 
-    lcd.putstr("Receptor FDM v1.1\nEsperando ASCII...")
+    pantalla.mostrar("Receptor FDM v1.1", "Esperando ASCII...")
 
-    
+    if MODO_TRAMA:
 
-    while True:
+        # Un filtro por tono, bins fraccionarios para la subtrama corta; la
 
-        q1_F0 = 0.0
+        # energía escala con N²
 
-        q2_F0 = 0.0
+        banco = BancoGoertzel(bins_de_frecuencias(F_TONOS + F_GUARDA, FS_REAL, N_SUB), N_SUB)
 
-        q1_F1 = 0.0
+        umbral = THRESHOLD * (N_SUB / N_SAMPLES) ** 2
 
-        q2_F1 = 0.0
+    else:
 
-        
+        banco = BancoGoertzel([k_F0, k_F1] + bins_de_frecuencias(F_GUARDA, FS_REAL, N_SAMPLES), N_SAMPLES)
 
-        t_start = utime.ticks_us()
+        umbral = THRESHOLD
 
-        
+    # Con CFAR el umbral sale del piso de ruido de los bins de guarda
 
-        for i in range(N_SAMPLES):
+    cfar = DetectorCFAR(CFAR_FACTOR) if UMBRAL_ADAPTIVO else None
 
-            sample = float(adc.read_u16())
+    # El timer muestrea a FS_REAL en doble buffer mientras aquí se procesa el bloque anterior
 
-            q0_F0 = coeff_F0 * q1_F0 - q2_F0 + sample
+    captura = CapturaADC(adc, FS_REAL, N_SUB)
 
-            q2_F0 = q1_F0
+    captura.iniciar()
 
-            q1_F0 = q0_F0
+    
 
-            q0_F1 = coeff_F1 * q1_F1 - q2_F1 + sample
+    while True:
 
-            q2_F1 = q1_F1
+        bloque = captura.leer()
 
-            q1_F1 = q0_F1
+        banco.reiniciar()
 
-            
+        # Sin la continua del ADC: en los bins fraccionarios se filtra como energía
 
-            # Temporización del muestreo (Sin cambios)
+        media = sum(bloque) / len(bloque)
 
-            next_sample_time = utime.ticks_add(t_start, (i + 1) * 120)
+        for sample in bloque:
 
-            while utime.ticks_diff(next_sample_time, utime.ticks_us()) > 0:
+            banco.actualizar(sample - media)
 
-                pass
 
 
+        energias = banco.magnitudes()
 
-        mag_F0 = (q1_F0 * q1_F0) + (q2_F0 * q2_F0) - (coeff_F0 * q1_F0 * q2_F0)
+        if cfar is not None:
 
-        mag_F1 = (q1_F1 * q1_F1) + (q2_F1 * q2_F1) - (coeff_F1 * q1_F1 * q2_F1)
+            umbral = cfar.actualizar(energias[len(energias) - len(F_GUARDA):])
 
-        
+        if MODO_TRAMA:
 
-        # --- Lógica de Decisión (Sin cambios) ---
+            process_frame(energias, umbral)
 
-        current_bit = -1 # Por defecto, es RUIDO
+            continue
+
+        mag_F0, mag_F1 = energias[0], energias[1]
 
         
 
-        if mag_F0 > THRESHOLD and mag_F0 > mag_F1:
+        # --- Lógica de Decisión: mismo umbral, pero blanda ---
 
-            current_bit = 0
+        # 0 si es RUIDO; el signo dice F0 (<0) o F1 (>0) y el valor cuánto
 
-        elif mag_F1 > THRESHOLD and mag_F1 > mag_F0:
+        # de la subtrama cae en cada tono (sirve para ubicar los flancos)
 
-            current_bit = 1
+        if clasificar(mag_F0, mag_F1, umbral) == RUIDO:
 
-        
+            s = 0.0
+
+        else:
+
+            s = (mag_F1 - mag_F0) / (mag_F1 + mag_F0)
+
+        process_ascii(s)
 
-        # Pasamos el bit (0, 1, o -1) a la máquina de estados
 
-        process_ascii(current_bit)
 
 
 